@@ -1,9 +1,22 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import Config
-from schemas.models import db
+from schemas.models import db, Prediction
+from models.registry import registry, ModelUnavailableError
+from utils.cache import prediction_cache
+from utils.batching import micro_batcher
+from utils.jobs import job_runner
+from utils.persistence import prediction_writer
+from utils.instrumentation import instrumentation
+from utils.profiling import request_profiler
+from utils.security import password_hasher, identity_cache
+from sqlalchemy import text
+import logging
 import os
+import time
+
+logger = logging.getLogger(__name__)
 
 
 def create_app(config_class=Config):
@@ -22,16 +35,39 @@ def create_app(config_class=Config):
         r"/api/*": {
             "origins": app.config.get('CORS_ORIGINS', 'http://localhost:3000'),
             "methods": ["GET", "POST", "PUT", "DELETE"],
-            "allow_headers": ["Content-Type", "Authorization"]
+            "allow_headers": ["Content-Type", "Authorization"],
+            "expose_headers": ["X-Next-Cursor"]
         }
     })
     
     # Initialize JWT
     jwt = JWTManager(app)
     
+    # Request / stage / DB timers first, so model preload is measured too
+    instrumentation.init_app(app)
+    request_profiler.init_app(app)
+    
+    # Model registry (lazy unless MODEL_PRELOAD is set), result cache and batcher
+    registry.init_app(app)
+    prediction_cache.init_app(app)
+    micro_batcher.init_app(app, predict_fn=prediction_cache.predict)
+    job_runner.init_app(app)
+    prediction_writer.init_app(app)
+    password_hasher.init_app(app)
+    identity_cache.init_app(app)
+    if app.config.get('MODEL_PRELOAD'):
+        try:
+            registry.warmup()
+        except ModelUnavailableError as e:
+            logger.warning("Model preload failed: %s", e)
+    
     # Create database tables
     with app.app_context():
+        instrumentation.instrument_engine(db.engine)
         db.create_all()
+        # create_all skips indexes on tables that already exist
+        for index in Prediction.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
     
     # ===== BASIC ROUTES =====
     
@@ -46,12 +82,45 @@ def create_app(config_class=Config):
     @app.route('/api/status', methods=['GET'])
     def status():
         """Detailed status endpoint"""
+        start = time.perf_counter()
+        try:
+            db.session.execute(text('SELECT 1'))
+            database = 'connected'
+        except Exception as e:
+            database = f'error: {e}'
+        database_ms = (time.perf_counter() - start) * 1000
+        
+        # Probe the active model with one row if this process has it loaded;
+        # never trigger a load from a health check
+        models = registry.health()
+        if models['status'] in ('loaded', 'ready'):
+            start = time.perf_counter()
+            try:
+                registry.get().probe()
+                models['probe_ms'] = round((time.perf_counter() - start) * 1000, 3)
+            except Exception as e:
+                models['status'] = 'error'
+                models['probe_error'] = str(e)
+        healthy = database == 'connected' and models['status'] != 'error'
+        
         return jsonify({
-            'status': 'running',
+            'status': 'running' if healthy else 'degraded',
             'version': '1.0.0',
-            'database': 'connected',
+            'database': database,
+            'database_latency_ms': round(database_ms, 3),
+            'models': models,
+            'requests': instrumentation.totals(),
+            'cache': prediction_cache.stats(),
+            'batching': micro_batcher.stats(),
+            'persistence': prediction_writer.stats(),
+            'auth': {'password_hasher': password_hasher.stats(), 'identity_cache': identity_cache.stats()},
             'environment': app.config.get('FLASK_ENV', 'unknown')
-        }), 200
+        }), 200 if healthy else 503
+    
+    @app.route('/api/metrics', methods=['GET'])
+    def metrics():
+        """Prometheus scrape endpoint (merged across workers when METRICS_DIR is set)"""
+        return Response(instrumentation.render(), mimetype='text/plain; version=0.0.4')
     
     # ===== ERROR HANDLERS =====
     
@@ -72,16 +141,37 @@ def create_app(config_class=Config):
     
     from routes.auth import auth_bp
     from routes.predictions import pred_bp
-    # from routes.admin import admin_bp
+    from routes.admin import admin_bp
     # from routes.feedback import feedback_bp
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(pred_bp, url_prefix='/api/predict')
-    # app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
     # app.register_blueprint(feedback_bp, url_prefix='/api/feedback')
     print(app.url_map)
 
     return app
 
+
+def create_asgi_app(config_class=Config):
+    """
+    ASGI application for async servers (see asgi.py)
+
+    Login, token checks, single predictions and history are served by the
+    async routes in routes.async_api; every other route goes to the Flask
+    app through a bounded WSGI bridge
+    """
+    from routes.async_api import async_api
+    from utils.asgi import AsgiApplication
+
+    app = create_app(config_class)
+    async_api.init_app(app)
+    return AsgiApplication(
+        app,
+        async_api.routes,
+        wsgi_workers=app.config.get('ASGI_WSGI_WORKERS', 8),
+        on_shutdown=[async_api.close, prediction_writer.close, instrumentation.flush]
+    )
+
 if __name__ == '__main__':
     app = create_app()
     print("Starting Load Forecasting API...")
@@ -0,0 +1,4 @@
+from app import create_asgi_app
+
+# Entry point for ASGI servers: `uvicorn asgi:app --host 0.0.0.0 --port 5000`
+app = create_asgi_app()
@@ -0,0 +1,294 @@
+"""
+Rolling-origin backtest of the LSTM + TWSVR pipeline
+
+Splits the history into time-ordered folds, retrains the full pipeline
+(LSTM -> residuals -> TWSVR, as in train.py) on each fold's training
+window and scores the --test-hours that follow it. With --window
+expanding every fold trains from the first row; with --window rolling
+the training window keeps a fixed length of --initial-hours.
+
+Folds run in parallel in a process pool. Each fold's predictions are
+cached under --cache-dir, keyed by the rows it used and the training
+settings, so re-scoring (or re-running after new data is appended)
+only trains folds that have not been seen before.
+
+Usage (from backend/):
+    python backtest.py --data history.csv --initial-hours 4320 --test-hours 168
+    python backtest.py --data history.csv --window rolling --workers 4 --report backtest.json
+    python backtest.py --data history.csv --metrics-only
+    python backtest.py --data history.csv --max-mape 5 --min-coverage 0.8   # exit 1 on failure
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from models.twsvr_model import TWVSRPredictor
+from utils.metrics import MetricsAccumulator
+from utils.preprocessing import preprocess_data, prepare_features
+
+# Bump when the cached fold layout or the training procedure changes
+FOLD_CACHE_VERSION = 1
+TRAINING_SETTINGS = ('epochs', 'batch_size', 'lstm_units', 'epsilon', 'C', 'twsvr_backend', 'seed')
+METRIC_COLUMNS = ('rmse', 'mae', 'r2', 'mape', 'smape', 'interval_coverage', 'interval_width')
+
+
+def make_folds(n_rows, initial, test, step, window='expanding', max_folds=None):
+    """
+    Rolling-origin fold boundaries over time-ordered rows
+
+    Args:
+        n_rows: Number of rows in the history
+        initial: Rows in the first training window (and every window for 'rolling')
+        test: Rows scored per fold
+        step: Rows the origin advances between folds
+        window: 'expanding' (train from row 0) or 'rolling' (fixed-length window)
+        max_folds: Keep only the most recent folds
+
+    Returns:
+        List of dictionaries with fold, train_start, train_stop and test_stop
+    """
+    if initial <= 0 or test <= 0 or step <= 0:
+        raise ValueError('initial, test and step must be positive')
+
+    folds = []
+    origin = initial
+    while origin + test <= n_rows:
+        folds.append({
+            'fold': len(folds),
+            'train_start': 0 if window == 'expanding' else origin - initial,
+            'train_stop': origin,
+            'test_stop': origin + test
+        })
+        origin += step
+    return folds[-max_folds:] if max_folds else folds
+
+
+def fold_cache_path(cache_dir, fold, X, y, settings):
+    """
+    Cache file for a fold; the name changes whenever its rows or settings do
+
+    Returns:
+        Path to the fold's .npz file
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([FOLD_CACHE_VERSION, fold, settings], sort_keys=True).encode())
+    digest.update(np.ascontiguousarray(X[fold['train_start']:fold['test_stop']]).tobytes())
+    digest.update(np.ascontiguousarray(y[fold['train_start']:fold['test_stop']]).tobytes())
+    return os.path.join(cache_dir, f"fold-{fold['fold']:04d}-{digest.hexdigest()[:16]}.npz")
+
+
+def _init_worker(threads):
+    """Cap TensorFlow's thread pools so parallel folds do not oversubscribe the CPU"""
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def run_fold(fold, X, y, args, cache_path):
+    """
+    Train on the fold's window, predict its test rows and cache the result
+
+    Args:
+        fold: Fold boundaries from make_folds (relative to the full history)
+        X: Feature rows train_start:test_stop
+        y: Targets for the same rows
+        args: Parsed CLI arguments (training settings)
+        cache_path: Where to write the fold's predictions
+
+    Returns:
+        cache_path
+    """
+    import tensorflow as tf
+    from models.lstm_model import LSTMForecaster
+    from train import StageTimer, fit_intervals, predict_window
+
+    tf.keras.utils.set_random_seed(args.seed + fold['fold'])
+    timer = StageTimer(prefix=f"fold {fold['fold']} ")
+    n_train = fold['train_stop'] - fold['train_start']
+    X_train, y_train = X[:n_train], y[:n_train]
+
+    forecaster = LSTMForecaster()
+    with timer.stage('lstm'):
+        forecaster.build_model(input_shape=X.shape[1], lstm_units=args.lstm_units)
+        forecaster.train(X_train, y_train, epochs=args.epochs, batch_size=args.batch_size, verbose=0)
+    twsvr = fit_intervals(forecaster, X_train, y_train, args, timer)
+    with timer.stage('predict'):
+        point, lower, upper = predict_window(forecaster, twsvr, X[n_train:])
+
+    # Write then rename so an interrupted run never leaves a partial fold behind
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    partial = f"{cache_path}.{os.getpid()}.tmp.npz"
+    np.savez(partial, y_true=y[n_train:], point=point, lower=lower, upper=upper,
+             seconds=sum(timer.seconds.values()))
+    os.replace(partial, cache_path)
+    return cache_path
+
+
+def run_backtest(X, y, folds, args):
+    """
+    Make sure every fold has cached predictions, training the missing ones in parallel
+
+    Returns:
+        List of (fold, cache_path) pairs in fold order
+
+    Raises:
+        SystemExit: With --metrics-only when a fold has not been run yet
+    """
+    settings = {name: getattr(args, name) for name in TRAINING_SETTINGS}
+    paths = [fold_cache_path(args.cache_dir, fold, X, y, settings) for fold in folds]
+    pending = [(fold, path) for fold, path in zip(folds, paths) if not os.path.exists(path)]
+    print(f"{len(folds)} fold(s), {len(folds) - len(pending)} cached, {len(pending)} to train")
+
+    if pending and args.metrics_only:
+        raise SystemExit(f"{len(pending)} fold(s) have no cached predictions; run without --metrics-only")
+
+    if pending:
+        workers = max(1, min(args.workers, len(pending)))
+        # spawn: TensorFlow is not fork-safe once initialised
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                                 initializer=_init_worker, initargs=(args.threads_per_worker,)) as pool:
+            futures = {
+                pool.submit(run_fold, fold, X[fold['train_start']:fold['test_stop']],
+                            y[fold['train_start']:fold['test_stop']], args, path): fold
+                for fold, path in pending
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                future.result()
+                print(f"fold {futures[future]['fold']} done ({done}/{len(pending)})")
+
+    return list(zip(folds, paths))
+
+
+def summarize(results, timestamps):
+    """
+    Per-fold and aggregate metrics from cached fold predictions
+
+    Folds are scored one at a time and merged, so only one fold is in memory.
+
+    Args:
+        results: (fold, cache_path) pairs from run_backtest
+        timestamps: Timestamp of every history row, for labelling test windows
+
+    Returns:
+        Dictionary with 'folds' (one row per fold) and 'aggregate'
+    """
+    rows = []
+    pooled = MetricsAccumulator()
+    for fold, path in results:
+        with np.load(path) as cached:
+            fold_metrics = MetricsAccumulator().update(
+                cached['y_true'], cached['point'], cached['lower'], cached['upper']
+            )
+            seconds = float(cached['seconds'])
+        pooled.merge(fold_metrics)
+
+        rows.append({
+            **fold,
+            'test_from': str(timestamps[fold['train_stop']]),
+            'test_to': str(timestamps[fold['test_stop'] - 1]),
+            **fold_metrics.report(),
+            'train_seconds': round(seconds, 2)
+        })
+
+    per_fold = pd.DataFrame(rows)
+    aggregate = {
+        'pooled': pooled.report(),
+        'fold_mean': {name: float(per_fold[name].mean()) for name in METRIC_COLUMNS},
+        'fold_std': {name: float(per_fold[name].std(ddof=0)) for name in METRIC_COLUMNS}
+    }
+    return {'folds': rows, 'aggregate': aggregate}
+
+
+def print_table(summary):
+    names = [name.replace('interval_', '') for name in METRIC_COLUMNS]
+    header = f"{'fold':>9} {'test from':>19} {'train rows':>10} | " + ' '.join(f"{name:>9}" for name in names)
+    print(header)
+    print('-' * len(header))
+    for row in summary['folds']:
+        print(f"{row['fold']:>9} {row['test_from']:>19} {row['train_stop'] - row['train_start']:>10} | "
+              + ' '.join(f"{row[name]:>9.3f}" for name in METRIC_COLUMNS))
+    print('-' * len(header))
+    for label in ('pooled', 'fold_mean', 'fold_std'):
+        metrics = summary['aggregate'][label]
+        print(f"{label:>9} {'':>19} {'':>10} | " + ' '.join(f"{metrics[name]:>9.3f}" for name in METRIC_COLUMNS))
+
+
+def check_gates(aggregate, args):
+    """
+    Promotion gates on the pooled metrics
+
+    Returns:
+        List of failure messages (empty when every gate passes)
+    """
+    pooled = aggregate['pooled']
+    failures = []
+    if args.max_mape is not None and pooled['mape'] > args.max_mape:
+        failures.append(f"MAPE {pooled['mape']:.3f} > {args.max_mape}")
+    if args.min_coverage is not None and pooled['interval_coverage'] < args.min_coverage:
+        failures.append(f"interval coverage {pooled['interval_coverage']:.3f} < {args.min_coverage}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', required=True, help='CSV with Date, Hour, Temperature and Load columns')
+    parser.add_argument('--window', default='expanding', choices=['expanding', 'rolling'])
+    parser.add_argument('--initial-hours', type=int, default=24 * 180, help='First (or fixed, for rolling) training window')
+    parser.add_argument('--test-hours', type=int, default=24 * 7, help='Rows scored per fold')
+    parser.add_argument('--step-hours', type=int, default=None, help='Origin advance per fold (default: --test-hours)')
+    parser.add_argument('--max-folds', type=int, default=None, help='Only run the most recent N folds')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--threads-per-worker', type=int, default=1, help='TensorFlow intra-op threads per fold')
+    parser.add_argument('--cache-dir', default='backtests', help='Cached fold predictions')
+    parser.add_argument('--metrics-only', action='store_true', help='Score cached folds only, never train')
+    parser.add_argument('--epochs', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--lstm-units', type=int, default=64)
+    parser.add_argument('--epsilon', type=float, default=0.1)
+    parser.add_argument('--C', type=float, default=100)
+    parser.add_argument('--twsvr-backend', default='svr', choices=TWVSRPredictor.BACKENDS)
+    parser.add_argument('--n-jobs', type=int, default=1, help='Processes for the two TWSVR bounds, per fold')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-mape', type=float, default=None, help='Fail if pooled MAPE is above this')
+    parser.add_argument('--min-coverage', type=float, default=None, help='Fail if pooled coverage is below this')
+    parser.add_argument('--report', default=None, help='Write the JSON report here as well')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data = preprocess_data(pd.read_csv(args.data)).sort_values(['Date', 'Hour'])
+    X, y = prepare_features(data)
+    timestamps = (data['Date'] + pd.to_timedelta(data['Hour'], unit='h')).to_numpy().astype('datetime64[s]')
+
+    folds = make_folds(len(X), args.initial_hours, args.test_hours, args.step_hours or args.test_hours,
+                       window=args.window, max_folds=args.max_folds)
+    if not folds:
+        raise SystemExit(f"{len(X)} rows is too short for {args.initial_hours} training + {args.test_hours} test hours")
+
+    summary = summarize(run_backtest(X, y, folds, args), timestamps)
+    print_table(summary)
+
+    failures = check_gates(summary['aggregate'], args)
+    summary['settings'] = {name: getattr(args, name) for name in TRAINING_SETTINGS}
+    summary['window'] = args.window
+    summary['passed'] = not failures
+    summary['seconds'] = round(time.perf_counter() - start, 2)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+    print(f"backtest finished in {summary['seconds']:.1f}s")
+    if failures:
+        print('FAILED: ' + '; '.join(failures))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
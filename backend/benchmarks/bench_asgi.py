@@ -0,0 +1,81 @@
+"""
+WSGI vs ASGI serving mode under the same request mix
+
+Runs the load generator in process for each mode and concurrency level:
+    wsgi  one Flask request per client thread (a threaded sync server)
+    asgi  create_asgi_app on one event loop; inference, database and
+          bcrypt work on their sized pools
+Each run is a separate process on a fresh database.
+
+With --url-wsgi / --url-asgi it loads two running servers instead, e.g.
+    gunicorn -c gunicorn.conf.py wsgi:app            (port 5000)
+    uvicorn asgi:app --port 5001
+
+Usage (from backend/):
+    python -m benchmarks.bench_asgi [--concurrency 8 64] [--duration 15] [--mix login=1,single=8,history=1]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import results as bench_results
+
+MODES = ('wsgi', 'asgi')
+
+
+def run_loadgen(args, mode, concurrency, output):
+    command = [
+        sys.executable, '-m', 'benchmarks.loadgen',
+        '--concurrency', str(concurrency), '--duration', str(args.duration), '--mix', args.mix,
+        '--users', str(args.users), '--output', output, '--baseline', ''
+    ]
+    url = getattr(args, f'url_{mode}')
+    if url:
+        command += ['--url', url]
+    else:
+        command += ['--mode', mode, '--model-dir', args.model_dir, '--version', args.version,
+                    '--bcrypt-rounds', str(args.bcrypt_rounds)]
+    # loadgen exits non-zero when requests failed, but still writes its results (errors are a column)
+    subprocess.run(command, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                   stdout=subprocess.DEVNULL)
+    if not os.path.exists(output):
+        raise RuntimeError(f"Load generator run failed: {' '.join(command)}")
+    return bench_results.load(output)['results']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 64])
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--mix', default='login=1,single=8,history=1')
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--bcrypt-rounds', type=int, default=12)
+    parser.add_argument('--model-dir', default='/tmp/bench_models')
+    parser.add_argument('--version', default='stub')
+    parser.add_argument('--url-wsgi', default=None, help='Running WSGI server to load instead')
+    parser.add_argument('--url-asgi', default=None, help='Running ASGI server to load instead')
+    bench_results.add_arguments(parser, 'asgi')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for concurrency in args.concurrency:
+            for mode in MODES:
+                name = f'{mode}_c{concurrency}'
+                summary = run_loadgen(args, mode, concurrency, os.path.join(directory, f'{name}.json'))
+                for scenario, row in summary.items():
+                    results[f'{name}_{scenario}'] = row
+
+    print(f"\n{args.duration:.0f}s per run, mix {args.mix}, bcrypt cost {args.bcrypt_rounds}")
+    print(f"{'case':>22} | {'requests':>8} {'errors':>6} {'req/s':>8} | {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, row in results.items():
+        print(f"{name:>22} | {row['requests']:>8} {row['errors']:>6} {row['requests_per_s']:>8.1f} | "
+              f"{row.get('p50_ms', 0):>7.1f}ms {row.get('p95_ms', 0):>7.1f}ms {row.get('p99_ms', 0):>7.1f}ms")
+
+    bench_results.finish(args, 'asgi', results, vars(args))
+
+
+if __name__ == '__main__':
+    main()
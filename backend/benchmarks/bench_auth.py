@@ -0,0 +1,70 @@
+"""
+Mixed login / predict throughput with bounded vs unbounded password hashing
+
+Runs the load generator twice on the same login-heavy mix:
+    unbounded  PASSWORD_HASH_WORKERS = concurrency: every request thread
+               can be inside bcrypt at once, as when hashing ran inline
+    bounded    PASSWORD_HASH_WORKERS = --hash-workers (default 1)
+and reports what a login burst does to prediction throughput and latency.
+Each run is a separate process, so the two configurations do not share
+caches or thread pools.
+
+Usage (from backend/):
+    python -m benchmarks.bench_auth [--concurrency 8] [--duration 15] [--mix login=1,single=4]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks import results as bench_results
+
+
+def run_loadgen(args, hash_workers, output):
+    command = [
+        sys.executable, '-m', 'benchmarks.loadgen',
+        '--concurrency', str(args.concurrency), '--duration', str(args.duration), '--mix', args.mix,
+        '--users', str(args.users), '--model-dir', args.model_dir, '--version', args.version,
+        '--bcrypt-rounds', str(args.bcrypt_rounds), '--hash-workers', str(hash_workers),
+        '--output', output, '--baseline', ''
+    ]
+    # loadgen exits non-zero when requests failed, but still writes its results (errors are a column)
+    subprocess.run(command, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                   stdout=subprocess.DEVNULL)
+    if not os.path.exists(output):
+        raise RuntimeError(f"Load generator run failed: {' '.join(command)}")
+    return bench_results.load(output)['results']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=15)
+    parser.add_argument('--mix', default='login=1,single=4')
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--bcrypt-rounds', type=int, default=12)
+    parser.add_argument('--hash-workers', type=int, default=1, help='Pool size of the bounded run')
+    parser.add_argument('--model-dir', default='/tmp/bench_models')
+    parser.add_argument('--version', default='stub')
+    bench_results.add_arguments(parser, 'auth')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, workers in (('unbounded', args.concurrency), ('bounded', args.hash_workers)):
+            summary = run_loadgen(args, workers, os.path.join(directory, f'{name}.json'))
+            for scenario, row in summary.items():
+                results[f'{name}_{scenario}'] = row
+
+    print(f"\n{args.concurrency} clients, {args.duration:.0f}s, mix {args.mix}, bcrypt cost {args.bcrypt_rounds}")
+    print(f"{'case':>18} | {'requests':>8} {'errors':>6} {'req/s':>8} | {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, row in results.items():
+        print(f"{name:>18} | {row['requests']:>8} {row['errors']:>6} {row['requests_per_s']:>8.1f} | "
+              f"{row.get('p50_ms', 0):>7.1f}ms {row.get('p95_ms', 0):>7.1f}ms {row.get('p99_ms', 0):>7.1f}ms")
+
+    bench_results.finish(args, 'auth', results, vars(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Feature engineering throughput: pandas datetime accessors vs utils.features
+
+Builds [temperature, hour, month, weekday] matrices for N hourly rows
+from ISO date strings and from datetime64 arrays, then lag and rolling
+features, and reports rows per second for each path.
+
+Usage (from backend/):
+    python -m benchmarks.bench_features [--rows 10000000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.features import build_feature_matrix, lag_features, rolling_features
+
+
+def make_rows(n_rows, seed=0):
+    """Hourly dates (as datetime64 days), hours and temperatures"""
+    rng = np.random.default_rng(seed)
+    stamps = np.datetime64('2000-01-01T00', 'h') + np.arange(n_rows)
+    days = stamps.astype('datetime64[D]')
+    hours = (stamps.astype(np.int64) % 24).astype(np.int8)
+    temperatures = (15 + 10 * rng.standard_normal(n_rows)).astype(np.float32)
+    return days, hours, temperatures
+
+
+def pandas_features(dates, hours, temperatures):
+    """The previous pandas path (create_batch_prediction_input before the shared module)"""
+    parsed = pd.DatetimeIndex(pd.to_datetime(dates, format='%Y-%m-%d'))
+    return np.column_stack([
+        np.asarray(temperatures, dtype=float),
+        np.asarray(hours, dtype=int),
+        parsed.month.to_numpy(),
+        parsed.weekday.to_numpy()
+    ])
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--window', type=int, default=24)
+    args = parser.parse_args()
+
+    days, hours, temperatures = make_rows(args.rows)
+    strings = days.astype(str)
+    holidays = ['2000-01-01', '2000-12-25', '2001-01-01', '2001-12-25']
+
+    cases = [
+        ('pandas (strings)', pandas_features, (strings, hours, temperatures), {}),
+        ('features (strings)', build_feature_matrix, (temperatures, hours, strings), {}),
+        ('features (datetime64)', build_feature_matrix, (temperatures, hours, days), {}),
+        ('features (+holidays, sin/cos)', build_feature_matrix, (temperatures, hours, days),
+         {'holidays': holidays, 'cyclical': True}),
+        ('lags 1/24/168', lag_features, (temperatures, [1, 24, 168]), {}),
+        (f'rolling {args.window}h mean/std/min/max', rolling_features, (temperatures, args.window), {}),
+    ]
+
+    print(f"rows: {args.rows:,}")
+    print(f"{'path':>34} | {'seconds':>8} {'Mrows/s':>8} | {'dtype':>7} {'contiguous':>10}")
+    reference = None
+    for name, fn, fn_args, fn_kwargs in cases:
+        result, seconds = timed(fn, *fn_args, **fn_kwargs)
+        X = result[0] if isinstance(result, tuple) else result
+        if name == 'pandas (strings)':
+            reference = X
+        elif name == 'features (strings)':
+            assert np.allclose(X, reference), "feature mismatch against the pandas path"
+        print(f"{name:>34} | {seconds:>8.2f} {args.rows / seconds / 1e6:>8.2f} | "
+              f"{X.dtype.name:>7} {str(X.flags['C_CONTIGUOUS']):>10}")
+        del result, X
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Prediction history response time vs table size and page depth
+
+Seeds a SQLite database with N predictions spread over several users,
+then times GET /api/predict/history at increasing keyset depths next to
+the equivalent LIMIT/OFFSET query.
+
+Usage (from backend/):
+    python -m benchmarks.bench_history [--rows 1000000] [--db /tmp/history_bench.db]
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert, select, text
+
+from app import create_app
+from config import TestingConfig
+from routes.predictions import encode_cursor
+from schemas.models import db, Prediction, User
+
+
+def seed(n_rows, n_users, chunk_size=50000):
+    """Insert users and n_rows predictions with increasing timestamps"""
+    users = []
+    for i in range(n_users):
+        user = User(username=f"bench_{i}", email=f"bench_{i}@example.com", is_verified=True)
+        user.password_hash = 'x'
+        users.append(user)
+    db.session.add_all(users)
+    db.session.commit()
+    user_ids = [user.user_id for user in users]
+
+    rng = np.random.default_rng(0)
+    start = datetime(2024, 1, 1)
+    for offset in range(0, n_rows, chunk_size):
+        n = min(chunk_size, n_rows - offset)
+        hours = rng.integers(0, 24, n)
+        temperatures = rng.uniform(-10, 40, n)
+        records = [
+            {
+                'user_id': user_ids[(offset + i) % n_users],
+                'date': (start + timedelta(hours=offset + i)).date(),
+                'hour': int(hours[i]),
+                'temperature': float(temperatures[i]),
+                'month': 1,
+                'weekday': 0,
+                'predicted_load': 1000.0 + temperatures[i] * 20,
+                'lower_bound': 950.0,
+                'upper_bound': 1050.0,
+                'model_used': 'LSTM+TWSVR',
+                'timestamp': start + timedelta(seconds=offset + i)
+            }
+            for i in range(n)
+        ]
+        db.session.execute(insert(Prediction), records)
+        db.session.commit()
+    return user_ids[0]
+
+
+def median_ms(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--db', default='/tmp/history_bench.db')
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        os.remove(args.db)
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{args.db}"
+
+    app = create_app(BenchConfig)
+    client = app.test_client()
+
+    with app.app_context():
+        start = time.perf_counter()
+        user_id = seed(args.rows, args.users)
+        print(f"Seeded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+
+        headers = {'Authorization': f"Bearer {create_access_token(identity=str(user_id))}"}
+        user_rows = db.session.execute(
+            select(db.func.count()).select_from(Prediction).where(Prediction.user_id == user_id)
+        ).scalar()
+
+        print(f"{'depth':>8} | {'keyset endpoint':>15} | {'offset query':>12}")
+        for depth in (0, 1000, 10000, user_rows // 2, user_rows - 20):
+            params = {'limit': 20}
+            if depth:
+                row = db.session.execute(text(
+                    "SELECT timestamp, prediction_id FROM predictions WHERE user_id = :user_id "
+                    "ORDER BY timestamp DESC, prediction_id DESC LIMIT 1 OFFSET :offset"
+                ), {'user_id': user_id, 'offset': depth - 1}).one()
+                params['cursor'] = encode_cursor(datetime.fromisoformat(str(row[0])), row[1])
+
+            keyset = median_ms(lambda: client.get('/api/predict/history', query_string=params, headers=headers),
+                               args.repeats)
+            offset = median_ms(lambda: db.session.execute(text(
+                "SELECT * FROM predictions WHERE user_id = :user_id "
+                "ORDER BY timestamp DESC, prediction_id DESC LIMIT 20 OFFSET :offset"
+            ), {'user_id': user_id, 'offset': depth}).all(), args.repeats)
+            print(f"{depth:>8} | {keyset:>13.2f}ms | {offset:>10.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+LSTM inference latency: Keras `model.predict` vs the graph-mode InferenceEngine
+
+Usage (from backend/):
+    python -m benchmarks.bench_inference [--model trained_models/lstm_model.h5]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from tensorflow.keras.models import load_model  # noqa: E402
+from models.inference_engine import InferenceEngine  # noqa: E402
+from models.lstm_model import LSTMForecaster  # noqa: E402
+
+
+def time_calls(fn, X, repeats):
+    """
+    Time repeated calls of fn(X)
+
+    Returns:
+        Tuple of (p50_ms, p99_ms)
+    """
+    fn(X)  # warm up
+    samples = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        samples[i] = time.perf_counter() - start
+    return np.percentile(samples, 50) * 1000, np.percentile(samples, 99) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='trained_models/lstm_model.h5',
+                        help='Trained model; an untrained model of the same shape is used if missing')
+    parser.add_argument('--repeats', type=int, default=200)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 24, 168])
+    args = parser.parse_args()
+
+    if os.path.exists(args.model):
+        model = load_model(args.model, compile=False)
+    else:
+        print(f"{args.model} not found, benchmarking an untrained model")
+        model = LSTMForecaster().build_model(input_shape=4)
+
+    engine = InferenceEngine(model)
+    engine.warmup(args.batch_sizes)
+
+    print(f"{'batch':>6} | {'keras p50':>10} {'keras p99':>10} | {'engine p50':>10} {'engine p99':>10} | {'speedup':>7}")
+    for batch_size in args.batch_sizes:
+        X = np.random.rand(batch_size, 1, engine.n_features).astype(np.float32)
+        keras_p50, keras_p99 = time_calls(lambda x: model.predict(x, verbose=0), X, args.repeats)
+        engine_p50, engine_p99 = time_calls(engine.predict, X, args.repeats)
+        print(f"{batch_size:>6} | {keras_p50:>8.2f}ms {keras_p99:>8.2f}ms | "
+              f"{engine_p50:>8.2f}ms {engine_p99:>8.2f}ms | {keras_p50 / engine_p50:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
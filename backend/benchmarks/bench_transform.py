@@ -0,0 +1,125 @@
+"""
+Pre/post-processing cost: scikit-learn scaler calls vs the fused transform
+
+The scikit-learn path is the original request flow: scaler_X.transform,
+then scaler_y.inverse_transform separately for the point and both
+bounds. The fused path is ModelBundle.predict: exported scale/offset
+arrays and one inverse step over the stacked [point, lower, upper].
+
+Models are replaced by constant-time stubs so only the transform work
+is measured; pass --model-dir to also time the full pipeline on real
+artifacts.
+
+Usage (from backend/):
+    python -m benchmarks.bench_transform [--model-dir trained_models]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from sklearn.preprocessing import MinMaxScaler  # noqa: E402
+
+from models.registry import ModelBundle  # noqa: E402
+from models.scaling import AffineTransform  # noqa: E402
+from utils.features import build_feature_matrix  # noqa: E402
+
+
+class _Stub:
+    """Model stand-in: returns a column of its input, no real work"""
+
+    def __init__(self, column, shift=0.0):
+        self.column = column
+        self.shift = shift
+
+    def predict(self, X):
+        return np.asarray(X).reshape(len(X), -1)[:, self.column] * 0.5 + self.shift
+
+
+def stub_bundle():
+    """A ModelBundle with fitted scalers and stub models, bypassing artifact loading"""
+    rng = np.random.default_rng(0)
+    X_train, _ = build_feature_matrix(
+        15 + 10 * rng.standard_normal(8760), np.arange(8760) % 24,
+        np.datetime64('2024-01-01') + np.arange(8760) // 24
+    )
+    bundle = ModelBundle.__new__(ModelBundle)
+    bundle.scaler_X = MinMaxScaler().fit(X_train)
+    bundle.scaler_y = MinMaxScaler().fit(rng.uniform(800, 2200, (8760, 1)))
+    bundle.x_transform = AffineTransform.from_scaler(bundle.scaler_X)
+    bundle.y_transform = AffineTransform.from_scaler(bundle.scaler_y)
+    bundle.lstm = _Stub(0)
+    bundle.svr_lower = _Stub(1, -0.05)
+    bundle.svr_upper = _Stub(1, 0.05)
+    bundle.table = None
+    bundle.interval_mode = 'residual'
+    return bundle, X_train
+
+
+def sklearn_predict(bundle, X_input):
+    """The original per-request flow: one transform and three inverse_transform calls"""
+    X_scaled = bundle.scaler_X.transform(X_input)
+    X_lstm = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
+    y_pred_scaled = bundle.lstm.predict(X_lstm).reshape(-1)
+    y_pred = bundle.scaler_y.inverse_transform(y_pred_scaled.reshape(-1, 1)).flatten()
+
+    lower_scaled = bundle.svr_lower.predict(X_scaled)
+    upper_scaled = bundle.svr_upper.predict(X_scaled)
+    if bundle.interval_mode == 'residual':
+        lower_scaled = lower_scaled + y_pred_scaled
+        upper_scaled = upper_scaled + y_pred_scaled
+    lower = bundle.scaler_y.inverse_transform(lower_scaled.reshape(-1, 1)).flatten()
+    upper = bundle.scaler_y.inverse_transform(upper_scaled.reshape(-1, 1)).flatten()
+    return y_pred, lower, upper
+
+
+def time_calls(fn, X, repeats):
+    """
+    Median seconds per fn(X) call
+
+    Returns:
+        Tuple of (median seconds, result of the last call)
+    """
+    result = fn(X)
+    samples = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        result = fn(X)
+        samples[i] = time.perf_counter() - start
+    return np.median(samples), result
+
+
+def compare(title, bundle, X_pool, batch_sizes, repeats):
+    print(title)
+    print(f"{'rows':>6} | {'sklearn':>10} {'fused':>10} | {'speedup':>7} {'max |diff|':>10}")
+    for batch_size in batch_sizes:
+        X = X_pool[:batch_size]
+        sklearn_seconds, expected = time_calls(lambda x: sklearn_predict(bundle, x), X, repeats)
+        fused_seconds, actual = time_calls(bundle.predict, X, repeats)
+        diff = max(np.max(np.abs(a - b)) for a, b in zip(expected, actual))
+        print(f"{batch_size:>6} | {sklearn_seconds * 1e6:>8.1f}us {fused_seconds * 1e6:>8.1f}us | "
+              f"{sklearn_seconds / fused_seconds:>6.1f}x {diff:>10.2e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-dir', help='Also benchmark the full pipeline on these artifacts')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 10000])
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+
+    bundle, X_pool = stub_bundle()
+    X_pool = np.tile(X_pool, (max(1, max(args.batch_sizes) // len(X_pool) + 1), 1))
+    compare('Transform overhead (stub models)', bundle, X_pool, args.batch_sizes, args.repeats)
+
+    if args.model_dir:
+        bundle = ModelBundle('LSTM+TWSVR', 'bench', args.model_dir)
+        bundle.warmup()
+        compare(f'\nFull pipeline ({args.model_dir})', bundle, X_pool, args.batch_sizes, max(5, args.repeats // 20))
+
+
+if __name__ == '__main__':
+    main()
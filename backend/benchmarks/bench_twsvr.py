@@ -0,0 +1,68 @@
+"""
+TWSVR interval backends: exact RBF SVR vs Nystroem / random Fourier features
+
+Reports fit time, predict time, interval coverage and width for each
+backend on synthetic hourly residuals.
+
+Usage (from backend/):
+    python -m benchmarks.bench_twsvr [--hours 8760 17520]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from models.twsvr_model import TWVSRPredictor
+from utils.metrics import calculate_interval_coverage, calculate_interval_width
+
+
+def make_residuals(n_samples, seed=0):
+    """
+    Synthetic scaled features [temperature, hour, month, weekday] and
+    heteroscedastic residuals that grow at temperature extremes
+    """
+    rng = np.random.default_rng(seed)
+    hours = np.arange(n_samples)
+    temperature = 0.5 + 0.3 * np.sin(2 * np.pi * hours / 8760) + 0.05 * rng.standard_normal(n_samples)
+    X = np.column_stack([
+        temperature,
+        (hours % 24) / 23,
+        ((hours // 730) % 12) / 11,
+        ((hours // 24) % 7) / 6
+    ])
+    scale = 0.02 + 0.08 * np.abs(temperature - 0.5)
+    y = scale * rng.standard_normal(n_samples)
+    return X, y
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hours', type=int, nargs='+', default=[8760, 17520])
+    parser.add_argument('--backends', nargs='+', default=list(TWVSRPredictor.BACKENDS))
+    parser.add_argument('--n-components', type=int, default=300)
+    parser.add_argument('--epsilon', type=float, default=0.05)
+    args = parser.parse_args()
+
+    print(f"{'hours':>6} {'backend':>9} | {'fit':>8} {'predict':>8} | {'coverage':>8} {'width':>7}")
+    for n_hours in args.hours:
+        X, y = make_residuals(n_hours)
+        X_test, y_test = make_residuals(2000, seed=1)
+
+        for backend in args.backends:
+            model = TWVSRPredictor(epsilon=args.epsilon, backend=backend, n_components=args.n_components)
+
+            start = time.perf_counter()
+            model.train(X, y)
+            fit_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            lower, upper = model.predict_intervals(X_test, np.zeros(len(X_test)))
+            predict_seconds = time.perf_counter() - start
+
+            print(f"{n_hours:>6} {backend:>9} | {fit_seconds:>7.2f}s {predict_seconds * 1000:>6.1f}ms | "
+                  f"{calculate_interval_coverage(y_test, lower, upper):>8.3f} "
+                  f"{calculate_interval_width(lower, upper):>7.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,330 @@
+"""
+Load generator for the login / predict / history request mix
+
+Drives POST /api/auth/login, POST /api/predict/single and
+GET /api/predict/history from --concurrency threads for --duration
+seconds, picking each request from the weighted --mix. By default the
+app is created in process (one test client per thread) on a fresh
+SQLite file with stub model artifacts; --url points it at a running
+server instead (gunicorn, or the ASGI entry point). --mode asgi serves
+the in-process app through create_asgi_app on one event loop thread.
+
+Reports throughput, error counts and p50/p95/p99 per scenario and
+overall, and compares with a stored baseline.
+
+Usage (from backend/):
+    python -m benchmarks.loadgen [--concurrency 8] [--duration 20] [--mix login=1,single=8,history=1]
+    python -m benchmarks.loadgen --url http://localhost:8000 --save-baseline
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from benchmarks import results as bench_results  # noqa: E402
+from benchmarks.stub_models import build_stub_models  # noqa: E402
+from utils import asgi  # noqa: E402
+
+SCENARIOS = ('login', 'single', 'history')
+PASSWORD = 'loadgen-password'
+LOGIN_ATTEMPTS = 30
+LOADGEN_CACHE_SIZE = 10000  # the cache is opt-in; the default mix runs with it
+
+
+def parse_mix(mix):
+    """
+    'login=1,single=8,history=1' -> {'login': 1.0, ...}
+
+    Raises:
+        ValueError: For unknown scenarios or no positive weight
+    """
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}' (expected one of: {', '.join(SCENARIOS)})")
+        weights[name] = float(weight or 1)
+    if not any(weight > 0 for weight in weights.values()):
+        raise ValueError('Mix needs at least one positive weight')
+    return weights
+
+# ===== CLIENTS =====
+
+class InProcessClient:
+    """Flask test client with the same call shape as HttpClient"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def post(self, path, body, headers=None):
+        response = self.client.post(path, json=body, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+    def get(self, path, params=None, headers=None):
+        response = self.client.get(path, query_string=params, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+
+class AsgiClient:
+    """ASGI app on a shared event loop thread with the same call shape as HttpClient"""
+
+    def __init__(self, app, loop):
+        self.client = asgi.AsgiClient(app, loop, timeout=None)
+
+    def post(self, path, body, headers=None):
+        status, _, response_body = self.client.request('POST', path, json_body=body, headers=headers)
+        return status, response_body
+
+    def get(self, path, params=None, headers=None):
+        status, _, response_body = self.client.request('GET', path, params=params, headers=headers)
+        return status, response_body
+
+
+class HttpClient:
+    """Keep-alive HTTP session against a running server"""
+
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+
+    def _json(self, response):
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    def post(self, path, body, headers=None):
+        response = self.session.post(self.base_url + path, json=body, headers=headers, timeout=60)
+        return response.status_code, self._json(response)
+
+    def get(self, path, params=None, headers=None):
+        response = self.session.get(self.base_url + path, params=params, headers=headers, timeout=60)
+        return response.status_code, self._json(response)
+
+# ===== SCENARIOS =====
+
+def user_credentials(index):
+    return {'username': f'loadgen_{index}', 'email': f'loadgen_{index}@example.com', 'password': PASSWORD}
+
+
+def register_users(client, n_users):
+    """Create the load-test users (already existing ones are fine)"""
+    for index in range(n_users):
+        status, body = client.post('/api/auth/register', user_credentials(index))
+        if status not in (201, 409):
+            raise RuntimeError(f"Could not register loadgen user {index}: {status} {body}")
+
+
+def login(client, credentials):
+    status, body = client.post('/api/auth/login', {'email': credentials['email'],
+                                                   'password': credentials['password']})
+    token = body.get('access_token') if status == 200 and body else None
+    return status, token
+
+
+def run_worker(make_client, worker, args, weights, ready, clock, samples, lock):
+    """
+    One simulated client: log in, wait until every client has, then issue
+    weighted random requests until the deadline
+    """
+    client = make_client()
+    credentials = user_credentials(worker % args.users)
+    for _ in range(LOGIN_ATTEMPTS):
+        status, token = login(client, credentials)
+        if status != 503:
+            break
+        time.sleep(1)  # Retry-After: the password hashing queue is full
+    if token is None:
+        ready.abort()
+        raise RuntimeError(f"Worker {worker} could not log in: {status}")
+    ready.wait()
+    deadline = clock['deadline']
+
+    rng = random.Random(args.seed + worker)
+    names = list(weights)
+    scenario_weights = [weights[name] for name in names]
+    local = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, scenario_weights)[0]
+        headers = {'Authorization': f'Bearer {token}'}
+        start = time.perf_counter()
+        if name == 'login':
+            status, new_token = login(client, credentials)
+            token = new_token or token
+        elif name == 'single':
+            status, _ = client.post('/api/predict/single', {
+                'temperature': round(rng.uniform(-10, 40), 1),
+                'hour': rng.randrange(24),
+                'date': f"2030-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            }, headers)
+        else:
+            status, _ = client.get('/api/predict/history', {'limit': 20}, headers)
+        local[name].append(time.perf_counter() - start)
+        if status >= 400:
+            errors[name] += 1
+
+    with lock:
+        for name in names:
+            samples[name].extend(local[name])
+            samples['errors'][name] += errors[name]
+
+
+def summarize(samples, weights, elapsed):
+    """
+    Per-scenario and overall throughput and latency
+
+    Returns:
+        Dictionary of {case: {requests, errors, requests_per_s, p50_ms, p95_ms, p99_ms}}
+    """
+    summary = {}
+    everything = []
+    for name in weights:
+        durations = samples[name]
+        everything.extend(durations)
+        summary[name] = scenario_summary(durations, samples['errors'][name], elapsed)
+    summary['overall'] = scenario_summary(everything, sum(samples['errors'].values()), elapsed)
+    return summary
+
+
+def scenario_summary(durations, errors, elapsed):
+    if not durations:
+        return {'requests': 0, 'errors': errors, 'requests_per_s': 0.0}
+    latency = bench_results.percentiles(durations)
+    return {
+        'requests': len(durations),
+        'errors': errors,
+        'requests_per_s': round(len(durations) / elapsed, 2),
+        'p50_ms': latency['p50_ms'],
+        'p95_ms': latency['p95_ms'],
+        'p99_ms': latency['p99_ms']
+    }
+
+# ===== SETUP =====
+
+def create_local_app(args):
+    """
+    The app (WSGI or ASGI, per --mode) on a fresh SQLite file with the
+    benchmark model version preloaded
+    """
+    if args.version == 'stub':
+        build_stub_models(args.model_dir, args.version)
+
+    from app import create_app, create_asgi_app
+    from config import Config, TestingConfig
+
+    database = args.db or os.path.join(tempfile.mkdtemp(prefix='bench_load_'), 'load.db')
+
+    class LoadConfig(TestingConfig):
+        DEBUG = False
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+        MODEL_DIR = args.model_dir
+        MODEL_VERSION = args.version
+        MODEL_PRELOAD = True
+        MODEL_WATCH_INTERVAL = 0
+        PREDICTION_CACHE_SIZE = 0 if args.no_cache else LOADGEN_CACHE_SIZE
+        BCRYPT_ROUNDS = args.bcrypt_rounds
+        PASSWORD_HASH_WORKERS = args.hash_workers or Config.PASSWORD_HASH_WORKERS
+        PASSWORD_HASH_MAX_PENDING = max(Config.PASSWORD_HASH_MAX_PENDING, args.concurrency)
+
+    return create_asgi_app(LoadConfig) if args.mode == 'asgi' else create_app(LoadConfig)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default=None, help='Load a running server instead of an in-process app')
+    parser.add_argument('--mode', choices=('wsgi', 'asgi'), default='wsgi',
+                        help='In-process only: Flask test clients, or the ASGI app on one event loop')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of measured load')
+    parser.add_argument('--mix', default='login=1,single=8,history=1')
+    parser.add_argument('--users', type=int, default=8, help='Distinct user accounts to spread load over')
+    parser.add_argument('--model-dir', default='/tmp/bench_models', help='In-process only')
+    parser.add_argument('--version', default='stub', help='In-process only')
+    parser.add_argument('--db', default=None, help='In-process SQLite file (default: a fresh temporary one)')
+    parser.add_argument('--no-cache', action='store_true', help='In-process only: disable the prediction cache')
+    parser.add_argument('--bcrypt-rounds', type=int, default=12, help='In-process only: bcrypt cost (production default)')
+    parser.add_argument('--hash-workers', type=int, default=None,
+                        help='In-process only: PASSWORD_HASH_WORKERS (default from config)')
+    parser.add_argument('--seed', type=int, default=0)
+    bench_results.add_arguments(parser, 'load')
+    args = parser.parse_args()
+
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.url:
+        def make_client():
+            return HttpClient(args.url)
+    elif args.mode == 'asgi':
+        app = create_local_app(args)
+        loop = asgi.start_event_loop()
+
+        def make_client():
+            return AsgiClient(app, loop)
+    else:
+        app = create_local_app(args)
+
+        def make_client():
+            return InProcessClient(app)
+
+    register_users(make_client(), args.users)
+
+    samples = {name: [] for name in weights}
+    samples['errors'] = {name: 0 for name in weights}
+    lock = threading.Lock()
+    failures = []
+    # The measured window opens once every client has logged in
+    clock = {}
+
+    def open_window():
+        clock['start'] = time.perf_counter()
+        clock['deadline'] = clock['start'] + args.duration
+
+    ready = threading.Barrier(args.concurrency, action=open_window)
+
+    def target(worker):
+        try:
+            run_worker(make_client, worker, args, weights, ready, clock, samples, lock)
+        except threading.BrokenBarrierError:
+            pass
+        except Exception as e:
+            failures.append(e)
+
+    threads = [threading.Thread(target=target, args=(worker,)) for worker in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise SystemExit(f"{len(failures)} worker(s) failed, first: {failures[0]}")
+    elapsed = time.perf_counter() - clock['start']
+
+    summary = summarize(samples, weights, elapsed)
+    print(f"\n{args.concurrency} clients, {elapsed:.1f}s, mix {args.mix}")
+    print(f"{'scenario':>10} | {'requests':>8} {'errors':>6} {'req/s':>9} | {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, row in summary.items():
+        print(f"{name:>10} | {row['requests']:>8} {row['errors']:>6} {row['requests_per_s']:>9.1f} | "
+              f"{row.get('p50_ms', 0):>7.2f}ms {row.get('p95_ms', 0):>7.2f}ms {row.get('p99_ms', 0):>7.2f}ms")
+
+    bench_results.finish(args, 'load', summary, {
+        'url': args.url, 'mode': None if args.url else args.mode,
+        'concurrency': args.concurrency, 'duration': args.duration, 'mix': args.mix,
+        'users': args.users, 'version': None if args.url else args.version, 'cache': not args.no_cache,
+        'bcrypt_rounds': None if args.url else args.bcrypt_rounds, 'hash_workers': args.hash_workers
+    })
+    if summary['overall']['errors']:
+        raise SystemExit(f"{summary['overall']['errors']} request(s) failed")
+
+
+if __name__ == '__main__':
+    main()
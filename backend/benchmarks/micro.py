@@ -0,0 +1,159 @@
+"""
+Micro-benchmarks of the prediction and history hot paths
+
+Times each building block of a request in isolation against stub (or
+real) model artifacts and a seeded SQLite history:
+
+    features_single      create_single_prediction_input, 1 row
+    features_batch_10k   create_batch_prediction_input, 10k rows
+    scaler_sklearn       scaler_X.transform, 1 row
+    scaler_fused         AffineTransform.transform, 1 row
+    lstm_1               LSTM inference, 1 row
+    lstm_1k              LSTM inference, 1k rows
+    intervals_1          TWSVR predict_intervals, 1 row
+    intervals_1k         TWSVR predict_intervals, 1k rows
+    bundle_predict_1     ModelBundle.predict end to end, 1 row
+    metrics_100k         create_metrics_report, 100k rows
+    history_first_page   GET /api/predict/history, newest page
+    history_deep_page    GET /api/predict/history, cursor deep in the table
+
+Usage (from backend/):
+    python -m benchmarks.micro [--model-dir /tmp/bench_models] [--output micro.json] [--save-baseline]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from benchmarks import results as bench_results  # noqa: E402
+from benchmarks.stub_models import build_stub_models, synthetic_history  # noqa: E402
+
+
+def time_calls(fn, repeats, warmup=3):
+    """
+    Per-call latency percentiles of fn()
+
+    Returns:
+        Dictionary from results.percentiles
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return bench_results.percentiles(samples)
+
+
+def model_cases(bundle, repeats):
+    from models.twsvr_model import TWVSRPredictor
+    from utils.metrics import create_metrics_report
+    from utils.preprocessing import create_batch_prediction_input, create_single_prediction_input
+
+    X, y = synthetic_history(n_hours=10000)
+    dates = (np.datetime64('2030-01-01') + np.arange(10000) // 24).astype(str)
+    X_one = X[:1]
+    X_scaled = bundle.x_transform.transform(X)
+    X_scaled_one = X_scaled[:1]
+
+    twsvr = TWVSRPredictor()
+    twsvr.svr_lower, twsvr.svr_upper = bundle.svr_lower, bundle.svr_upper
+    point = bundle.lstm.predict(X_scaled[:1000, np.newaxis, :]).ravel()
+
+    rng = np.random.default_rng(0)
+    y_true = rng.uniform(800, 2200, 100000)
+    y_pred = y_true + rng.normal(0, 40, len(y_true))
+
+    cases = {
+        'features_single': lambda: create_single_prediction_input(21.5, 14, '2030-06-01'),
+        'features_batch_10k': lambda: create_batch_prediction_input(dates, X[:, 1], X[:, 0]),
+        'scaler_sklearn': lambda: bundle.scaler_X.transform(X_one),
+        'scaler_fused': lambda: bundle.x_transform.transform(X_one),
+        'lstm_1': lambda: bundle.lstm.predict(X_scaled_one[:, np.newaxis, :]),
+        'lstm_1k': lambda: bundle.lstm.predict(X_scaled[:1000, np.newaxis, :]),
+        'intervals_1': lambda: twsvr.predict_intervals(X_scaled_one, point[:1]),
+        'intervals_1k': lambda: twsvr.predict_intervals(X_scaled[:1000], point),
+        'bundle_predict_1': lambda: bundle.predict(X_one),
+        'metrics_100k': lambda: create_metrics_report(y_true, y_pred, y_pred - 60, y_pred + 60),
+    }
+    heavy = {'features_batch_10k', 'lstm_1k', 'intervals_1k', 'metrics_100k'}
+    return {
+        name: time_calls(fn, max(5, repeats // 10) if name in heavy else repeats)
+        for name, fn in cases.items()
+    }
+
+
+def history_cases(app, n_rows, repeats):
+    from flask_jwt_extended import create_access_token
+
+    from benchmarks.bench_history import seed
+    from routes.predictions import encode_cursor
+    from schemas.models import Prediction
+
+    client = app.test_client()
+    with app.app_context():
+        user_id = seed(n_rows, n_users=4)
+        headers = {'Authorization': f"Bearer {create_access_token(identity=str(user_id))}"}
+        row = (Prediction.query.filter_by(user_id=user_id)
+               .order_by(Prediction.timestamp.desc(), Prediction.prediction_id.desc())
+               .offset(n_rows // 8).first())
+        cursor = encode_cursor(row.timestamp, row.prediction_id)
+
+    def page(params):
+        response = client.get('/api/predict/history', query_string=params, headers=headers)
+        assert response.status_code == 200, response.get_json()
+
+    return {
+        'history_first_page': time_calls(lambda: page({'limit': 20}), repeats),
+        'history_deep_page': time_calls(lambda: page({'limit': 20, 'cursor': cursor}), repeats),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-dir', default='/tmp/bench_models', help='Stub artifacts are written here if missing')
+    parser.add_argument('--version', default='stub', help='Model version to benchmark (a real one works too)')
+    parser.add_argument('--history-rows', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=300)
+    bench_results.add_arguments(parser, 'micro')
+    args = parser.parse_args()
+
+    if args.version == 'stub':
+        build_stub_models(args.model_dir, args.version)
+
+    from app import create_app
+    from config import TestingConfig
+    from models.registry import registry
+
+    database = os.path.join(tempfile.mkdtemp(prefix='bench_micro_'), 'micro.db')
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+        MODEL_DIR = args.model_dir
+        MODEL_VERSION = args.version
+        MODEL_WATCH_INTERVAL = 0
+
+    app = create_app(BenchConfig)
+    bundle = registry.warmup()
+
+    results = model_cases(bundle, args.repeats)
+    results.update(history_cases(app, args.history_rows, args.repeats))
+
+    print(f"{'case':>20} | {'p50':>10} {'p95':>10} {'p99':>10} | {'calls/s':>10}")
+    for name, metrics in results.items():
+        print(f"{name:>20} | {metrics['p50_ms']:>8.3f}ms {metrics['p95_ms']:>8.3f}ms "
+              f"{metrics['p99_ms']:>8.3f}ms | {metrics['calls_per_s']:>10.1f}")
+
+    bench_results.finish(args, 'micro', results, {
+        'model_dir': args.model_dir, 'version': args.version,
+        'history_rows': args.history_rows, 'repeats': args.repeats
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark result files and baseline comparison
+
+Results are JSON: {"suite", "environment", "results": {case: {metric: value}}}.
+Metric names say which way is better: anything ending in `_per_s` is a
+throughput (higher is better), anything ending in `_ms` is a latency
+(lower is better); other fields (request and error counts) are recorded
+but not compared. A case regresses when a metric is worse than the
+baseline by more than the tolerance.
+
+Usage (from backend/):
+    python -m benchmarks.results current.json benchmarks/baselines/micro.json [--tolerance 0.15]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+
+
+def environment():
+    """Where the numbers came from, so baselines are only compared like for like"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count()
+    }
+
+
+def percentiles(samples):
+    """
+    Latency summary of per-call durations in seconds
+
+    Returns:
+        Dictionary with p50_ms, p95_ms, p99_ms and calls_per_s
+    """
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    total = sum(ordered)
+    return {
+        'p50_ms': round(pick(0.50), 4),
+        'p95_ms': round(pick(0.95), 4),
+        'p99_ms': round(pick(0.99), 4),
+        'calls_per_s': round(len(ordered) / total, 2) if total else None
+    }
+
+
+def higher_is_better(metric):
+    return metric.endswith('_per_s')
+
+
+def is_compared(metric):
+    return metric.endswith(('_per_s', '_ms'))
+
+
+def compare(current, baseline, tolerance=0.1):
+    """
+    Metrics that got worse than the baseline by more than tolerance
+
+    Args:
+        current: Results dictionary ({case: {metric: value}})
+        baseline: Baseline results dictionary
+        tolerance: Allowed relative slowdown (0.1 = 10%)
+
+    Returns:
+        List of (case, metric, baseline value, current value, relative change) tuples
+    """
+    regressions = []
+    for case, metrics in current.items():
+        for metric, value in metrics.items():
+            reference = baseline.get(case, {}).get(metric)
+            if not is_compared(metric) or not isinstance(value, (int, float)) or not isinstance(reference, (int, float)) or not reference:
+                continue
+            change = (value - reference) / reference
+            worse = -change if higher_is_better(metric) else change
+            if worse > tolerance:
+                regressions.append((case, metric, reference, value, change))
+    return regressions
+
+
+def save(path, suite, results, settings=None):
+    """Write a results file"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'suite': suite, 'environment': environment(), 'settings': settings or {},
+                   'results': results}, f, indent=2)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def report(results, baseline_path, tolerance):
+    """
+    Print a comparison against a baseline file if it exists
+
+    Returns:
+        True when nothing regressed (or there is no baseline)
+    """
+    if not baseline_path or not os.path.exists(baseline_path):
+        if baseline_path:
+            print(f"No baseline at {baseline_path}; run with --save-baseline to create one")
+        return True
+
+    baseline = load(baseline_path)
+    print(f"\nBaseline {baseline_path} (commit {baseline['environment'].get('commit')}, "
+          f"{baseline['environment'].get('created')}), tolerance {tolerance:.0%}")
+    regressions = compare(results, baseline['results'], tolerance)
+    for case, metric, reference, value, change in regressions:
+        print(f"REGRESSION {case} {metric}: {reference} -> {value} ({change:+.1%})")
+    if not regressions:
+        print('No regressions')
+    return not regressions
+
+
+def add_arguments(parser, suite):
+    """--output / --baseline / --save-baseline / --tolerance, shared by every suite"""
+    parser.add_argument('--output', default=None, help='Write JSON results here')
+    parser.add_argument('--baseline', default=os.path.join(BASELINE_DIR, f'{suite}.json'),
+                        help='Compare against this results file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Allowed relative regression')
+
+
+def finish(args, suite, results, settings=None):
+    """
+    Write results, compare with the baseline and exit 1 on regression
+    """
+    if args.output:
+        save(args.output, suite, results, settings)
+    passed = report(results, None if args.save_baseline else args.baseline, args.tolerance)
+    if args.save_baseline:
+        save(args.baseline, suite, results, settings)
+        print(f"Saved baseline {args.baseline}")
+    if not passed:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('current')
+    parser.add_argument('baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    args = parser.parse_args()
+    if not report(load(args.current)['results'], args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Small, deterministic model artifacts for benchmarks
+
+Writes a complete serving version (LSTM, both TWSVR bounds, scalers and
+model.json, in the layout train.py produces) without training on real
+data: the scalers and interval models are fit on synthetic hourly
+history and the LSTM keeps its initial weights. Latency and throughput
+depend on the architecture, not on the weights, so the results are
+comparable with a trained model of the same size.
+
+Usage (from backend/):
+    python -m benchmarks.stub_models --model-dir /tmp/bench_models [--version stub]
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+from utils.features import build_feature_matrix  # noqa: E402
+
+
+def synthetic_history(n_hours=8760, seed=0):
+    """
+    Hourly features and a temperature/daily-cycle shaped load
+
+    Returns:
+        Tuple of (X [n, 4] float32, y [n] float64)
+    """
+    rng = np.random.default_rng(seed)
+    hours = np.arange(n_hours)
+    temperature = 15 + 10 * np.sin(2 * np.pi * hours / 8760) + 3 * rng.standard_normal(n_hours)
+    X, _ = build_feature_matrix(temperature, hours % 24, np.datetime64('2024-01-01') + hours // 24)
+    y = (1200 + 2 * (temperature - 18) ** 2 + 150 * np.sin(2 * np.pi * (hours % 24 - 6) / 24)
+         + 30 * rng.standard_normal(n_hours))
+    return X, y
+
+
+def build_stub_models(model_dir, version='stub', lstm_units=64, seed=0):
+    """
+    Write (or reuse) a stub model version
+
+    Args:
+        model_dir: MODEL_DIR to write into
+        version: Version directory name
+        lstm_units: LSTM size (the production default is 64)
+        seed: Random seed for data and weights
+
+    Returns:
+        Path of the version directory
+    """
+    path = os.path.join(model_dir, version)
+    metadata_path = os.path.join(path, 'model.json')
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            if json.load(f).get('stub', {}).get('lstm_units') == lstm_units:
+                return path
+
+    import tensorflow as tf
+    from models.lstm_model import LSTMForecaster
+    from models.twsvr_model import TWVSRPredictor
+    from train import save_version
+
+    tf.keras.utils.set_random_seed(seed)
+    X, y = synthetic_history(seed=seed)
+
+    forecaster = LSTMForecaster()
+    forecaster.build_model(input_shape=X.shape[1], lstm_units=lstm_units)
+    X_scaled = forecaster.scaler_X.fit_transform(X)
+    y_scaled = forecaster.scaler_y.fit_transform(y.reshape(-1, 1)).ravel()
+    residuals = y_scaled - forecaster.engine.predict(X_scaled).ravel()
+
+    twsvr = TWVSRPredictor(epsilon=0.05, C=1, backend='nystroem', n_components=100, random_state=seed)
+    twsvr.train(X_scaled, residuals, n_jobs=1)
+
+    save_version(path, forecaster, twsvr, {
+        'interval_mode': 'residual',
+        'twsvr_backend': 'nystroem',
+        'stub': {'lstm_units': lstm_units, 'seed': seed}
+    })
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-dir', default='/tmp/bench_models')
+    parser.add_argument('--version', default='stub')
+    parser.add_argument('--lstm-units', type=int, default=64)
+    args = parser.parse_args()
+    print(build_stub_models(args.model_dir, args.version, args.lstm_units))
+
+
+if __name__ == '__main__':
+    main()
@@ -22,6 +22,84 @@ class Config:
     # File Upload
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploaded_data')
     MAX_CONTENT_LENGTH = 52428800  # 50MB
+    UPLOAD_WORKERS = int(os.getenv('UPLOAD_WORKERS', 2))  # background scoring threads per process
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 5000))  # rows scored per model call
+
+    # Model serving
+    MODEL_DIR = os.getenv('MODEL_DIR', 'trained_models')
+    MODEL_NAME = os.getenv('MODEL_NAME', 'LSTM+TWSVR')
+    MODEL_VERSION = os.getenv('MODEL_VERSION', 'default')  # 'default' = flat files in MODEL_DIR
+    MODEL_PRELOAD = os.getenv('MODEL_PRELOAD', 'false').lower() == 'true'
+    MODEL_WATCH_INTERVAL = float(os.getenv('MODEL_WATCH_INTERVAL', 5))  # seconds, 0 disables
+    # LSTM serving backend: 'keras' or 'numpy' (TensorFlow-free, needs exported .npz)
+    LSTM_BACKEND = os.getenv('LSTM_BACKEND', 'keras')
+    # 'model' runs LSTM+TWSVR; 'table' interpolates the precomputed lookup table
+    # (python -m models.lookup_table) and falls back to the model if none exists
+    PREDICTION_MODE = os.getenv('PREDICTION_MODE', 'model')
+
+    # Prediction cache, opt-in: hits answer for the temperature rounded to
+    # PREDICTION_CACHE_QUANTUM, not the exact input (size 0 disables; shared
+    # path enables a node-wide SQLite cache)
+    PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 0))
+    PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', 3600))  # seconds
+    PREDICTION_CACHE_QUANTUM = float(os.getenv('PREDICTION_CACHE_QUANTUM', 0.1))  # °C
+    PREDICTION_CACHE_SHARED_PATH = os.getenv('PREDICTION_CACHE_SHARED_PATH', '')
+
+    # Micro-batching of concurrent single predictions (needs threaded workers)
+    MICRO_BATCHING = os.getenv('MICRO_BATCHING', 'false').lower() == 'true'
+    BATCH_WINDOW_MS = float(os.getenv('BATCH_WINDOW_MS', 2))
+    BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', 64))
+    BATCH_TIMEOUT = float(os.getenv('BATCH_TIMEOUT', 10))  # seconds a request waits on the collector thread
+
+    # Prediction persistence: write-behind queues rows and flushes them in bulk
+    PREDICTION_WRITE_BEHIND = os.getenv('PREDICTION_WRITE_BEHIND', 'false').lower() == 'true'
+    WRITE_BEHIND_MAX_ROWS = int(os.getenv('WRITE_BEHIND_MAX_ROWS', 500))
+    WRITE_BEHIND_INTERVAL_MS = float(os.getenv('WRITE_BEHIND_INTERVAL_MS', 200))
+    WRITE_BEHIND_MAX_PENDING = int(os.getenv('WRITE_BEHIND_MAX_PENDING', 10000))  # rows kept while the DB fails
+
+    # Instrumentation (/api/metrics); a shared directory merges gunicorn workers
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_DIR = os.getenv('METRICS_DIR', '')
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))  # seconds
+
+    # Request profiling (off by default; costs nothing while disabled).
+    # Profiles requests under PROFILE_PATHS that send PROFILE_HEADER: PROFILE_TOKEN,
+    # plus a random PROFILE_SAMPLE_RATE fraction of them
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    PROFILE_HEADER = os.getenv('PROFILE_HEADER', 'X-Profile')
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')  # empty disables the header trigger
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 50))
+    PROFILE_PATHS = os.getenv('PROFILE_PATHS', '/api/predict/,/api/auth/')
+
+    # Password hashing: bcrypt cost and a dedicated pool so logins cannot starve predictions.
+    # Beyond PASSWORD_HASH_MAX_PENDING queued hashes, logins get a 503 instead of waiting
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 32))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))  # seconds
+
+    # User snapshots for token checks, keyed on the JWT subject (size 0 disables)
+    IDENTITY_CACHE_SIZE = int(os.getenv('IDENTITY_CACHE_SIZE', 10000))
+    IDENTITY_CACHE_TTL = float(os.getenv('IDENTITY_CACHE_TTL', 30))  # seconds
+
+    # ASGI serving mode (asgi.py): thread pools behind the async routes, and the
+    # WSGI bridge that serves every other route. Keep ASGI_DB_WORKERS within the
+    # SQLAlchemy connection pool (5 by default)
+    ASGI_INFERENCE_WORKERS = int(os.getenv('ASGI_INFERENCE_WORKERS', 2))
+    ASGI_DB_WORKERS = int(os.getenv('ASGI_DB_WORKERS', 4))
+    ASGI_WSGI_WORKERS = int(os.getenv('ASGI_WSGI_WORKERS', 8))
+    # Login and history reads on an AsyncSession (aiosqlite / asyncpg, derived
+    # from SQLALCHEMY_DATABASE_URI); off, or without the driver, they use ASGI_DB_WORKERS
+    ASGI_ASYNC_DB = os.getenv('ASGI_ASYNC_DB', 'true').lower() == 'true'
+
+    # Batch prediction
+    BATCH_MAX_ROWS = int(os.getenv('BATCH_MAX_ROWS', 10000))
+
+    # Prediction history page size cap
+    HISTORY_MAX_LIMIT = int(os.getenv('HISTORY_MAX_LIMIT', 200))
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))  # rows per streamed chunk
     
     # CORS
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000')
@@ -38,3 +116,5 @@ class TestingConfig(Config):
     DEBUG = True
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    MODEL_PRELOAD = False
+    BCRYPT_ROUNDS = 4  # bcrypt minimum; keeps test logins fast
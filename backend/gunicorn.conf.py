@@ -0,0 +1,50 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Load the app (and, with LSTM_BACKEND=numpy, every model artifact) once in
+# the master process so forked workers share it copy-on-write.
+# TensorFlow's thread pools do not survive fork, so with the Keras backend
+# the master never loads a model and each worker warms up after fork.
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+preload_app = True
+if os.getenv('LSTM_BACKEND', 'keras') == 'numpy':
+    os.environ.setdefault('MODEL_PRELOAD', 'true')
+else:
+    os.environ['MODEL_PRELOAD'] = 'false'
+
+
+def post_fork(server, worker):
+    """Load the active model in the worker when the master did not preload it"""
+    if os.environ['MODEL_PRELOAD'] == 'true':
+        return
+    from models.registry import registry, ModelUnavailableError
+    try:
+        registry.warmup()
+    except ModelUnavailableError as e:
+        logger.warning("Model warmup failed in worker %s: %s", worker.pid, e)
+
+
+def on_starting(server):
+    """Start each deployment with empty per-worker metrics snapshots"""
+    metrics_dir = os.getenv('METRICS_DIR')
+    if metrics_dir and os.path.isdir(metrics_dir):
+        for name in os.listdir(metrics_dir):
+            if name.startswith('metrics-') and name.endswith('.json'):
+                os.remove(os.path.join(metrics_dir, name))
+
+
+def when_ready(server):
+    """Publish the master's preload metrics (model load, startup queries)"""
+    from utils.instrumentation import instrumentation
+    instrumentation.flush()
+
+
+def worker_exit(server, worker):
+    """Flush write-behind predictions and final metrics before the worker goes away"""
+    from utils.instrumentation import instrumentation
+    from utils.persistence import prediction_writer
+    prediction_writer.close()
+    instrumentation.flush()
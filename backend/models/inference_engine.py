@@ -0,0 +1,59 @@
+import numpy as np
+import tensorflow as tf
+
+
+class InferenceEngine:
+    """
+    Graph-mode inference wrapper around a Keras model
+    Skips the per-call data adapter and tf.data pipeline that
+    `model.predict` builds, so small batches cost only the math
+    """
+
+    def __init__(self, model, timesteps=1, n_features=None):
+        """
+        Wrap a loaded Keras model in a traced tf.function
+
+        Args:
+            model: Loaded or freshly built Keras model
+            timesteps: Number of timesteps per sample
+            n_features: Number of input features (read from the model if None)
+        """
+        self.model = model
+        self.timesteps = timesteps
+        self.n_features = n_features or int(model.inputs[0].shape[-1])
+
+        # Fixed signature with a dynamic batch dimension: one trace serves every batch size
+        self._forward = tf.function(
+            self._call_model,
+            input_signature=[tf.TensorSpec([None, self.timesteps, self.n_features], tf.float32)]
+        )
+
+    def _call_model(self, x):
+        return self.model(x, training=False)
+
+    def warmup(self, batch_sizes=(1,)):
+        """
+        Trace the graph and run it once so the first request is not slow
+
+        Args:
+            batch_sizes: Batch sizes to run through the graph
+        """
+        for batch_size in batch_sizes:
+            self.predict(np.zeros((batch_size, self.timesteps, self.n_features), dtype=np.float32))
+
+    def predict(self, X):
+        """
+        Run a forward pass
+
+        Args:
+            X: Scaled features, shaped [samples, timesteps, features]
+               or [samples, features] for single-timestep input
+
+        Returns:
+            2D numpy array of scaled predictions, one row per sample
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 2:
+            X = X.reshape((X.shape[0], self.timesteps, self.n_features))
+
+        return self._forward(tf.constant(X)).numpy()
@@ -0,0 +1,176 @@
+"""
+Precomputed forecast table over the discrete feature grid
+
+Hour (24) x month (12) x weekday (7) gives 2,016 combinations; temperature
+is sampled on a regular grid over the validated -50..60 °C range and
+answered by linear interpolation.
+
+Usage (from backend/):
+    python -m models.lookup_table --version default --resolution 0.5
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+TABLE_FILE = 'lookup_table.npy'
+META_FILE = 'lookup_table.json'
+
+
+def _grid_features(temperatures):
+    """Every (temperature, hour, month, weekday) row, in table order"""
+    hours, months, weekdays, temps = np.meshgrid(
+        np.arange(24), np.arange(1, 13), np.arange(7), temperatures, indexing='ij'
+    )
+    return np.column_stack([temps.ravel(), hours.ravel(), months.ravel(), weekdays.ravel()])
+
+
+def _evaluate(bundle, X, chunk_size):
+    outputs = np.empty((len(X), 3), dtype=np.float32)
+    for start in range(0, len(X), chunk_size):
+        y_pred, lower, upper = bundle.predict(X[start:start + chunk_size])
+        outputs[start:start + chunk_size] = np.column_stack([y_pred, lower, upper])
+    return outputs
+
+
+def build_table(bundle, output_dir, resolution=0.5, t_min=-50.0, t_max=60.0, chunk_size=50000):
+    """
+    Evaluate the full model over the feature grid and save it
+
+    Args:
+        bundle: Loaded ModelBundle to evaluate
+        output_dir: Directory to write lookup_table.npy/.json into
+        resolution: Temperature step in °C
+        t_min: Lowest temperature in the grid
+        t_max: Highest temperature in the grid
+        chunk_size: Rows per model call
+
+    Returns:
+        Metadata dictionary, including the maximum interpolation error
+    """
+    start = time.perf_counter()
+    n_temps = int(round((t_max - t_min) / resolution)) + 1
+    temperatures = t_min + resolution * np.arange(n_temps)
+
+    outputs = _evaluate(bundle, _grid_features(temperatures), chunk_size)
+    table = outputs.reshape((24, 12, 7, n_temps, 3))
+    np.save(os.path.join(output_dir, TABLE_FILE), table)
+
+    # Worst case for linear interpolation is between grid points: check every midpoint
+    midpoints = temperatures[:-1] + resolution / 2
+    X_mid = _grid_features(midpoints)
+    exact = _evaluate(bundle, X_mid, chunk_size)
+    approx = np.column_stack(LookupTable(table, t_min, resolution).predict(X_mid))
+    max_error = np.max(np.abs(exact - approx), axis=0)
+
+    meta = {
+        't_min': float(t_min),
+        't_max': float(temperatures[-1]),
+        'resolution': float(resolution),
+        'model_version': bundle.version,
+        'max_interpolation_error': {
+            'predicted_load': float(max_error[0]),
+            'lower_bound': float(max_error[1]),
+            'upper_bound': float(max_error[2])
+        },
+        'build_seconds': round(time.perf_counter() - start, 2)
+    }
+    with open(os.path.join(output_dir, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    return meta
+
+
+class LookupTable:
+    """
+    Interpolating predictor over a precomputed [hour, month, weekday, temperature, 3] table
+    """
+
+    def __init__(self, table, t_min, resolution):
+        self.table = table
+        self.t_min = t_min
+        self.resolution = resolution
+        self.n_temps = table.shape[3]
+        self.t_max = t_min + resolution * (self.n_temps - 1)
+
+    @classmethod
+    def load(cls, model_dir):
+        """
+        Memory-map a table written by build_table
+
+        Returns:
+            LookupTable, or None if the directory has no table
+        """
+        table_path = os.path.join(model_dir, TABLE_FILE)
+        if not os.path.exists(table_path):
+            return None
+        with open(os.path.join(model_dir, META_FILE)) as f:
+            meta = json.load(f)
+        return cls(np.load(table_path, mmap_mode='r'), meta['t_min'], meta['resolution'])
+
+    def predict(self, X_input):
+        """
+        Interpolate predictions over temperature
+
+        Args:
+            X_input: 2D array of [temperature, hour, month, weekday] rows
+
+        Returns:
+            Tuple of (predicted_load, lower_bound, upper_bound) 1D arrays
+
+        Raises:
+            ValueError: If a row falls outside the table's grid
+        """
+        X = np.asarray(X_input, dtype=float)
+        # Fancy indexing would raise IndexError past the end and wrap negative indices,
+        # and the temperature clip below would silently answer for the nearest edge.
+        # Checked as "not inside" so NaN is rejected too.
+        checks = (
+            (X[:, 0], self.t_min, self.t_max, f"Temperature must be between {self.t_min:g}°C and {self.t_max:g}°C"),
+            (X[:, 1], 0, 23, "Hour must be between 0 and 23"),
+            (X[:, 2], 1, 12, "Month must be between 1 and 12"),
+            (X[:, 3], 0, 6, "Weekday must be between 0 and 6"),
+        )
+        for values, low, high, message in checks:
+            outside = ~((values >= low) & (values <= high))
+            if outside.any():
+                raise ValueError(f"{message} (lookup table row {int(np.argmax(outside))})")
+
+        hours = X[:, 1].astype(np.intp)
+        months = X[:, 2].astype(np.intp) - 1
+        weekdays = X[:, 3].astype(np.intp)
+
+        position = np.clip((X[:, 0] - self.t_min) / self.resolution, 0, self.n_temps - 1)
+        lower_index = np.minimum(position.astype(np.intp), self.n_temps - 2)
+        fraction = (position - lower_index)[:, None]
+
+        left = self.table[hours, months, weekdays, lower_index]
+        right = self.table[hours, months, weekdays, lower_index + 1]
+        values = left + (right - left) * fraction
+
+        return values[:, 0], values[:, 1], values[:, 2]
+
+
+def main():
+    from models.registry import ModelRegistry
+
+    parser = argparse.ArgumentParser(description='Precompute the forecast lookup table for a model version')
+    parser.add_argument('--model-dir', default='trained_models')
+    parser.add_argument('--version', default='default')
+    parser.add_argument('--resolution', type=float, default=0.5, help='Temperature step in °C')
+    parser.add_argument('--backend', default='keras', choices=['keras', 'numpy'])
+    args = parser.parse_args()
+
+    model_registry = ModelRegistry()
+    model_registry.model_dir = args.model_dir
+    model_registry.lstm_backend = args.backend
+    bundle = model_registry.get(version=args.version)
+
+    meta = build_table(bundle, bundle.path, resolution=args.resolution)
+    print(json.dumps(meta, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,10 @@
 import numpy as np
+import tensorflow as tf
 from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.optimizers import Adam
 from sklearn.preprocessing import MinMaxScaler
+from models.inference_engine import InferenceEngine
 import joblib
 import os
 
@@ -14,6 +16,7 @@ class LSTMForecaster:
     
     def __init__(self):
         self.model = None
+        self.engine = None
         self.scaler_X = MinMaxScaler(feature_range=(0, 1))
         self.scaler_y = MinMaxScaler(feature_range=(0, 1))
     
@@ -40,10 +43,11 @@ class LSTMForecaster:
         
         optimizer = Adam(learning_rate=0.001)
         self.model.compile(optimizer=optimizer, loss='mse', metrics=['mae'])
+        self.engine = InferenceEngine(self.model)
         
         return self.model
     
-    def train(self, X_train, y_train, epochs=50, batch_size=32, validation_split=0.2):
+    def train(self, X_train, y_train, epochs=50, batch_size=32, validation_split=0.2, verbose=1):
         """
         Train the LSTM model
         
@@ -53,6 +57,7 @@ class LSTMForecaster:
             epochs: Number of training epochs
             batch_size: Batch size for training
             validation_split: Validation split ratio
+            verbose: Keras verbosity (0 silences per-epoch progress)
         
         Returns:
             Training history
@@ -62,7 +67,7 @@ class LSTMForecaster:
         y_scaled = self.scaler_y.fit_transform(y_train.reshape(-1, 1))
         
         # Reshape for LSTM [samples, timesteps, features]
-        X_scaled = X_scaled.reshape((X_scaled.shape, 1, X_scaled.shape))
+        X_scaled = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
         
         # Train model
         history = self.model.fit(
@@ -70,11 +75,49 @@ class LSTMForecaster:
             epochs=epochs,
             batch_size=batch_size,
             validation_split=validation_split,
-            verbose=1
+            verbose=verbose
         )
         
         return history
     
+    def train_stream(self, make_chunks, epochs=50, batch_size=32):
+        """
+        Train from chunked data without holding it all in memory
+        
+        Args:
+            make_chunks: Callable returning a fresh iterator of (X, y) chunks,
+                e.g. lambda: store.iter_chunks(stop=split)
+            epochs: Number of training epochs
+            batch_size: Batch size for training
+        
+        Returns:
+            Training history
+        """
+        # Fit scalers incrementally: one pass over the chunks
+        for X_chunk, y_chunk in make_chunks():
+            self.scaler_X.partial_fit(X_chunk)
+            self.scaler_y.partial_fit(y_chunk.reshape(-1, 1))
+        
+        n_features = self.scaler_X.n_features_in_
+        
+        def scaled_chunks():
+            for X_chunk, y_chunk in make_chunks():
+                X_scaled = self.scaler_X.transform(X_chunk).astype(np.float32)
+                y_scaled = self.scaler_y.transform(y_chunk.reshape(-1, 1)).astype(np.float32)
+                yield X_scaled.reshape((X_scaled.shape[0], 1, n_features)), y_scaled
+        
+        dataset = tf.data.Dataset.from_generator(
+            scaled_chunks,
+            output_signature=(
+                tf.TensorSpec(shape=(None, 1, n_features), dtype=tf.float32),
+                tf.TensorSpec(shape=(None, 1), dtype=tf.float32)
+            )
+        ).unbatch().batch(batch_size).prefetch(tf.data.AUTOTUNE)
+        
+        history = self.model.fit(dataset, epochs=epochs, verbose=1)
+        
+        return history
+    
     def predict(self, X_test):
         """
         Make predictions on test data
@@ -86,9 +129,9 @@ class LSTMForecaster:
             Predictions (unscaled)
         """
         X_scaled = self.scaler_X.transform(X_test)
-        X_scaled = X_scaled.reshape((X_scaled.shape, 1, X_scaled.shape))
+        X_scaled = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
         
-        predictions_scaled = self.model.predict(X_scaled, verbose=0)
+        predictions_scaled = self.engine.predict(X_scaled)
         predictions = self.scaler_y.inverse_transform(predictions_scaled)
         
         return predictions.flatten()
@@ -122,6 +165,7 @@ class LSTMForecaster:
             filepath: Path to load model
         """
         self.model = load_model(filepath)
+        self.engine = InferenceEngine(self.model)
         
         scaler_X_path = filepath.replace('.h5', '_scaler_X.pkl')
         scaler_y_path = filepath.replace('.h5', '_scaler_y.pkl')
@@ -0,0 +1,196 @@
+"""
+NumPy-only forward pass for the stacked LSTM forecaster
+
+The exporter needs TensorFlow (it reads the trained `.h5`), but serving
+from the exported `.npz` does not import TensorFlow at all.
+
+Usage (from backend/):
+    python -m models.numpy_lstm trained_models/lstm_model.h5 trained_models/lstm_model.npz
+"""
+import argparse
+
+import numpy as np
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'tanh': np.tanh,
+    'sigmoid': lambda x: 1.0 / (1.0 + np.exp(-x)),
+    # Keras 3 definition, relu6(x + 3) / 6 (Keras 2 used clip(0.2x + 0.5))
+    'hard_sigmoid': lambda x: np.clip(x + 3.0, 0.0, 6.0) / 6.0,
+}
+
+
+def export_weights(model_path, output_path):
+    """
+    Export a trained Keras LSTM/Dense stack to a compact `.npz`
+
+    Args:
+        model_path: Path to the trained Keras model (`.h5`)
+        output_path: Path to write the `.npz` weights file
+
+    Returns:
+        List of exported layer types
+    """
+    from tensorflow.keras.models import load_model
+
+    model = load_model(model_path, compile=False)
+
+    arrays = {}
+    layer_specs = []
+    for layer in model.layers:
+        kind = layer.__class__.__name__
+        if kind == 'Dropout':
+            continue  # Inference-time no-op
+        if kind not in ('LSTM', 'Dense'):
+            raise ValueError(f"Unsupported layer for NumPy export: {kind}")
+
+        config = layer.get_config()
+        index = len(layer_specs)
+        weights = [np.asarray(w, dtype=np.float32) for w in layer.get_weights()]
+
+        if kind == 'LSTM':
+            arrays[f'{index}_kernel'], arrays[f'{index}_recurrent_kernel'], arrays[f'{index}_bias'] = weights
+            layer_specs.append(
+                f"LSTM:{config['activation']}:{config['recurrent_activation']}:{int(config['return_sequences'])}"
+            )
+        else:
+            arrays[f'{index}_kernel'], arrays[f'{index}_bias'] = weights
+            layer_specs.append(f"Dense:{config['activation']}")
+
+    arrays['layers'] = np.array(layer_specs)
+    np.savez_compressed(output_path, **arrays)
+
+    print(f"Exported {len(layer_specs)} layers from {model_path} to {output_path}")
+    return layer_specs
+
+
+class NumpyLSTM:
+    """
+    Drop-in replacement for InferenceEngine backed by exported weights
+    """
+
+    def __init__(self, weights_path):
+        """
+        Load exported weights
+
+        Args:
+            weights_path: Path to the `.npz` produced by export_weights
+        """
+        with np.load(weights_path) as data:
+            self.layers = []
+            for index, spec in enumerate(data['layers']):
+                parts = str(spec).split(':')
+                if parts[0] == 'LSTM':
+                    self.layers.append({
+                        'type': 'LSTM',
+                        'activation': ACTIVATIONS[parts[1]],
+                        'recurrent_activation': ACTIVATIONS[parts[2]],
+                        'return_sequences': parts[3] == '1',
+                        'kernel': data[f'{index}_kernel'],
+                        'recurrent_kernel': data[f'{index}_recurrent_kernel'],
+                        'bias': data[f'{index}_bias'],
+                    })
+                else:
+                    self.layers.append({
+                        'type': 'Dense',
+                        'activation': ACTIVATIONS[parts[1]],
+                        'kernel': data[f'{index}_kernel'],
+                        'bias': data[f'{index}_bias'],
+                    })
+
+        self.n_features = self.layers[0]['kernel'].shape[0]
+
+    def _lstm(self, layer, x):
+        """Run one LSTM layer over x shaped [samples, timesteps, features]"""
+        samples, timesteps, _ = x.shape
+        units = layer['recurrent_kernel'].shape[0]
+        act = layer['activation']
+        recurrent_act = layer['recurrent_activation']
+
+        # Input projections for every timestep in one matmul
+        x_proj = x @ layer['kernel'] + layer['bias']
+
+        h = np.zeros((samples, units), dtype=np.float32)
+        c = np.zeros((samples, units), dtype=np.float32)
+        outputs = []
+        for t in range(timesteps):
+            z = x_proj[:, t, :] + h @ layer['recurrent_kernel']
+            # Keras gate order: input, forget, cell, output
+            i = recurrent_act(z[:, :units])
+            f = recurrent_act(z[:, units:2 * units])
+            g = act(z[:, 2 * units:3 * units])
+            o = recurrent_act(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * act(c)
+            if layer['return_sequences']:
+                outputs.append(h)
+
+        return np.stack(outputs, axis=1) if layer['return_sequences'] else h
+
+    def warmup(self, batch_sizes=(1,)):
+        """Kept for interface parity with InferenceEngine"""
+        for batch_size in batch_sizes:
+            self.predict(np.zeros((batch_size, 1, self.n_features), dtype=np.float32))
+
+    def predict(self, X):
+        """
+        Run a forward pass
+
+        Args:
+            X: Scaled features, shaped [samples, timesteps, features]
+               or [samples, features] for single-timestep input
+
+        Returns:
+            2D numpy array of scaled predictions, one row per sample
+        """
+        x = np.asarray(X, dtype=np.float32)
+        if x.ndim == 2:
+            x = x.reshape((x.shape[0], 1, x.shape[1]))
+
+        for layer in self.layers:
+            if layer['type'] == 'LSTM':
+                x = self._lstm(layer, x)
+            else:
+                x = layer['activation'](x @ layer['kernel'] + layer['bias'])
+
+        return x
+
+
+def max_abs_error(model_path, weights_path, n_samples=1000, seed=0):
+    """
+    Compare the NumPy forward pass against Keras on random scaled inputs
+
+    Returns:
+        Maximum absolute difference between the two outputs
+    """
+    from tensorflow.keras.models import load_model
+
+    model = load_model(model_path, compile=False)
+    numpy_model = NumpyLSTM(weights_path)
+
+    timesteps = int(model.inputs[0].shape[1])
+    X = np.random.default_rng(seed).random((n_samples, timesteps, numpy_model.n_features), dtype=np.float32)
+
+    expected = model(X, training=False).numpy()
+    return float(np.max(np.abs(expected - numpy_model.predict(X))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export LSTM weights for TensorFlow-free serving')
+    parser.add_argument('model_path', nargs='?', default='trained_models/lstm_model.h5')
+    parser.add_argument('output_path', nargs='?', default='trained_models/lstm_model.npz')
+    parser.add_argument('--tolerance', type=float, default=1e-4)
+    args = parser.parse_args()
+
+    export_weights(args.model_path, args.output_path)
+
+    error = max_abs_error(args.model_path, args.output_path)
+    print(f"Max abs difference vs Keras: {error:.2e}")
+    if error > args.tolerance:
+        raise SystemExit(f"NumPy forward pass exceeds tolerance {args.tolerance}")
+
+
+if __name__ == '__main__':
+    main()
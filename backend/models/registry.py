@@ -0,0 +1,421 @@
+import json
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+
+from models.lookup_table import LookupTable
+from models.scaling import AffineTransform
+from utils.instrumentation import instrumentation
+
+
+class ModelUnavailableError(RuntimeError):
+    """Raised when serving artifacts cannot be loaded"""
+
+
+# One valid [temperature, hour, month, weekday] row on the feature grid;
+# all zeros would be month 0, which the lookup table rejects
+PROBE_ROW = (15.0, 0, 1, 0)
+
+# Prediction.model_used is String(50); a longer label fails every insert on PostgreSQL
+MAX_LABEL_LENGTH = 50
+
+
+def model_label(name, version):
+    """Model label stored with each prediction"""
+    return name if version == 'default' else f"{name}@{version}"
+
+
+class ModelBundle:
+    """
+    Serving artifacts for one model version
+    LSTM point model, the two TWSVR bound models and both scalers
+    """
+
+    def __init__(self, name, version, path, lstm_backend='keras', prediction_mode='model'):
+        """
+        Load every artifact from a model directory
+
+        Args:
+            name: Model name
+            version: Model version
+            path: Directory holding the serving artifacts
+            lstm_backend: 'keras' (graph-mode engine) or 'numpy' (exported .npz)
+            prediction_mode: 'model' to always run the models, 'table' to answer
+                from the precomputed lookup table when the version has one
+        """
+        self.name = name
+        self.version = version
+        self.path = path
+        self.lstm_backend = lstm_backend
+
+        start = time.perf_counter()
+        if lstm_backend == 'numpy':
+            from models.numpy_lstm import NumpyLSTM
+            self.lstm = NumpyLSTM(os.path.join(path, 'lstm_model.npz'))
+        else:
+            from tensorflow.keras.models import load_model
+            from models.inference_engine import InferenceEngine
+            self.lstm = InferenceEngine(load_model(os.path.join(path, 'lstm_model.h5'), compile=False))
+
+        self.svr_lower = joblib.load(os.path.join(path, 'twsvr_lower.pkl'))
+        self.svr_upper = joblib.load(os.path.join(path, 'twsvr_upper.pkl'))
+        self.scaler_X = joblib.load(os.path.join(path, 'scaler_X.pkl'))
+        self.scaler_y = joblib.load(os.path.join(path, 'scaler_y.pkl'))
+        # Plain scale/offset arrays; predict() skips scikit-learn validation
+        self.x_transform = AffineTransform.from_scaler(self.scaler_X)
+        self.y_transform = AffineTransform.from_scaler(self.scaler_y)
+        self.table = LookupTable.load(path) if prediction_mode == 'table' else None
+
+        # Versions written by train.py record how their TWSVR bounds were fit.
+        # 'absolute': bound models predict scaled load directly (legacy layout)
+        # 'residual': bound models predict offsets from the LSTM point prediction
+        self.metadata = {}
+        metadata_path = os.path.join(path, 'model.json')
+        if os.path.exists(metadata_path):
+            with open(metadata_path) as f:
+                self.metadata = json.load(f)
+        self.interval_mode = self.metadata.get('interval_mode', 'absolute')
+
+        # Optional multi-step model (train.py --sequence), loaded on first use
+        self._sequence = None
+        self._sequence_lock = threading.Lock()
+        self.load_seconds = time.perf_counter() - start
+        self.warmed_up = False
+
+    @property
+    def has_sequence(self):
+        return os.path.exists(os.path.join(self.path, 'sequence', 'sequence.json'))
+
+    def get_sequence(self):
+        """
+        Return this version's SequenceForecaster, loading it on first use
+
+        Raises:
+            ModelUnavailableError: If the version has no sequence model, or its files cannot be read
+        """
+        if self._sequence is None:
+            if not self.has_sequence:
+                raise ModelUnavailableError(f"Model version {self.version} has no sequence model")
+            with self._sequence_lock:
+                if self._sequence is None:
+                    from models.sequence_model import SequenceForecaster
+                    sequence = SequenceForecaster()
+                    try:
+                        sequence.load_model(os.path.join(self.path, 'sequence'), backend=self.lstm_backend)
+                    except OSError as e:
+                        raise ModelUnavailableError(
+                            f"Could not load the sequence model of version {self.version}: {e}"
+                        ) from e
+                    self._sequence = sequence
+        return self._sequence
+
+    @property
+    def label(self):
+        """Model label stored with each prediction"""
+        return model_label(self.name, self.version)
+
+    def probe(self):
+        """
+        Run one prediction on PROBE_ROW
+
+        Returns:
+            Tuple of (predicted_load, lower_bound, upper_bound) 1D arrays
+        """
+        return self.predict(np.array([PROBE_ROW]))
+
+    def warmup(self):
+        """Run one prediction so graph tracing and lazy init happen up front"""
+        self.probe()
+        self.warmed_up = True
+
+    def predict(self, X_input):
+        """
+        Run the full LSTM + TWSVR pipeline over a feature matrix
+
+        Args:
+            X_input: 2D array of [temperature, hour, month, weekday] rows
+
+        Returns:
+            Tuple of (predicted_load, lower_bound, upper_bound) 1D arrays
+        """
+        if self.table is not None:
+            with instrumentation.stage('lookup_table'):
+                return self.table.predict(X_input)
+
+        # Scale once; the same matrix feeds the LSTM (as [n, 1, features]) and both SVRs
+        with instrumentation.stage('scale'):
+            X_scaled = self.x_transform.transform(X_input)
+            scaled = np.empty((3, X_scaled.shape[0]))
+        with instrumentation.stage('lstm'):
+            scaled[0] = self.lstm.predict(X_scaled[:, np.newaxis, :]).reshape(-1)
+        with instrumentation.stage('svr'):
+            scaled[1] = self.svr_lower.predict(X_scaled)
+            scaled[2] = self.svr_upper.predict(X_scaled)
+
+        # Inverse-scale points and bounds in one vectorized step
+        with instrumentation.stage('inverse_scale'):
+            if self.interval_mode == 'residual':
+                scaled[1:] += scaled[0]
+            predicted, lower, upper = self.y_transform.inverse(scaled)
+        return predicted, lower, upper
+
+
+class ModelRegistry:
+    """
+    Lazily loaded, process-wide cache of ModelBundles keyed by (name, version)
+
+    Bundles load on first use. Call warmup() before workers fork
+    (gunicorn preload_app) to share the loaded artifacts copy-on-write.
+
+    Versions live in MODEL_DIR/<version>/ and the active one is named in
+    MODEL_DIR/ACTIVE. Every worker polls that pointer file, loads a new
+    version in the background and swaps it in only once it is warm.
+    """
+
+    POINTER_FILE = 'ACTIVE'
+
+    def __init__(self, app=None):
+        self._bundles = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._active = None
+        self._pending = None
+        self._failed_version = None
+        self._last_watch = 0.0
+        self.model_dir = 'trained_models'
+        self.default_name = 'LSTM+TWSVR'
+        self.default_version = 'default'
+        self.lstm_backend = 'keras'
+        self.prediction_mode = 'model'
+        self.watch_interval = 5.0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read registry settings from the Flask config"""
+        self.model_dir = app.config.get('MODEL_DIR', self.model_dir)
+        self.default_name = app.config.get('MODEL_NAME', self.default_name)
+        self.default_version = app.config.get('MODEL_VERSION', self.default_version)
+        self.lstm_backend = app.config.get('LSTM_BACKEND', self.lstm_backend)
+        self.prediction_mode = app.config.get('PREDICTION_MODE', self.prediction_mode)
+        self.watch_interval = app.config.get('MODEL_WATCH_INTERVAL', self.watch_interval)
+        # Loaded bundles and the active version came from the previous settings' MODEL_DIR
+        with self._lock:
+            self._bundles.clear()
+            self._errors.clear()
+        self._active = self._pending = self._failed_version = None
+        self._last_watch = 0.0
+        app.extensions['model_registry'] = self
+
+    def _resolve_path(self, version):
+        # 'default' is the flat layout directly under MODEL_DIR
+        if version == 'default':
+            return self.model_dir
+        return os.path.join(self.model_dir, version)
+
+    def _read_pointer(self):
+        try:
+            with open(os.path.join(self.model_dir, self.POINTER_FILE)) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _write_pointer(self, version):
+        # Write-then-rename so other workers never read a half-written file
+        pointer = os.path.join(self.model_dir, self.POINTER_FILE)
+        tmp_path = f"{pointer}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, pointer)
+
+    def _watch_pointer(self):
+        """Start a background swap if another process moved the pointer"""
+        if self.watch_interval <= 0:
+            return
+        now = time.monotonic()
+        if now - self._last_watch < self.watch_interval:
+            return
+        self._last_watch = now
+
+        version = self._read_pointer()
+        if version and version not in (self._active, self._pending, self._failed_version):
+            self.activate(version, persist=False)
+
+    def active_version(self):
+        """Version served when no explicit version is requested"""
+        if self._active is None:
+            self._active = self._read_pointer() or self.default_version
+        else:
+            self._watch_pointer()
+        return self._active
+
+    def label_fits(self, version):
+        """Whether predictions made by a version can store its label"""
+        return len(model_label(self.default_name, version)) <= MAX_LABEL_LENGTH
+
+    def list_versions(self):
+        """
+        List servable model versions on disk
+
+        Returns:
+            Sorted list of version names (directories whose label would not
+            fit Prediction.model_used are left out)
+        """
+        versions = []
+        if os.path.exists(os.path.join(self.model_dir, 'scaler_X.pkl')):
+            versions.append('default')
+        if os.path.isdir(self.model_dir):
+            versions.extend(
+                entry for entry in sorted(os.listdir(self.model_dir))
+                if os.path.exists(os.path.join(self.model_dir, entry, 'scaler_X.pkl')) and self.label_fits(entry)
+            )
+        return versions
+
+    def get(self, name=None, version=None):
+        """
+        Return a loaded ModelBundle, loading it on first use
+
+        Args:
+            name: Model name (defaults to MODEL_NAME)
+            version: Model version (defaults to the active version)
+
+        Returns:
+            ModelBundle
+
+        Raises:
+            ModelUnavailableError: If the artifacts cannot be loaded
+        """
+        key = (name or self.default_name, version or self.active_version())
+        bundle = self._bundles.get(key)
+        if bundle is not None:
+            return bundle
+
+        # Loads are serialized on their own lock so health() never waits behind one
+        with self._load_lock:
+            bundle = self._bundles.get(key)
+            if bundle is None:
+                try:
+                    bundle = ModelBundle(
+                        key[0], key[1], self._resolve_path(key[1]),
+                        self.lstm_backend, self.prediction_mode
+                    )
+                except Exception as e:
+                    with self._lock:
+                        self._errors[key] = str(e)
+                    raise ModelUnavailableError(f"Could not load model {key[0]} ({key[1]}): {e}") from e
+                with self._lock:
+                    self._bundles[key] = bundle
+                    self._errors.pop(key, None)
+                instrumentation.observe('model_load_seconds', bundle.load_seconds, version=key[1])
+        return bundle
+
+    def warmup(self, name=None, version=None):
+        """
+        Load and warm up a model eagerly
+
+        Returns:
+            The warmed-up ModelBundle
+        """
+        bundle = self.get(name, version)
+        if not bundle.warmed_up:
+            bundle.warmup()
+        return bundle
+
+    def activate(self, version, background=True, persist=True):
+        """
+        Make a version active without interrupting in-flight requests
+
+        The new bundle is loaded and warmed up first; requests keep using the
+        current version until the reference swap at the end.
+
+        Args:
+            version: Version directory name under MODEL_DIR
+            background: Load in a daemon thread instead of blocking
+            persist: Write the pointer file so every worker follows, once the
+                version has loaded and warmed up here
+        """
+        if version != 'default' and not os.path.isdir(self._resolve_path(version)):
+            raise ModelUnavailableError(f"Unknown model version: {version}")
+        if not self.label_fits(version):
+            raise ModelUnavailableError(
+                f"Model version name is too long: {model_label(self.default_name, version)} "
+                f"exceeds {MAX_LABEL_LENGTH} characters"
+            )
+
+        self._pending = version
+        if background:
+            threading.Thread(target=self._load_and_swap, args=(version, persist), daemon=True).start()
+        else:
+            self._load_and_swap(version, persist)
+
+    def _load_and_swap(self, version, persist=False):
+        try:
+            self.warmup(version=version)
+        except Exception:
+            # The pointer stays on the last good version, so other workers never try this one
+            self._failed_version = version
+            self._pending = None
+            return
+
+        if persist:
+            self._write_pointer(version)
+
+        # Single reference assignment: atomic for concurrent readers
+        self._active = version
+        self._pending = None
+        self._failed_version = None
+
+        # Requests already holding the old bundle keep it until they finish
+        with self._lock:
+            for key in list(self._bundles):
+                if key[1] != version:
+                    del self._bundles[key]
+
+    def health(self):
+        """
+        Summarize registry state for the status endpoint
+
+        Returns:
+            Dictionary with overall status and per-model details
+        """
+        active_key = (self.default_name, self.active_version())
+        # _load_and_swap deletes bundles under the lock during an activation
+        with self._lock:
+            bundles = dict(self._bundles)
+            errors = dict(self._errors)
+
+        if active_key in bundles:
+            status = 'ready' if bundles[active_key].warmed_up else 'loaded'
+        elif active_key in errors:
+            status = 'error'
+        else:
+            status = 'not_loaded'
+
+        return {
+            'status': status,
+            'backend': self.lstm_backend,
+            'mode': self.prediction_mode,
+            'active': {'name': active_key[0], 'version': active_key[1]},
+            'pending': self._pending,
+            'failed_version': self._failed_version,
+            'loaded': [
+                {
+                    'name': bundle.name,
+                    'version': bundle.version,
+                    'warmed_up': bundle.warmed_up,
+                    'lookup_table': bundle.table is not None,
+                    'sequence': bundle.has_sequence,
+                    'load_seconds': round(bundle.load_seconds, 3)
+                }
+                for bundle in bundles.values()
+            ],
+            'errors': {f"{name}@{version}": error for (name, version), error in errors.items()}
+        }
+
+
+registry = ModelRegistry()
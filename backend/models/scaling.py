@@ -0,0 +1,47 @@
+"""
+Fitted MinMaxScaler parameters as plain NumPy arrays
+
+MinMaxScaler.transform(X) is X * scale_ + min_; inverse_transform is
+(X - min_) / scale_. Calling the scikit-learn methods per request pays
+for input validation that costs more than the arithmetic itself, so
+serving code exports the parameters once at load time and applies them
+directly.
+"""
+import numpy as np
+
+
+class AffineTransform:
+    """Elementwise scaled = X * scale + offset, broadcast over the last axis"""
+
+    def __init__(self, scale, offset):
+        self.scale = np.ascontiguousarray(scale, dtype=np.float64)
+        self.offset = np.ascontiguousarray(offset, dtype=np.float64)
+        self.inverse_scale = 1.0 / self.scale
+
+    @classmethod
+    def from_scaler(cls, scaler):
+        """
+        Export a fitted MinMaxScaler
+
+        Args:
+            scaler: Fitted sklearn.preprocessing.MinMaxScaler
+
+        Returns:
+            AffineTransform equivalent to scaler.transform
+        """
+        return cls(scaler.scale_, scaler.min_)
+
+    def __getitem__(self, columns):
+        """Transform restricted to a subset of feature columns"""
+        return AffineTransform(self.scale[columns], self.offset[columns])
+
+    def transform(self, X):
+        """Same as MinMaxScaler.transform, for any number of leading axes"""
+        # Like scikit-learn, keep float32 inputs float32
+        X = np.asarray(X)
+        dtype = np.result_type(X.dtype, np.float32)
+        return X * self.scale.astype(dtype, copy=False) + self.offset.astype(dtype, copy=False)
+
+    def inverse(self, scaled):
+        """Same as MinMaxScaler.inverse_transform, for any number of leading axes"""
+        return (np.asarray(scaled) - self.offset) * self.inverse_scale
@@ -0,0 +1,216 @@
+import json
+import os
+
+import joblib
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.preprocessing import MinMaxScaler
+
+from models.scaling import AffineTransform
+from models.twsvr_model import TWVSRPredictor
+from utils.features import future_calendar, make_windows
+
+# Per-timestep inputs; load must stay first, calendar columns last
+SEQUENCE_FEATURES = ['Load', 'Temperature', 'Hour', 'Month', 'Weekday']
+CALENDAR_SLICE = slice(2, 5)
+
+
+class SequenceForecaster:
+    """
+    Multi-step LSTM forecaster over real lookback windows
+    Reads `lookback` hours of load and weather and emits the next
+    `horizon` hours in one forward pass; TWSVR adds per-step intervals.
+    TensorFlow is only imported to build, train or load the Keras model;
+    serving from exported weights (backend='numpy') never imports it.
+    """
+
+    def __init__(self, lookback=168, horizon=24):
+        self.lookback = lookback
+        self.horizon = horizon
+        self.model = None
+        self.engine = None
+        self.twsvr = None
+        self.scaler_X = MinMaxScaler(feature_range=(0, 1))
+        self.scaler_y = MinMaxScaler(feature_range=(0, 1))
+
+    def build_model(self, lstm_units=64, dropout_rate=0.2):
+        """
+        Build the sequence-to-horizon architecture
+
+        Returns:
+            Compiled Keras model
+        """
+        from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.optimizers import Adam
+        from models.inference_engine import InferenceEngine
+
+        self.model = Sequential([
+            Input(shape=(self.lookback, len(SEQUENCE_FEATURES))),
+            LSTM(lstm_units, return_sequences=True),
+            Dropout(dropout_rate),
+            LSTM(lstm_units // 2, return_sequences=False),
+            Dropout(dropout_rate),
+            Dense(32, activation='relu'),
+            Dense(self.horizon)  # One output per future hour
+        ])
+        self.model.compile(optimizer=Adam(learning_rate=0.001), loss='mse', metrics=['mae'])
+        self.engine = InferenceEngine(self.model, timesteps=self.lookback)
+        return self.model
+
+    def _window_dataset(self, X, y, batch_size, shuffle):
+        """Batches copied out of the strided views one at a time"""
+        import tensorflow as tf
+
+        n_windows = len(X)
+
+        def batches():
+            order = np.random.permutation(n_windows) if shuffle else np.arange(n_windows)
+            for start in range(0, n_windows, batch_size):
+                rows = np.sort(order[start:start + batch_size])
+                yield X[rows].astype(np.float32), y[rows].astype(np.float32)
+
+        return tf.data.Dataset.from_generator(
+            batches,
+            output_signature=(
+                tf.TensorSpec(shape=(None, self.lookback, X.shape[2]), dtype=tf.float32),
+                tf.TensorSpec(shape=(None, self.horizon), dtype=tf.float32)
+            )
+        ).prefetch(tf.data.AUTOTUNE)
+
+    def _interval_features(self, calendar_scaled):
+        """Target-hour calendar features plus lead time, one row per forecast step"""
+        steps = np.broadcast_to(
+            np.linspace(0, 1, self.horizon)[:, None], calendar_scaled.shape[:-1] + (1,)
+        )
+        return np.concatenate([calendar_scaled, steps], axis=-1).reshape(-1, calendar_scaled.shape[-1] + 1)
+
+    def train(self, features, epochs=50, batch_size=32, epsilon=0.1, twsvr_backend='nystroem',
+              interval_max_rows=20000, n_jobs=1):
+        """
+        Train the sequence model, then TWSVR on its per-step residuals
+
+        Args:
+            features: 2D array [timesteps, SEQUENCE_FEATURES], time-ordered hourly rows
+            epochs: Number of training epochs
+            batch_size: Windows per batch
+            epsilon: TWSVR epsilon (scaled load units)
+            twsvr_backend: Interval backend (see TWVSRPredictor)
+            interval_max_rows: Cap on (window, step) rows used to fit the intervals
+            n_jobs: Processes for the two TWSVR bounds
+
+        Returns:
+            Training history
+        """
+        scaled = self.scaler_X.fit_transform(features).astype(np.float32)
+        target = self.scaler_y.fit_transform(features[:, :1]).astype(np.float32).ravel()
+        X, y = make_windows(scaled, target, self.lookback, self.horizon)
+
+        history = self.model.fit(self._window_dataset(X, y, batch_size, shuffle=True), epochs=epochs, verbose=1)
+
+        # Residuals per (window, step), paired with the target hour's calendar features
+        rng = np.random.default_rng(0)
+        n_rows = min(interval_max_rows, len(X) * self.horizon)
+        windows = np.unique(rng.choice(len(X), size=min(len(X), max(1, n_rows // self.horizon)), replace=False))
+        predicted = self.engine.predict(X[windows])
+        residuals = (y[windows] - predicted).ravel()
+
+        calendar = sliding_window_view(scaled[:, CALENDAR_SLICE], (self.horizon, 3))[self.lookback:, 0]
+        self.twsvr = TWVSRPredictor(epsilon=epsilon, backend=twsvr_backend)
+        self.twsvr.train(self._interval_features(calendar[windows]), residuals, n_jobs=n_jobs)
+
+        return history
+
+    def predict_windows(self, windows, calendars):
+        """
+        Forecast many windows at once
+
+        Args:
+            windows: 3D array [n, lookback, SEQUENCE_FEATURES] of raw observations
+            calendars: 3D array [n, horizon, 3] of [hour, month, weekday] for the forecast hours
+
+        Returns:
+            Tuple of (predicted_load, lower_bound, upper_bound), each [n, horizon]
+        """
+        n_windows = len(windows)
+        x_transform = AffineTransform.from_scaler(self.scaler_X)
+        y_transform = AffineTransform.from_scaler(self.scaler_y)
+
+        # MinMaxScaler.transform, applied directly to the 3D windows
+        scaled = x_transform.transform(windows)
+        point_scaled = self.engine.predict(scaled.astype(np.float32))
+
+        calendars_scaled = x_transform[CALENDAR_SLICE].transform(calendars)
+        lower_scaled, upper_scaled = self.twsvr.predict_intervals(
+            self._interval_features(calendars_scaled), point_scaled.ravel()
+        )
+
+        point, lower, upper = y_transform.inverse(
+            np.stack([point_scaled.ravel(), lower_scaled, upper_scaled])
+        ).reshape(3, n_windows, self.horizon)
+        return point, lower, upper
+
+    def predict(self, recent, last_timestamp):
+        """
+        Forecast the full horizon after the most recent observations
+
+        Args:
+            recent: 2D array [>= lookback, SEQUENCE_FEATURES]; the last lookback rows are used
+            last_timestamp: Timestamp of the last row in recent
+
+        Returns:
+            Dictionary with timestamps, predicted_load, lower_bound and upper_bound arrays
+        """
+        recent = np.asarray(recent, dtype=float)
+        if len(recent) < self.lookback:
+            raise ValueError(f"Need at least {self.lookback} hours of history, got {len(recent)}")
+
+        calendar, index = future_calendar(last_timestamp, self.horizon)
+        point, lower, upper = self.predict_windows(recent[None, -self.lookback:], calendar[None])
+        return {'timestamps': index, 'predicted_load': point[0], 'lower_bound': lower[0], 'upper_bound': upper[0]}
+
+    def save_model(self, directory):
+        """
+        Save the sequence model, scalers, intervals and window settings
+
+        Args:
+            directory: Output directory (e.g. MODEL_DIR/<version>/sequence)
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.model.save(os.path.join(directory, 'sequence_model.h5'))
+        joblib.dump(self.scaler_X, os.path.join(directory, 'scaler_X.pkl'))
+        joblib.dump(self.scaler_y, os.path.join(directory, 'scaler_y.pkl'))
+        self.twsvr.save_model(os.path.join(directory, 'twsvr.pkl'))
+        with open(os.path.join(directory, 'sequence.json'), 'w') as f:
+            json.dump({'lookback': self.lookback, 'horizon': self.horizon, 'features': SEQUENCE_FEATURES}, f)
+
+        print(f"Sequence model saved to {directory}")
+
+    def load_model(self, directory, backend='keras'):
+        """
+        Load a model saved by save_model
+
+        Args:
+            directory: Directory written by save_model
+            backend: 'keras' (graph-mode engine) or 'numpy' (exported sequence_model.npz)
+        """
+        with open(os.path.join(directory, 'sequence.json')) as f:
+            meta = json.load(f)
+        self.lookback = meta['lookback']
+        self.horizon = meta['horizon']
+
+        if backend == 'numpy':
+            from models.numpy_lstm import NumpyLSTM
+            self.model = None
+            self.engine = NumpyLSTM(os.path.join(directory, 'sequence_model.npz'))
+        else:
+            from tensorflow.keras.models import load_model
+            from models.inference_engine import InferenceEngine
+            self.model = load_model(os.path.join(directory, 'sequence_model.h5'), compile=False)
+            self.engine = InferenceEngine(self.model, timesteps=self.lookback)
+        self.scaler_X = joblib.load(os.path.join(directory, 'scaler_X.pkl'))
+        self.scaler_y = joblib.load(os.path.join(directory, 'scaler_y.pkl'))
+        self.twsvr = TWVSRPredictor()
+        self.twsvr.load_model(os.path.join(directory, 'twsvr.pkl'))
+
+        print(f"Sequence model loaded from {directory}")
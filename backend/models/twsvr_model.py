@@ -1,15 +1,32 @@
-from sklearn.svm import SVR
+from sklearn.svm import SVR, LinearSVR
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.pipeline import Pipeline
+from joblib import Parallel, delayed
 import numpy as np
 import joblib
 import os
 
+
+def _fit_bound(model, X, y):
+    """Fit one bound model (module-level so worker processes can pickle it)"""
+    model.fit(X, y)
+    return model
+
+
 class TWVSRPredictor:
     """
     Twin Support Vector Regression for prediction intervals
     Creates upper and lower bounds for confidence intervals
+    
+    backend='svr' fits exact kernel SVRs. 'nystroem' and 'rff' map inputs
+    through an approximate kernel feature map (Nystroem or random Fourier
+    features) and fit a linear SVR on top, which trains in roughly linear
+    time and predicts independently of the number of support vectors.
     """
     
-    def __init__(self, epsilon=0.1, C=100, kernel='rbf'):
+    BACKENDS = ('svr', 'nystroem', 'rff')
+    
+    def __init__(self, epsilon=0.1, C=100, kernel='rbf', backend='svr', n_components=300, random_state=0):
         """
         Initialize TWSVR
         
@@ -17,30 +34,74 @@ class TWVSRPredictor:
             epsilon: Epsilon parameter for SVR
             C: Regularization parameter
             kernel: Kernel type (rbf, linear, poly)
+            backend: 'svr' (exact), 'nystroem' or 'rff' (approximate, rbf only)
+            n_components: Feature map size for the approximate backends
+            random_state: Seed for the approximate feature maps
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown TWSVR backend: {backend}")
+        if backend == 'rff' and kernel != 'rbf':
+            raise ValueError("The 'rff' backend only supports the rbf kernel")
+        
         self.epsilon = epsilon
         self.C = C
         self.kernel = kernel
+        self.backend = backend
+        self.n_components = n_components
+        self.random_state = random_state
         
         # Two SVR models for upper and lower bounds
-        self.svr_upper = SVR(kernel=kernel, C=C, epsilon=epsilon)
-        self.svr_lower = SVR(kernel=kernel, C=C, epsilon=epsilon)
+        self.svr_upper = self._build_regressor()
+        self.svr_lower = self._build_regressor()
     
-    def train(self, X_residuals, y_residuals):
+    def _build_regressor(self):
+        """Create one bound model for the configured backend"""
+        if self.backend == 'svr':
+            return SVR(kernel=self.kernel, C=self.C, epsilon=self.epsilon)
+        
+        if self.backend == 'nystroem':
+            feature_map = Nystroem(kernel=self.kernel, n_components=self.n_components,
+                                   random_state=self.random_state)
+        else:
+            feature_map = RBFSampler(n_components=self.n_components, random_state=self.random_state)
+        
+        return Pipeline([
+            ('features', feature_map),
+            ('svr', LinearSVR(epsilon=self.epsilon, C=self.C, loss='squared_epsilon_insensitive',
+                              dual=False, max_iter=5000))
+        ])
+    
+    def _match_kernel_scale(self, X):
+        """Use the same gamma='scale' heuristic as the exact SVR"""
+        if self.backend == 'svr' or self.kernel == 'linear':
+            return
+        
+        X = np.asarray(X, dtype=float)
+        variance = X.var()
+        gamma = 1.0 / (X.shape[1] * variance) if variance > 0 else 1.0
+        for model in (self.svr_upper, self.svr_lower):
+            model.set_params(features__gamma=gamma)
+    
+    def train(self, X_residuals, y_residuals, n_jobs=1):
         """
         Train TWSVR on LSTM residuals
         
         Args:
             X_residuals: Feature data (prediction inputs)
             y_residuals: Residuals from LSTM predictions
+            n_jobs: Worker processes; the two bounds are independent fits,
+                so 2 fits them in parallel (train.py --n-jobs)
         """
-        # Upper boundary: residuals + epsilon
-        y_upper = y_residuals + self.epsilon
-        self.svr_upper.fit(X_residuals, y_upper)
+        self._match_kernel_scale(X_residuals)
         
-        # Lower boundary: residuals - epsilon
+        # Upper boundary: residuals + epsilon, lower boundary: residuals - epsilon
+        y_upper = y_residuals + self.epsilon
         y_lower = y_residuals - self.epsilon
-        self.svr_lower.fit(X_residuals, y_lower)
+        
+        self.svr_upper, self.svr_lower = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_bound)(model, X_residuals, target)
+            for model, target in ((self.svr_upper, y_upper), (self.svr_lower, y_lower))
+        )
         
         print("TWSVR models trained successfully")
     
@@ -90,7 +151,8 @@ class TWVSRPredictor:
         
         models_dict = {
             'svr_upper': self.svr_upper,
-            'svr_lower': self.svr_lower
+            'svr_lower': self.svr_lower,
+            'backend': self.backend
         }
         
         joblib.dump(models_dict, filepath)
@@ -106,5 +168,6 @@ class TWVSRPredictor:
         models_dict = joblib.load(filepath)
         self.svr_upper = models_dict['svr_upper']
         self.svr_lower = models_dict['svr_lower']
+        self.backend = models_dict.get('backend', 'svr')
         
         print(f"TWSVR model loaded from {filepath}")
@@ -0,0 +1,127 @@
+from flask import Blueprint, request, jsonify, send_file
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from utils.security import identity_cache
+from models.registry import registry, ModelUnavailableError, MAX_LABEL_LENGTH
+from utils.profiling import request_profiler, SORT_KEYS
+from functools import wraps
+
+# Create blueprint for admin routes
+admin_bp = Blueprint('admin', __name__)
+
+# ===== HELPER FUNCTIONS =====
+
+def admin_required(fn):
+    """Require a valid JWT belonging to an active admin user"""
+    @wraps(fn)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        user = identity_cache.get(get_jwt_identity())
+        if not user or not user.is_active or user.role != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+# ===== MODEL ROUTES =====
+
+@admin_bp.route('/models', methods=['GET'])
+@admin_required
+def list_models():
+    """
+    List model versions on disk and the registry state
+
+    Response:
+    {
+        "versions": ["default", "2025-01-01"],
+        "registry": {...}
+    }
+    """
+    return jsonify({
+        'versions': registry.list_versions(),
+        'registry': registry.health()
+    }), 200
+
+
+@admin_bp.route('/models/activate', methods=['POST'])
+@admin_required
+def activate_model():
+    """
+    Load a model version in the background and swap it in once warm
+
+    Request JSON:
+    {
+        "version": "2025-01-01"
+    }
+
+    Response (202):
+    {
+        "message": "Activating model version 2025-01-01",
+        "version": "2025-01-01"
+    }
+    """
+    data = request.get_json()
+
+    if not data or not data.get('version'):
+        return jsonify({'error': 'Version is required'}), 400
+
+    version = data['version']
+    if not registry.label_fits(version):
+        return jsonify({'error': f'Version name is too long (model label limit is {MAX_LABEL_LENGTH} characters)'}), 400
+    if version not in registry.list_versions():
+        return jsonify({'error': f'Unknown model version: {version}'}), 404
+
+    try:
+        registry.activate(version)
+    except ModelUnavailableError as e:
+        return jsonify({'error': str(e)}), 404
+
+    return jsonify({
+        'message': f'Activating model version {version}',
+        'version': version
+    }), 202
+
+# ===== PROFILING ROUTES =====
+
+@admin_bp.route('/profiles', methods=['GET'])
+@admin_required
+def list_profiles():
+    """
+    List recent request profiles with their hottest functions
+
+    Query params:
+        limit: Captures to return, newest first (default 20, max 100)
+        top: Functions per capture (default 10, max 50; 0 skips them)
+        sort: cumulative (default) or tottime
+
+    Response:
+    {
+        "enabled": true,
+        "profiles": [{"name", "path", "status", "duration_ms", "top_functions": [...]}, ...]
+    }
+    """
+    try:
+        limit = int(request.args.get('limit', 20))
+        top = int(request.args.get('top', 10))
+    except ValueError:
+        return jsonify({'error': 'limit and top must be integers'}), 400
+    # Clamp like the history page size: a negative value would slice from the end
+    limit = max(1, min(limit, 100))
+    top = max(0, min(top, 50))
+
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in SORT_KEYS:
+        return jsonify({'error': f"sort must be one of: {', '.join(SORT_KEYS)}"}), 400
+
+    return jsonify({
+        'enabled': request_profiler.enabled,
+        'profiles': request_profiler.list_captures(limit=limit, top=top, sort=sort)
+    }), 200
+
+
+@admin_bp.route('/profiles/<name>', methods=['GET'])
+@admin_required
+def download_profile(name):
+    """Download one capture as a .prof file (pstats / snakeviz)"""
+    path = request_profiler.profile_path(name)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(path, as_attachment=True, download_name=f'{name}.prof')
@@ -0,0 +1,336 @@
+"""
+Async-native auth and prediction routes for the ASGI serving mode
+
+These handlers never block the event loop. JSON parsing, JWT checks and
+feature building are microseconds and stay on the loop. Model inference
+runs on an ASGI_INFERENCE_WORKERS thread pool, and database work runs on
+an ASGI_DB_WORKERS pool with an app context. bcrypt runs on the
+password_hasher pool and is awaited, not waited on. A process can
+therefore hold thousands of open requests while only the pools' threads
+do any work.
+
+The login and history reads go through an AsyncSession on an async
+driver (aiosqlite for SQLite files, asyncpg for PostgreSQL) derived from
+SQLALCHEMY_DATABASE_URI. Writes (prediction rows, password rehashes) and
+identity lookups keep the existing SQLAlchemy session code on the
+ASGI_DB_WORKERS pool, so the write-behind queue and the identity cache
+behave as in WSGI mode. Without an async driver (or with ASGI_ASYNC_DB
+off, or an in-memory SQLite database) the reads use that pool as well.
+
+Responses match the Flask routes they shadow (same bodies, status codes
+and X-Next-Cursor header). Every other route is served by the Flask app
+through the WSGI bridge in utils.asgi.
+"""
+import asyncio
+import functools
+import importlib
+import os
+
+from flask_jwt_extended import create_access_token, get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from models.registry import registry, ModelUnavailableError
+from routes.auth import login_credentials
+from routes.predictions import history_page_query, history_page_result, single_prediction_body, single_prediction_input
+from schemas.models import db, User
+from utils.batching import micro_batcher
+from utils.instrumentation import instrumentation
+from utils.persistence import prediction_writer, build_prediction_records
+from utils.process_local import ProcessLocalExecutor
+from utils.security import password_hasher, identity_cache, PasswordHasherBusy, UserIdentity
+
+
+# Backend -> (async dialect+driver, driver module)
+ASYNC_DRIVERS = {
+    'sqlite': ('sqlite+aiosqlite', 'aiosqlite'),
+    'postgresql': ('postgresql+asyncpg', 'asyncpg'),
+}
+
+
+def async_database_uri(uri):
+    """
+    Async-driver equivalent of a SQLALCHEMY_DATABASE_URI
+
+    Returns:
+        URL for create_async_engine, or None when the backend has no async
+        driver installed or the database is in-memory SQLite (private to
+        the connection that created it)
+    """
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        return None
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        return None
+
+    drivername, module = ASYNC_DRIVERS[backend]
+    try:
+        importlib.import_module(module)
+    except ImportError:
+        return None
+    return url.set(drivername=drivername)
+
+
+class AsyncApi:
+    """
+    Native async handlers plus the pools they offload to
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._engine = None
+        self._engine_pid = None
+        self.database_uri = None
+        self.inference_workers = 2
+        self.db_workers = 4
+        self._inference = ProcessLocalExecutor(self.inference_workers, 'asgi-inference')
+        self._db = ProcessLocalExecutor(self.db_workers, 'asgi-db')
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read pool sizes from the Flask config"""
+        self.app = app
+        self.inference_workers = app.config.get('ASGI_INFERENCE_WORKERS', self.inference_workers)
+        self.db_workers = app.config.get('ASGI_DB_WORKERS', self.db_workers)
+        self._inference.reset(max_workers=self.inference_workers)
+        self._db.reset(max_workers=self.db_workers)
+        self.database_uri = None
+        if app.config.get('ASGI_ASYNC_DB', True):
+            self.database_uri = async_database_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+        self._engine = None
+        app.extensions['async_api'] = self
+
+    @property
+    def routes(self):
+        """(method, path) -> handler table for AsgiApplication"""
+        return {
+            ('POST', '/api/auth/login'): self.login,
+            ('GET', '/api/auth/verify-token'): self.verify_token,
+            ('GET', '/api/auth/user-info'): self.user_info,
+            ('POST', '/api/predict/single'): self.predict_single,
+            ('GET', '/api/predict/history'): self.prediction_history,
+        }
+
+    async def close(self):
+        """Close the async engine and stop the pools (lifespan shutdown)"""
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+        loop = asyncio.get_running_loop()
+        for pool in (self._inference, self._db):
+            await loop.run_in_executor(None, functools.partial(pool.shutdown, wait=True))
+
+    # ===== OFFLOADING =====
+
+    def _in_app_context(self, fn, *args):
+        with self.app.app_context():
+            return fn(*args)
+
+    async def _run(self, executor, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(self._in_app_context, fn, *args))
+
+    async def run_inference(self, fn, *args):
+        """Run fn(*args) on the inference pool inside an app context"""
+        return await self._run(self._inference.get(), fn, *args)
+
+    async def run_db(self, fn, *args):
+        """Run fn(*args) on the database pool inside an app context"""
+        return await self._run(self._db.get(), fn, *args)
+
+    def _async_engine(self):
+        # Like the pools, the engine's connections belong to the serving process
+        if self.database_uri is None:
+            return None
+        if self._engine is None or self._engine_pid != os.getpid():
+            self._engine = create_async_engine(self.database_uri)
+            self._engine_pid = os.getpid()
+            instrumentation.instrument_engine(self._engine.sync_engine)
+        return self._engine
+
+    async def read(self, query, consume):
+        """
+        Run a SELECT and return consume(result)
+
+        Uses an AsyncSession when an async driver is configured, else the
+        Flask-SQLAlchemy session on the database pool. consume runs while
+        the session is open (e.g. lambda result: result.all()).
+        """
+        engine = self._async_engine()
+        if engine is None:
+            return await self.run_db(lambda: consume(db.session.execute(query)))
+        async with AsyncSession(engine) as session:
+            return consume(await session.execute(query))
+
+    async def _password(self, future):
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), password_hasher.timeout)
+        except asyncio.TimeoutError:
+            raise PasswordHasherBusy('Password operation timed out, try again shortly')
+
+    # ===== AUTHENTICATION =====
+
+    def authenticate(self, request):
+        """
+        Check the request's JWT exactly as @jwt_required() does
+
+        Runs in the request context AsgiApplication pushed for this request;
+        pushing another one here would run the teardown hooks (and end the
+        request's profile) while the handler is still going.
+
+        Returns:
+            Tuple of (user_id, None), or (None, error response) with the
+            same body and status flask_jwt_extended gives the Flask routes
+        """
+        try:
+            verify_jwt_in_request()
+            return get_jwt_identity(), None
+        except Exception as e:
+            # JWTManager's error handlers; anything else is re-raised
+            response = self.app.handle_user_exception(e)
+            return None, (response.get_json(), response.status_code)
+
+    async def _user(self, user_id):
+        return identity_cache.peek(user_id) or await self.run_db(identity_cache.get, user_id)
+
+    @staticmethod
+    def _identity_and_hash(result):
+        # The hash travels next to the snapshot, never inside it (snapshots get cached)
+        user = result.scalars().first()
+        return (UserIdentity(user), user.password_hash) if user else (None, None)
+
+    @staticmethod
+    def _store_password_hash(user_id, password_hash):
+        user = db.session.get(User, user_id)
+        if user is None:
+            return
+        user.password_hash = password_hash
+        db.session.commit()
+
+    # ===== AUTH ROUTES =====
+
+    async def login(self, request):
+        """Async POST /api/auth/login"""
+        try:
+            email, password = login_credentials(request.get_json())
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        user, stored_hash = await self.read(select(User).where(User.email == email), self._identity_and_hash)
+        if not user:
+            return {'error': 'Invalid email or password'}, 401
+
+        try:
+            if not await self._password(password_hasher.submit_verify(password, stored_hash)):
+                return {'error': 'Invalid email or password'}, 401
+            if not user.is_active:
+                return {'error': 'User account is inactive'}, 403
+            if password_hasher.needs_rehash(stored_hash):
+                password_hash = await self._password(password_hasher.submit_hash(password))
+                await self.run_db(self._store_password_hash, user.user_id, password_hash)
+        except PasswordHasherBusy as e:
+            return {'error': str(e)}, 503, {'Retry-After': '1'}
+
+        access_token = create_access_token(identity=str(user.user_id))
+
+        return {
+            'access_token': access_token,
+            'user_id': user.user_id,
+            'username': user.username,
+            'email': user.email,
+            'role': user.role,
+            'message': 'Login successful'
+        }, 200
+
+    async def verify_token(self, request):
+        """Async GET /api/auth/verify-token"""
+        user_id, error = self.authenticate(request)
+        if error:
+            return error
+
+        user = await self._user(user_id)
+        if not user:
+            return {'error': 'User not found'}, 404
+
+        return {
+            'valid': True,
+            'user_id': user_id,
+            'username': user.username,
+            'email': user.email,
+            'role': user.role
+        }, 200
+
+    async def user_info(self, request):
+        """Async GET /api/auth/user-info"""
+        user_id, error = self.authenticate(request)
+        if error:
+            return error
+
+        user = await self._user(user_id)
+        if not user:
+            return {'error': 'User not found'}, 404
+
+        return user.to_dict(), 200
+
+    # ===== PREDICTION ROUTES =====
+
+    @staticmethod
+    def _predict(X_input):
+        model = registry.get()
+        with instrumentation.stage('predict'):
+            y_pred, lower, upper = micro_batcher.predict(model, X_input)
+        return y_pred, lower, upper, model.label
+
+    @staticmethod
+    def _persist(records):
+        with instrumentation.stage('persist'):
+            prediction_writer.write(records)
+
+    async def predict_single(self, request):
+        """Async POST /api/predict/single"""
+        user_id, error = self.authenticate(request)
+        if error:
+            return error
+
+        with instrumentation.stage('parse'):
+            try:
+                X_input, dates = single_prediction_input(request.get_json())
+            except (TypeError, ValueError) as e:
+                return {'error': str(e)}, 400
+
+        try:
+            y_pred, lower, upper, label = await self.run_inference(self._predict, X_input)
+        except ModelUnavailableError as e:
+            return {'error': str(e)}, 503
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        await self.run_db(self._persist, build_prediction_records(
+            user_id, dates, X_input, y_pred, lower, upper, label
+        ))
+
+        with instrumentation.stage('serialize'):
+            return single_prediction_body(y_pred, lower, upper), 200
+
+    async def prediction_history(self, request):
+        """Async GET /api/predict/history"""
+        user_id, error = self.authenticate(request)
+        if error:
+            return error
+
+        try:
+            query, limit = history_page_query(int(user_id), request.args)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        rows = await self.read(query, lambda result: result.all())
+        history, next_cursor = history_page_result(rows, limit)
+
+        return history, 200, {'X-Next-Cursor': next_cursor} if next_cursor is not None else {}
+
+
+async_api = AsyncApi()
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token
 from schemas.models import db, User
+from utils.security import password_hasher, identity_cache, PasswordHasherBusy
 from datetime import datetime
 import re
 
@@ -21,6 +22,35 @@ def is_valid_password(password):
     """
     return len(password) >= 6
 
+def login_credentials(data):
+    """
+    Validated email and password of a login body (shared by the Flask and ASGI routes)
+
+    Args:
+        data: Parsed JSON body with email and password
+
+    Returns:
+        Tuple of (normalized email, password)
+
+    Raises:
+        ValueError: If the body is not an object or a field is missing or not a string
+    """
+    if not data or not isinstance(data, dict):
+        raise ValueError('Request body is empty')
+
+    email = data.get('email', '')
+    password = data.get('password', '')
+    if not isinstance(email, str) or not email.strip():
+        raise ValueError('Email is required')
+    if not isinstance(password, str) or not password:
+        raise ValueError('Password is required')
+    return email.strip().lower(), password
+
+
+def password_busy_response(error):
+    """503 with Retry-After when the password hashing queue is saturated"""
+    return jsonify({'error': str(error)}), 503, {'Retry-After': '1'}
+
 # ===== AUTH ROUTES =====
 
 @auth_bp.route('/register', methods=['POST'])
@@ -101,6 +131,9 @@ def register():
             'username': new_user.username
         }), 201
         
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return password_busy_response(e)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Registration failed: {str(e)}'}), 500
@@ -127,20 +160,11 @@ def login():
     }
     """
     try:
-        data = request.get_json()
-        
         # Validate required fields
-        if not data:
-            return jsonify({'error': 'Request body is empty'}), 400
-        
-        email = data.get('email', '').strip().lower()
-        password = data.get('password', '')
-        
-        if not email:
-            return jsonify({'error': 'Email is required'}), 400
-        
-        if not password:
-            return jsonify({'error': 'Password is required'}), 400
+        try:
+            email, password = login_credentials(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Find user by email
         user = User.query.filter_by(email=email).first()
@@ -156,6 +180,11 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'User account is inactive'}), 403
         
+        # Upgrade hashes made with a lower cost than BCRYPT_ROUNDS while we have the password
+        if password_hasher.needs_rehash(user.password_hash):
+            user.set_password(password)
+            db.session.commit()
+        
         # Generate JWT token
         access_token = create_access_token(identity=str(user.user_id))
         
@@ -168,6 +197,9 @@ def login():
             'message': 'Login successful'
         }), 200
         
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return password_busy_response(e)
     except Exception as e:
         return jsonify({'error': f'Login failed: {str(e)}'}), 500
 
@@ -190,7 +222,7 @@ def verify_token():
     @jwt_required()
     def check():
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = identity_cache.get(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -227,7 +259,7 @@ def get_user_info():
     @jwt_required()
     def info():
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = identity_cache.get(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -260,9 +292,8 @@ def change_password():
     @jwt_required()
     def change():
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
         
-        if not user:
+        if not identity_cache.get(user_id):
             return jsonify({'error': 'User not found'}), 404
         
         data = request.get_json()
@@ -279,17 +310,24 @@ def change_password():
         if not new_password:
             return jsonify({'error': 'New password is required'}), 400
         
-        # Verify old password
-        if not user.check_password(old_password):
-            return jsonify({'error': 'Old password is incorrect'}), 401
-        
-        # Validate new password
-        if not is_valid_password(new_password):
-            return jsonify({'error': 'New password must be at least 6 characters'}), 400
-        
-        # Set new password
-        user.set_password(new_password)
-        db.session.commit()
+        try:
+            # Verify against the stored row, not a cached snapshot (it may have been deleted since)
+            user = db.session.get(User, int(user_id))
+            if user is None:
+                return jsonify({'error': 'User not found'}), 404
+            if not user.check_password(old_password):
+                return jsonify({'error': 'Old password is incorrect'}), 401
+            
+            # Validate new password
+            if not is_valid_password(new_password):
+                return jsonify({'error': 'New password must be at least 6 characters'}), 400
+            
+            # Set new password (the commit drops the cached identity)
+            user.set_password(new_password)
+            db.session.commit()
+        except PasswordHasherBusy as e:
+            db.session.rollback()
+            return password_busy_response(e)
         
         return jsonify({'message': 'Password changed successfully'}), 200
     
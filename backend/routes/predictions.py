@@ -1,19 +1,320 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app, send_file, url_for, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from schemas.models import db, Prediction
-from datetime import datetime
+from schemas.models import db, Prediction, ForecastJob
+from models.registry import registry, ModelUnavailableError
+from utils.cache import prediction_cache
+from utils.batching import micro_batcher
+from utils.jobs import job_runner
+from utils.persistence import prediction_writer, build_prediction_records
+from utils.export import EXPORT_FORMATS, SERIALIZERS, parquet_available
+from utils.instrumentation import instrumentation
+from werkzeug.utils import secure_filename
+from utils.preprocessing import validate_prediction_input, validate_prediction_frame, create_batch_prediction_input
+from sqlalchemy import select, or_
+from datetime import datetime, timedelta
+import base64
+import binascii
+import os
+import uuid
 import numpy as np
-import joblib
-from tensorflow.keras.models import load_model
+import pandas as pd
 
 pred_bp = Blueprint('predictions', __name__)
 
-# Load models and scalers once at startup
-lstm_model = load_model('trained_models/lstm_model.h5', compile=False)
-svr_lower = joblib.load('trained_models/twsvr_lower.pkl')
-svr_upper = joblib.load('trained_models/twsvr_upper.pkl')
-scaler_X = joblib.load('trained_models/scaler_X.pkl')
-scaler_y = joblib.load('trained_models/scaler_y.pkl')
+
+# ===== HELPER FUNCTIONS =====
+
+def expand_date_range(start_date, end_date, temperatures):
+    """
+    Expand a date range and an hourly temperature vector into batch rows
+
+    Args:
+        start_date: First date (YYYY-MM-DD)
+        end_date: Last date, inclusive (YYYY-MM-DD)
+        temperatures: One temperature per hour of the range
+
+    Returns:
+        List of {"date", "hour", "temperature"} dicts
+    """
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    if end < start:
+        raise ValueError('end_date must not be before start_date')
+
+    n_days = (end - start).days + 1
+    if len(temperatures) != n_days * 24:
+        raise ValueError(f'Expected {n_days * 24} hourly temperatures, got {len(temperatures)}')
+
+    rows = []
+    for i, temperature in enumerate(temperatures):
+        day = start + timedelta(days=i // 24)
+        rows.append({
+            'date': day.strftime('%Y-%m-%d'),
+            'hour': i % 24,
+            'temperature': temperature
+        })
+    return rows
+
+HISTORY_COLUMNS = (
+    Prediction.prediction_id,
+    Prediction.date,
+    Prediction.hour,
+    Prediction.temperature,
+    Prediction.predicted_load,
+    Prediction.lower_bound,
+    Prediction.upper_bound,
+    Prediction.model_used,
+    Prediction.timestamp,
+)
+
+
+def parse_history_filters(args):
+    """
+    Parse history filters from query parameters
+
+    Args:
+        args: request.args
+
+    Returns:
+        Dictionary with start_date, end_date, hour and model (None when absent)
+
+    Raises:
+        ValueError: If a parameter is malformed
+    """
+    filters = {'start_date': None, 'end_date': None, 'hour': None, 'model': args.get('model') or None}
+
+    for key in ('start_date', 'end_date'):
+        if args.get(key):
+            try:
+                filters[key] = datetime.strptime(args[key], '%Y-%m-%d').date()
+            except ValueError:
+                raise ValueError(f'Invalid {key} (use YYYY-MM-DD)')
+
+    if args.get('hour') not in (None, ''):
+        try:
+            filters['hour'] = int(args['hour'])
+        except ValueError:
+            raise ValueError('Hour must be an integer')
+        if not 0 <= filters['hour'] <= 23:
+            raise ValueError('Hour must be between 0 and 23')
+
+    return filters
+
+
+def history_query(user_id, filters):
+    """
+    Newest-first projection of a user's predictions, served by
+    ix_predictions_user_timestamp
+
+    Returns:
+        SQLAlchemy select over HISTORY_COLUMNS
+    """
+    query = select(*HISTORY_COLUMNS).where(Prediction.user_id == user_id)
+
+    if filters['start_date'] is not None:
+        query = query.where(Prediction.date >= filters['start_date'])
+    if filters['end_date'] is not None:
+        query = query.where(Prediction.date <= filters['end_date'])
+    if filters['hour'] is not None:
+        query = query.where(Prediction.hour == filters['hour'])
+    if filters['model'] is not None:
+        query = query.where(Prediction.model_used == filters['model'])
+
+    return query.order_by(Prediction.timestamp.desc(), Prediction.prediction_id.desc())
+
+
+def history_row_to_dict(row):
+    """Serialize one projected history row"""
+    return {
+        "date": row.date.strftime("%Y-%m-%d") if hasattr(row.date, 'strftime') else row.date,
+        "hour": row.hour,
+        "temperature": row.temperature,
+        "predicted_load": row.predicted_load,
+        "lower_bound": row.lower_bound,
+        "upper_bound": row.upper_bound,
+        "model_used": row.model_used,
+        "timestamp": row.timestamp.strftime("%Y-%m-%d %H:%M")
+    }
+
+
+def encode_cursor(timestamp, prediction_id):
+    """Opaque cursor for the row a page ended on"""
+    raw = f"{timestamp.isoformat()}|{prediction_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Inverse of encode_cursor
+
+    Returns:
+        Tuple of (timestamp, prediction_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        timestamp, prediction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(timestamp), int(prediction_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError('Invalid cursor')
+
+
+def history_page_query(user_id, args):
+    """
+    SELECT for one keyset page of a user's history
+
+    Args:
+        user_id: Owner of the predictions
+        args: Query parameters (limit, cursor and the history filters)
+
+    Returns:
+        Tuple of (select fetching limit + 1 rows, page size) for history_page_result
+
+    Raises:
+        ValueError: If a parameter or the cursor is malformed
+    """
+    filters = parse_history_filters(args)
+    try:
+        limit = int(args.get('limit', 20))
+    except ValueError:
+        raise ValueError('Limit must be an integer')
+    cursor = decode_cursor(args.get('cursor')) if args.get('cursor') else None
+    limit = max(1, min(limit, current_app.config.get('HISTORY_MAX_LIMIT', 200)))
+
+    query = history_query(user_id, filters)
+    if cursor is not None:
+        # Rows strictly after the cursor in (timestamp desc, prediction_id desc) order.
+        # The plain timestamp bound lets the index seek instead of scanning from the top.
+        cursor_timestamp, cursor_id = cursor
+        query = query.where(
+            Prediction.timestamp <= cursor_timestamp,
+            or_(Prediction.timestamp < cursor_timestamp, Prediction.prediction_id < cursor_id)
+        )
+
+    # Fetch one extra row to know whether another page exists
+    return query.limit(limit + 1), limit
+
+
+def history_page_result(rows, limit):
+    """
+    Serialize the rows of a history_page_query
+
+    Returns:
+        Tuple of (list of row dictionaries, next cursor or None)
+    """
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].timestamp, rows[-1].prediction_id)
+
+    return [history_row_to_dict(row) for row in rows], next_cursor
+
+
+def history_page(user_id, args):
+    """
+    One keyset page of a user's history (the ASGI route runs the same
+    history_page_query on its async session)
+
+    Args:
+        user_id: Owner of the predictions
+        args: Query parameters (limit, cursor and the history filters)
+
+    Returns:
+        Tuple of (list of row dictionaries, next cursor or None)
+
+    Raises:
+        ValueError: If a parameter or the cursor is malformed
+    """
+    query, limit = history_page_query(user_id, args)
+    return history_page_result(db.session.execute(query).all(), limit)
+
+
+def single_prediction_body(y_pred, lower, upper):
+    """Response body of /single (shared by the Flask and ASGI routes)"""
+    return {
+        "predicted_load": float(y_pred[0]),
+        "lower_bound": float(lower[0]),
+        "upper_bound": float(upper[0]),
+        "confidence_interval": f"{lower[0]:.2f} - {upper[0]:.2f}"
+    }
+
+
+def single_prediction_input(data):
+    """
+    Validated model input of /single (shared by the Flask and ASGI routes)
+
+    Args:
+        data: Parsed JSON body with temperature, hour and date (YYYY-MM-DD)
+
+    Returns:
+        Tuple of (feature matrix, parsed dates) from create_batch_prediction_input
+
+    Raises:
+        ValueError: If the body is empty or a field is out of range
+    """
+    if not data or not isinstance(data, dict):
+        raise ValueError('Request body is empty')
+
+    # Same checks as each /batch row, so out-of-range values never reach the models
+    is_valid, error_message = validate_prediction_input(data.get('temperature'), data.get('hour'), data.get('date'))
+    if not is_valid:
+        raise ValueError(error_message)
+
+    # Same feature builder as training and batch scoring
+    return create_batch_prediction_input([data['date']], [data['hour']], [data['temperature']])
+
+
+def horizon_history_input(history, max_errors=5):
+    """
+    Validated history of /horizon
+
+    Args:
+        history: List of {"date", "hour", "temperature", "load"} rows, oldest first
+        max_errors: Maximum number of offending rows to list
+
+    Returns:
+        Tuple of (calendar feature matrix, parsed dates, loads) for every row
+
+    Raises:
+        ValueError: If history is not a list of rows, a row is invalid, or the
+            rows are not consecutive hours
+    """
+    if not isinstance(history, list):
+        raise ValueError('History must be a list of rows')
+    for i, row in enumerate(history):
+        if not isinstance(row, dict):
+            raise ValueError(f'History row {i}: must be an object')
+
+    def listed(rows):
+        more = f" (+{len(rows) - max_errors} more)" if len(rows) > max_errors else ""
+        return ', '.join(str(row) for row in rows[:max_errors]) + more
+
+    # Same row checks as uploads; history is observed data, so past dates are expected
+    frame = pd.DataFrame({
+        'Date': [row.get('date') for row in history],
+        'Hour': [row.get('hour') for row in history],
+        'Temperature': [row.get('temperature') for row in history]
+    })
+    is_valid, error_message = validate_prediction_frame(frame, allow_past=True)
+    if not is_valid:
+        raise ValueError(f'Invalid history: {error_message}')
+
+    loads = pd.to_numeric(pd.Series([row.get('load') for row in history], dtype=object), errors='coerce').to_numpy(float)
+    bad_loads = np.flatnonzero(~np.isfinite(loads))
+    if len(bad_loads):
+        raise ValueError(f'Invalid history: Load must be a number: row(s) {listed(bad_loads)}')
+
+    X_calendar, dates = create_batch_prediction_input(frame['Date'], frame['Hour'], frame['Temperature'])
+
+    # The model reads fixed-length hourly windows: a gap or a reordered row shifts every lag
+    timestamps = dates.to_numpy().astype('datetime64[h]') + X_calendar[:, 1].astype(int).astype('timedelta64[h]')
+    gaps = np.flatnonzero(np.diff(timestamps) != np.timedelta64(1, 'h')) + 1
+    if len(gaps):
+        raise ValueError(f'Invalid history: Rows must be consecutive hours, oldest first: row(s) {listed(gaps)}')
+
+    return X_calendar, dates, loads
+
 
 @pred_bp.route('/single', methods=['POST'])
 @jwt_required()
@@ -23,71 +324,350 @@ def predict_single():
     Protected! Must pass JWT token.
     """
     user_id = get_jwt_identity()
-    data = request.get_json()
-    temperature = data.get('temperature')
-    hour = data.get('hour')
-    date_str = data.get('date')  # "YYYY-MM-DD"
-
-    # Extract month & weekday from date string
-    dt = datetime.strptime(date_str, '%Y-%m-%d')
-    month = dt.month
-    weekday = dt.weekday()
-
-    # Prepare and scale input features
-    X_input = np.array([[temperature, hour, month, weekday]])
-    X_scaled = scaler_X.transform(X_input)
-    X_lstm = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
-
-    # LSTM point prediction
-    y_pred_scaled = lstm_model.predict(X_lstm)
-    y_pred = scaler_y.inverse_transform(y_pred_scaled.reshape(-1, 1)).flatten()
-
-    # SVR interval predictions
-    lower_scaled = svr_lower.predict(X_scaled)
-    upper_scaled = svr_upper.predict(X_scaled)
-    lower = scaler_y.inverse_transform(lower_scaled.reshape(-1, 1)).flatten()
-    upper = scaler_y.inverse_transform(upper_scaled.reshape(-1, 1)).flatten()
+    with instrumentation.stage('parse'):
+        try:
+            X_input, dates = single_prediction_input(request.get_json(silent=True))
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+
+    # Run LSTM + SVR intervals (cache, batching and model stages are timed inside)
+    try:
+        model = registry.get()
+    except ModelUnavailableError as e:
+        return jsonify({'error': str(e)}), 503
+
+    try:
+        with instrumentation.stage('predict'):
+            y_pred, lower, upper = micro_batcher.predict(model, X_input)
+    except ModelUnavailableError as e:
+        return jsonify({'error': str(e)}), 503
+    except ValueError as e:
+        # e.g. a row off the lookup table's grid
+        return jsonify({'error': str(e)}), 400
 
     # Save prediction in DB
-    prediction = Prediction(
-        user_id=user_id,
-        date=dt.date(),
-        hour=hour,
-        temperature=temperature,
-        month=month,
-        weekday=weekday,
-        predicted_load=float(y_pred[0]),
-        lower_bound=float(lower[0]),
-        upper_bound=float(upper[0]),
-        model_used="LSTM+TWSVR"
-    )
-    db.session.add(prediction)
-    db.session.commit()
+    with instrumentation.stage('persist'):
+        prediction_writer.write(build_prediction_records(
+            user_id, dates, X_input, y_pred, lower, upper, model.label
+        ))
+
+    with instrumentation.stage('serialize'):
+        return jsonify(single_prediction_body(y_pred, lower, upper)), 200
+
+@pred_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def predict_batch():
+    """
+    Score many (date, hour, temperature) rows in one model call
+    Protected! Must pass JWT token.
+
+    Request JSON (either form):
+    {
+        "rows": [{"date": "2025-01-01", "hour": 0, "temperature": 12.5}, ...]
+    }
+    {
+        "start_date": "2025-01-01",
+        "end_date": "2025-01-01",
+        "temperatures": [12.5, 12.1, ...]  # 24 values per day
+    }
+
+    Response:
+    {
+        "count": 24,
+        "predictions": [{"date", "hour", "temperature", "predicted_load",
+                         "lower_bound", "upper_bound"}, ...]
+    }
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json(silent=True)
+
+    if not data or not isinstance(data, dict):
+        return jsonify({'error': 'Request body is empty'}), 400
+
+    # Accept explicit rows or a date range plus hourly temperatures
+    if 'rows' in data:
+        rows = data.get('rows') or []
+        if not isinstance(rows, list):
+            return jsonify({'error': 'Rows must be a list'}), 400
+    elif 'start_date' in data:
+        try:
+            rows = expand_date_range(
+                data.get('start_date'),
+                data.get('end_date', data.get('start_date')),
+                data.get('temperatures') or []
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+    else:
+        return jsonify({'error': 'Provide either rows or start_date/end_date/temperatures'}), 400
+
+    if not rows:
+        return jsonify({'error': 'No rows to predict'}), 400
+
+    max_rows = current_app.config.get('BATCH_MAX_ROWS', 10000)
+    if len(rows) > max_rows:
+        return jsonify({'error': f'Batch is limited to {max_rows} rows'}), 400
+
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            return jsonify({'error': f'Row {i}: must be an object'}), 400
+        is_valid, error_message = validate_prediction_input(
+            row.get('temperature'), row.get('hour'), row.get('date')
+        )
+        if not is_valid:
+            return jsonify({'error': f'Row {i}: {error_message}'}), 400
+
+    # Build the whole feature matrix at once
+    try:
+        X_input, dates = create_batch_prediction_input(
+            [row['date'] for row in rows],
+            [row['hour'] for row in rows],
+            [row['temperature'] for row in rows]
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        model = registry.get()
+    except ModelUnavailableError as e:
+        return jsonify({'error': str(e)}), 503
+
+    try:
+        y_pred, lower, upper = prediction_cache.predict(model, X_input)
+    except ModelUnavailableError as e:
+        return jsonify({'error': str(e)}), 503
+    except ValueError as e:
+        # e.g. a row off the lookup table's grid
+        return jsonify({'error': str(e)}), 400
+
+    # Persist every prediction with a single bulk insert
+    records = build_prediction_records(user_id, dates, X_input, y_pred, lower, upper, model.label)
+    prediction_writer.write(records)
 
     return jsonify({
-        "predicted_load": float(y_pred[0]),
-        "lower_bound": float(lower[0]),
-        "upper_bound": float(upper[0]),
-        "confidence_interval": f"{lower[0]:.2f} - {upper[0]:.2f}"
+        "count": len(records),
+        "predictions": [
+            {
+                "date": dates[i].strftime("%Y-%m-%d"),
+                "hour": records[i]['hour'],
+                "temperature": records[i]['temperature'],
+                "predicted_load": records[i]['predicted_load'],
+                "lower_bound": records[i]['lower_bound'],
+                "upper_bound": records[i]['upper_bound']
+            }
+            for i in range(len(records))
+        ]
+    }), 200
+
+@pred_bp.route('/horizon', methods=['POST'])
+@jwt_required()
+def predict_horizon():
+    """
+    Forecast the next 24h/168h in one forward pass from recent history
+    Protected! Must pass JWT token. Needs a model version trained with --sequence.
+
+    Request JSON (time-ordered hourly rows, at least `lookback` of them):
+    {
+        "history": [{"date": "2025-01-01", "hour": 0, "temperature": 12.5, "load": 1234.0}, ...]
+    }
+
+    Response:
+    {
+        "horizon": 24,
+        "predictions": [{"date", "hour", "predicted_load", "lower_bound", "upper_bound"}, ...]
+    }
+    """
+    data = request.get_json(silent=True)
+
+    if not data or not isinstance(data, dict):
+        return jsonify({'error': 'Request body is empty'}), 400
+
+    if not data.get('history'):
+        return jsonify({'error': 'History is required'}), 400
+
+    try:
+        X_calendar, dates, loads = horizon_history_input(data['history'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        sequence = registry.get().get_sequence()
+    except ModelUnavailableError as e:
+        return jsonify({'error': str(e)}), 503
+
+    if len(loads) < sequence.lookback:
+        return jsonify({'error': f'Need at least {sequence.lookback} hours of history, got {len(loads)}'}), 400
+
+    X_calendar = X_calendar[-sequence.lookback:]
+    dates = dates[-sequence.lookback:]
+    loads = loads[-sequence.lookback:]
+
+    # SEQUENCE_FEATURES order: load, temperature, hour, month, weekday
+    recent = np.column_stack([loads, X_calendar])
+    last_timestamp = dates[-1] + timedelta(hours=int(X_calendar[-1, 1]))
+    forecast = sequence.predict(recent, last_timestamp)
+
+    return jsonify({
+        "horizon": sequence.horizon,
+        "predictions": [
+            {
+                "date": timestamp.strftime("%Y-%m-%d"),
+                "hour": timestamp.hour,
+                "predicted_load": float(forecast['predicted_load'][i]),
+                "lower_bound": float(forecast['lower_bound'][i]),
+                "upper_bound": float(forecast['upper_bound'][i])
+            }
+            for i, timestamp in enumerate(forecast['timestamps'])
+        ]
     }), 200
 
+@pred_bp.route('/upload', methods=['POST'])
+@jwt_required()
+def upload_forecast():
+    """
+    Upload a CSV of future rows and score it in the background
+    Protected! Must pass JWT token.
+
+    Multipart form field "file": CSV with Date (YYYY-MM-DD), Hour, Temperature columns
+
+    Response (202):
+    {
+        "job_id": "3f0c...",
+        "status": "queued",
+        "status_url": "/api/predict/jobs/3f0c..."
+    }
+    """
+    user_id = get_jwt_identity()
+    upload = request.files.get('file')
+
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'File is required'}), 400
+
+    filename = secure_filename(upload.filename)
+    if not filename.lower().endswith('.csv'):
+        return jsonify({'error': 'Only CSV files are supported'}), 400
+
+    job_id = str(uuid.uuid4())
+    upload_path = os.path.join(current_app.config['UPLOAD_FOLDER'], f"{job_id}.csv")
+    upload.save(upload_path)
+
+    job = ForecastJob(job_id=job_id, user_id=int(user_id), filename=filename, status='queued')
+    db.session.add(job)
+    db.session.commit()
+
+    job_runner.submit(job_id, upload_path)
+
+    return jsonify({
+        'job_id': job_id,
+        'status': job.status,
+        'status_url': url_for('predictions.get_job_status', job_id=job_id)
+    }), 202
+
+@pred_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job_status(job_id):
+    """Poll an upload job; includes a download URL once completed"""
+    job = ForecastJob.query.filter_by(job_id=job_id, user_id=int(get_jwt_identity())).first()
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    result = job.to_dict()
+    if job.status == 'completed':
+        result['download_url'] = url_for('predictions.download_job_result', job_id=job_id)
+    return jsonify(result), 200
+
+@pred_bp.route('/jobs/<job_id>/download', methods=['GET'])
+@jwt_required()
+def download_job_result(job_id):
+    """Download the scored CSV of a completed upload job"""
+    job = ForecastJob.query.filter_by(job_id=job_id, user_id=int(get_jwt_identity())).first()
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    if job.status != 'completed' or not job.result_path or not os.path.exists(job.result_path):
+        return jsonify({'error': f'Job is {job.status}, no result available'}), 409
+
+    return send_file(
+        os.path.abspath(job.result_path),
+        mimetype='text/csv',
+        as_attachment=True,
+        download_name=f"forecast_{os.path.splitext(job.filename)[0]}.csv"
+    )
+
 @pred_bp.route('/history', methods=['GET'])
 @jwt_required()
 def get_prediction_history():
-    user_id = get_jwt_identity()
-    predictions = Prediction.query.filter_by(user_id=user_id).order_by(Prediction.timestamp.desc()).limit(20).all()
-
-    history = []
-    for p in predictions:
-        history.append({
-            "date": p.date.strftime("%Y-%m-%d") if hasattr(p.date, 'strftime') else p.date,
-            "hour": p.hour,
-            "temperature": p.temperature,
-            "predicted_load": p.predicted_load,
-            "lower_bound": p.lower_bound,
-            "upper_bound": p.upper_bound,
-            "model_used": p.model_used,
-            "timestamp": p.timestamp.strftime("%Y-%m-%d %H:%M")
-        })
+    """
+    Newest-first prediction history with keyset pagination
+    Protected! Must pass JWT token.
+
+    Query parameters (all optional):
+        limit: Page size (default 20, max HISTORY_MAX_LIMIT)
+        cursor: Value of the previous page's X-Next-Cursor header
+        start_date / end_date: Forecast date range, inclusive (YYYY-MM-DD)
+        hour: Forecast hour (0-23)
+        model: Exact model_used label
+
+    Response: JSON list of predictions. When more rows exist, the
+    X-Next-Cursor header holds the cursor for the next page.
+    """
+    try:
+        history, next_cursor = history_page(int(get_jwt_identity()), request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = jsonify(history)
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
+
+
+@pred_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_predictions():
+    """
+    Stream every matching prediction as CSV, NDJSON or Parquet
+    Protected! Must pass JWT token.
+
+    Query parameters:
+        format: csv (default), ndjson or parquet
+        start_date / end_date / hour / model: Same filters as /history
+
+    Rows come from a server-side cursor in EXPORT_CHUNK_SIZE partitions,
+    so memory use does not grow with the number of predictions.
+    """
+    user_id = int(get_jwt_identity())
+    export_format = request.args.get('format', 'csv').lower()
+
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"Format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    if export_format == 'parquet' and not parquet_available():
+        return jsonify({'error': 'Parquet export requires pyarrow on the server'}), 400
 
-    return jsonify(history), 200
+    try:
+        filters = parse_history_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    chunk_size = current_app.config.get('EXPORT_CHUNK_SIZE', 1000)
+    query = history_query(user_id, filters).execution_options(stream_results=True, yield_per=chunk_size)
+
+    def generate():
+        result = db.session.execute(query)
+        try:
+            yield from SERIALIZERS[export_format](result.partitions())
+        finally:
+            result.close()
+
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    filename = f"predictions_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.{extension}"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+            'X-Content-Type-Options': 'nosniff'
+        }
+    )
@@ -1,6 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
-import bcrypt
 
 db = SQLAlchemy()
 
@@ -17,14 +16,14 @@ class User(db.Model):
     is_verified = db.Column(db.Boolean, default=False)
     is_active = db.Column(db.Boolean, default=True)
 
-    # ADD THESE METHODS:
+    # bcrypt runs on the bounded password_hasher pool (BCRYPT_ROUNDS cost)
     def set_password(self, password):
-        import bcrypt
-        self.password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+        from utils.security import password_hasher
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        import bcrypt
-        return bcrypt.checkpw(password.encode(), self.password_hash.encode())
+        from utils.security import password_hasher
+        return password_hasher.verify(password, self.password_hash)
 
     def to_dict(self):
         return {
@@ -38,6 +37,10 @@ class User(db.Model):
     
 class Prediction(db.Model):
     __tablename__ = 'predictions'
+    __table_args__ = (
+        # Serves history/export: filter by user, newest first
+        db.Index('ix_predictions_user_timestamp', 'user_id', 'timestamp'),
+    )
 
     prediction_id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
@@ -51,3 +54,30 @@ class Prediction(db.Model):
     upper_bound = db.Column(db.Float)
     model_used = db.Column(db.String(50), default='LSTM+TWSVR')
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ForecastJob(db.Model):
+    __tablename__ = 'forecast_jobs'
+
+    job_id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=False)
+    filename = db.Column(db.String(255))
+    status = db.Column(db.String(20), default='queued')  # queued, running, completed, failed
+    rows_total = db.Column(db.Integer, default=0)
+    rows_done = db.Column(db.Integer, default=0)
+    error = db.Column(db.Text)
+    result_path = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "rows_total": self.rows_total,
+            "rows_done": self.rows_done,
+            "error": self.error,
+            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S") if self.created_at else None,
+            "finished_at": self.finished_at.strftime("%Y-%m-%d %H:%M:%S") if self.finished_at else None,
+        }
@@ -0,0 +1,62 @@
+"""
+Shared fixtures: apps on a SQLite file and logged-in test clients
+"""
+import os
+
+import pytest
+
+from app import create_app, create_asgi_app
+from config import TestingConfig
+from schemas.models import db, User
+
+USER = {'username': 'user1', 'email': 'user1@example.com', 'password': 'secret1'}
+
+
+def make_config(database_dir, **settings):
+    """
+    TestingConfig on a SQLite file, so every thread (and the ASGI pools) sees the same database
+
+    Args:
+        database_dir: Directory for test.db
+        **settings: Config values to override
+    """
+    settings = {'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(str(database_dir), 'test.db'), **settings}
+    return type('TestConfig', (TestingConfig,), settings)
+
+
+@pytest.fixture
+def app_factory(tmp_path):
+    """
+    Build apps on a database under tmp_path
+
+    Returns:
+        app_factory(asgi=False, database_dir=tmp_path, **settings) giving
+        create_app(config), or create_asgi_app(config) with asgi set
+    """
+    def factory(asgi=False, database_dir=None, **settings):
+        config = make_config(database_dir or tmp_path, **settings)
+        return create_asgi_app(config) if asgi else create_app(config)
+    return factory
+
+
+@pytest.fixture
+def auth_client(app_factory):
+    """
+    Flask test clients that send user1's bearer token with every request
+
+    Returns:
+        auth_client(role=None, **settings) registering user1 on
+        app_factory(**settings), giving it role if set, then logging in
+    """
+    def factory(role=None, **settings):
+        app = app_factory(**settings)
+        client = app.test_client()
+        client.post('/api/auth/register', json=USER)
+        if role is not None:
+            with app.app_context():
+                db.session.execute(db.update(User).where(User.email == USER['email']).values(role=role))
+                db.session.commit()
+        token = client.post('/api/auth/login', json={'email': USER['email'], 'password': USER['password']}).get_json()
+        client.environ_base['HTTP_AUTHORIZATION'] = f"Bearer {token['access_token']}"
+        return client
+    return factory
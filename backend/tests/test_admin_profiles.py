@@ -0,0 +1,41 @@
+"""
+GET /api/admin/profiles query parameters
+
+Auth requests are profiled (sample rate 1) so the admin's own register and
+login calls leave captures to list.
+"""
+import pytest
+
+
+@pytest.fixture
+def client(auth_client, tmp_path):
+    return auth_client(
+        role='admin', PROFILING_ENABLED=True, PROFILE_SAMPLE_RATE=1.0,
+        PROFILE_DIR=str(tmp_path / 'profiles'), PROFILE_PATHS='/api/auth/'
+    )
+
+
+def test_profiles_lists_captures(client):
+    response = client.get('/api/admin/profiles')
+    assert response.status_code == 200
+    assert len(response.get_json()['profiles']) == 2
+
+
+@pytest.mark.parametrize('limit, expected', [('0', 1), ('-1', 1), ('1', 1), ('1000', 2)])
+def test_profiles_limit_is_clamped(client, limit, expected):
+    response = client.get('/api/admin/profiles', query_string={'limit': limit})
+    assert response.status_code == 200
+    assert len(response.get_json()['profiles']) == expected
+
+
+def test_profiles_negative_top_returns_no_functions(client):
+    response = client.get('/api/admin/profiles', query_string={'top': '-3'})
+    assert response.status_code == 200
+    assert all(capture['top_functions'] == [] for capture in response.get_json()['profiles'])
+
+
+@pytest.mark.parametrize('params', [{'limit': 'ten'}, {'limit': '2.5'}, {'top': 'x'}])
+def test_profiles_rejects_non_integer_params(client, params):
+    response = client.get('/api/admin/profiles', query_string=params)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'limit and top must be integers'}
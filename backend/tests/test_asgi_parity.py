@@ -0,0 +1,285 @@
+"""
+WSGI / ASGI parity
+
+Runs the auth, prediction and history scenarios through create_app() and
+create_asgi_app() and checks both give the same status codes and bodies.
+The ASGI app is called in-process on an event loop thread, the way an
+ASGI server would call it.
+
+Run from backend/:
+    python -m pytest -q tests
+"""
+import glob
+import json
+import pstats
+import time
+
+import pytest
+
+from benchmarks.stub_models import build_stub_models
+from routes.async_api import AsyncApi, async_api, async_database_uri
+from utils.asgi import AsgiClient, start_event_loop
+from utils.instrumentation import instrumentation
+
+# Values that legitimately differ between two runs (issue times, row timestamps)
+VOLATILE_KEYS = {'access_token', 'created_at', 'timestamp'}
+
+
+# ===== CLIENTS =====
+
+class WsgiClient:
+    """Flask test client returning (status, headers, body)"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, json_body=None, data=None, params=None, headers=None):
+        response = self.client.open(
+            path, method=method, json=json_body, data=data, query_string=params, headers=headers
+        )
+        return response.status_code, dict(response.headers), response.get_json(silent=True)
+
+
+# ===== FIXTURES =====
+
+@pytest.fixture(scope='module')
+def model_dir(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp('models'))
+    build_stub_models(directory, lstm_units=8)
+    return directory
+
+
+@pytest.fixture(scope='module')
+def loop():
+    loop = start_event_loop()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+
+
+@pytest.fixture
+def make_client(app_factory, model_dir, loop):
+    """
+    make_client(mode, database_dir=None, **settings): a WsgiClient or AsgiClient
+    (mode 'wsgi' or 'asgi') on the stub model version
+    """
+    def factory(mode, database_dir=None, **settings):
+        settings = {
+            'MODEL_DIR': model_dir, 'MODEL_VERSION': 'stub', 'MODEL_WATCH_INTERVAL': 0,
+            'CORS_ORIGINS': 'http://localhost:3000', **settings
+        }
+        app = app_factory(asgi=mode == 'asgi', database_dir=database_dir, **settings)
+        return AsgiClient(app, loop) if mode == 'asgi' else WsgiClient(app)
+    return factory
+
+
+def normalize(body):
+    if isinstance(body, dict):
+        return {key: normalize(value) for key, value in body.items() if key not in VOLATILE_KEYS}
+    if isinstance(body, list):
+        return [normalize(item) for item in body]
+    return body
+
+
+# ===== SCENARIOS =====
+
+def run_scenarios(client):
+    """
+    Auth, prediction and history calls in a fixed order
+
+    Returns:
+        List of (label, status, normalized body) tuples
+    """
+    results = []
+
+    def record(label, response):
+        status, headers, body = response
+        results.append((label, status, normalize(body)))
+        return status, headers, body
+
+    record('register', client.request('POST', '/api/auth/register', {
+        'username': 'user1', 'email': 'user1@example.com', 'password': 'secret1'
+    }))
+
+    # Login
+    record('login empty', client.request('POST', '/api/auth/login', {}))
+    record('login no password', client.request('POST', '/api/auth/login', {'email': 'user1@example.com'}))
+    record('login JSON list', client.request('POST', '/api/auth/login', ['user1@example.com', 'secret1']))
+    record('login non-string email', client.request('POST', '/api/auth/login', {'email': 42, 'password': 'secret1'}))
+    record('login non-string password', client.request('POST', '/api/auth/login', {
+        'email': 'user1@example.com', 'password': ['secret1']
+    }))
+    record('login wrong password', client.request('POST', '/api/auth/login', {
+        'email': 'user1@example.com', 'password': 'wrong-password'
+    }))
+    record('login unknown user', client.request('POST', '/api/auth/login', {
+        'email': 'nobody@example.com', 'password': 'secret1'
+    }))
+    _, _, body = record('login', client.request('POST', '/api/auth/login', {
+        'email': 'User1@Example.com ', 'password': 'secret1'
+    }))
+    auth = {'Authorization': f"Bearer {body['access_token']}"}
+
+    # Token checks
+    record('verify no token', client.request('GET', '/api/auth/verify-token'))
+    record('verify bad token', client.request('GET', '/api/auth/verify-token', headers={'Authorization': 'Bearer abc'}))
+    record('verify bad scheme', client.request('GET', '/api/auth/verify-token', headers={'Authorization': 'Token abc'}))
+    record('verify', client.request('GET', '/api/auth/verify-token', headers=auth))
+    record('user info', client.request('GET', '/api/auth/user-info', headers=auth))
+
+    # Single predictions
+    for temperature in (18.0, 21.5, 25.0):
+        record('single', client.request('POST', '/api/predict/single', {
+            'temperature': temperature, 'hour': 14, 'date': '2027-01-02'
+        }, headers=auth))
+    record('single no token', client.request('POST', '/api/predict/single', {
+        'temperature': 20, 'hour': 5, 'date': '2027-01-02'
+    }))
+    record('single empty body', client.request('POST', '/api/predict/single', data=b'', headers=auth))
+    record('single non-JSON body', client.request('POST', '/api/predict/single', data='temperature=20', headers={
+        **auth, 'Content-Type': 'text/plain'
+    }))
+    record('single JSON list', client.request('POST', '/api/predict/single', [1, 2, 3], headers=auth))
+    record('single missing field', client.request('POST', '/api/predict/single', {
+        'temperature': 20, 'hour': 5
+    }, headers=auth))
+    record('single bad date', client.request('POST', '/api/predict/single', {
+        'temperature': 20, 'hour': 5, 'date': '2027-13-02'
+    }, headers=auth))
+    record('single bad hour', client.request('POST', '/api/predict/single', {
+        'temperature': 20, 'hour': 99, 'date': '2027-01-02'
+    }, headers=auth))
+    record('single NaN temperature', client.request('POST', '/api/predict/single', {
+        'temperature': float('nan'), 'hour': 5, 'date': '2027-01-02'
+    }, headers=auth))
+    record('single bool values', client.request('POST', '/api/predict/single', {
+        'temperature': True, 'hour': True, 'date': '2027-01-02'
+    }, headers=auth))
+
+    # History
+    status, headers, _ = record('history page 1', client.request(
+        'GET', '/api/predict/history', params={'limit': 2}, headers=auth
+    ))
+    cursor = headers.get('X-Next-Cursor')
+    results.append(('history has next cursor', status, cursor is not None))
+    record('history page 2', client.request(
+        'GET', '/api/predict/history', params={'limit': 2, 'cursor': cursor}, headers=auth
+    ))
+    record('history bad cursor', client.request(
+        'GET', '/api/predict/history', params={'cursor': 'not-a-cursor'}, headers=auth
+    ))
+    record('history bad hour', client.request('GET', '/api/predict/history', params={'hour': 30}, headers=auth))
+    record('history bad limit', client.request('GET', '/api/predict/history', params={'limit': 'ten'}, headers=auth))
+    record('history no token', client.request('GET', '/api/predict/history'))
+
+    # CORS headers on a native route
+    status, headers, _ = client.request('POST', '/api/auth/login', {'email': 'user1@example.com', 'password': 'x'},
+                                        headers={'Origin': 'http://localhost:3000'})
+    results.append(('login CORS', status, headers.get('Access-Control-Allow-Origin')))
+
+    return results
+
+
+# ===== TESTS =====
+
+@pytest.mark.parametrize('async_db', [
+    pytest.param(True, marks=pytest.mark.skipif(async_database_uri('sqlite:///x.db') is None,
+                                                reason='aiosqlite is not installed')),
+    False
+], ids=['async-session', 'db-pool'])
+def test_wsgi_and_asgi_give_identical_responses(make_client, tmp_path, async_db):
+    transcripts = {}
+    for mode in ('wsgi', 'asgi'):
+        directory = tmp_path / mode
+        directory.mkdir()
+        transcripts[mode] = run_scenarios(make_client(mode, directory, ASGI_ASYNC_DB=async_db))
+    # Login and history reads went through the AsyncSession, or through the pool
+    assert (async_api._engine is not None) == async_db
+
+    assert len(transcripts['wsgi']) == len(transcripts['asgi'])
+    for wsgi_result, asgi_result in zip(transcripts['wsgi'], transcripts['asgi']):
+        assert asgi_result == wsgi_result
+
+    statuses = {label: status for label, status, _ in transcripts['asgi']}
+    bodies = {label: body for label, _, body in transcripts['asgi']}
+    assert statuses['login'] == 200
+    assert bodies['login JSON list'] == {'error': 'Request body is empty'}
+    assert bodies['login non-string email'] == {'error': 'Email is required'}
+    assert bodies['login non-string password'] == {'error': 'Password is required'}
+    assert statuses['single'] == 200
+    assert statuses['single empty body'] == 400
+    assert statuses['single non-JSON body'] == 400
+    assert bodies['single NaN temperature'] == {'error': 'Temperature must be a number'}
+    assert bodies['single bool values'] == {'error': 'Temperature must be a number | Hour must be an integer'}
+    assert statuses['history bad limit'] == 400
+    assert bodies['history bad limit'] == {'error': 'Limit must be an integer'}
+
+
+def test_native_routes_run_flask_request_hooks(make_client, tmp_path, monkeypatch):
+    profile_dir = tmp_path / 'profiles'
+    client = make_client('asgi', PROFILING_ENABLED=True, PROFILE_SAMPLE_RATE=1.0,
+                         PROFILE_DIR=str(profile_dir), PROFILE_PATHS='/api/auth/,/api/predict/')
+
+    def login_requests():
+        counters, _ = instrumentation.collect()
+        return sum(value for (name, labels), value in counters.items()
+                   if name == 'http_requests_total' and dict(labels).get('endpoint') == '/api/auth/login')
+
+    client.request('POST', '/api/auth/register', {
+        'username': 'user1', 'email': 'user1@example.com', 'password': 'secret1'
+    })
+    before = login_requests()
+    status, _, body = client.request('POST', '/api/auth/login', {
+        'email': 'user1@example.com', 'password': 'secret1'
+    })
+    assert status == 200
+    auth = {'Authorization': f"Bearer {body['access_token']}"}
+
+    # Counted once, by the after_request hook
+    assert login_requests() == before + 1
+
+    # Inference that takes a known time, awaited after the route has authenticated
+    predict = AsyncApi._predict
+
+    def slow_predict(X_input):
+        time.sleep(0.05)
+        return predict(X_input)
+
+    monkeypatch.setattr(AsyncApi, '_predict', staticmethod(slow_predict))
+
+    status, _, _ = client.request('GET', '/api/auth/verify-token', headers=auth)
+    assert status == 200
+    status, _, _ = client.request('POST', '/api/predict/single', {
+        'temperature': 20, 'hour': 5, 'date': '2027-01-02'
+    }, headers=auth)
+    assert status == 200
+
+    captures = {}
+    for path in glob.glob(str(profile_dir / '*.json')):
+        with open(path) as f:
+            capture = json.load(f)
+        captures[capture['path']] = capture
+
+    # Authenticated routes keep their profile running until the response is built
+    for path in ('/api/auth/login', '/api/auth/verify-token', '/api/predict/single'):
+        assert captures[path]['status'] == 200
+        stats = pstats.Stats(str(profile_dir / f"{captures[path]['name']}.prof"))
+        assert any(function == 'make_response' for _, _, function in stats.stats)
+    assert captures['/api/predict/single']['duration_ms'] >= 50
+
+
+def test_bridged_body_over_max_content_length_is_rejected(make_client):
+    client = make_client('asgi', MAX_CONTENT_LENGTH=1024)
+
+    status, headers, body = client.request('POST', '/api/auth/register', data=b'x' * 2048, headers={
+        'Content-Type': 'application/json', 'Origin': 'http://localhost:3000'
+    })
+    assert status == 413
+    assert body == {'error': 'Request body too large'}
+    assert headers.get('Access-Control-Allow-Origin') == 'http://localhost:3000'
+
+    # Without a Content-Length the limit applies while the chunks are read
+    status, _, body = client.request('POST', '/api/auth/register', data=b'x' * 2048, headers={
+        'Content-Type': 'application/json', 'Transfer-Encoding': 'chunked'
+    })
+    assert status == 413
+    assert body == {'error': 'Request body too large'}
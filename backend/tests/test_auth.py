@@ -0,0 +1,69 @@
+"""
+Password change status order, bcrypt cost upgrades on login and
+IdentityCache invalidation on role changes and deletes
+"""
+import bcrypt
+import pytest
+
+from schemas.models import db, User
+from tests.conftest import USER
+from utils.security import identity_cache
+
+
+def stored_user():
+    return db.session.execute(db.select(User).where(User.email == USER['email'])).scalar_one()
+
+
+def test_wrong_old_password_is_checked_before_the_new_password(auth_client):
+    client = auth_client()
+    response = client.post('/api/auth/change-password', json={'old_password': 'wrong1', 'new_password': 'x'})
+    assert response.status_code == 401
+    assert response.get_json() == {'error': 'Old password is incorrect'}
+
+    response = client.post('/api/auth/change-password', json={'old_password': USER['password'], 'new_password': 'x'})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'New password must be at least 6 characters'}
+
+
+@pytest.mark.parametrize('stored_rounds, expected_rounds', [(4, 5), (6, 6)])
+def test_login_only_raises_the_bcrypt_cost(auth_client, stored_rounds, expected_rounds):
+    client = auth_client(BCRYPT_ROUNDS=5)
+    app = client.application
+    with app.app_context():
+        stored_user().password_hash = bcrypt.hashpw(USER['password'].encode(), bcrypt.gensalt(stored_rounds)).decode()
+        db.session.commit()
+
+    response = client.post('/api/auth/login', json={'email': USER['email'], 'password': USER['password']})
+    assert response.status_code == 200
+    with app.app_context():
+        assert int(stored_user().password_hash.split('$')[2]) == expected_rounds
+
+
+def test_role_change_invalidates_the_cached_identity(auth_client):
+    client = auth_client()
+    assert client.get('/api/auth/verify-token').get_json()['role'] == 'user'
+
+    with client.application.app_context():
+        user = stored_user()
+        assert identity_cache.peek(user.user_id) is not None
+        user.role = 'admin'
+        db.session.commit()
+        assert identity_cache.peek(user.user_id) is None
+
+    assert client.get('/api/auth/verify-token').get_json()['role'] == 'admin'
+
+
+def test_deleted_user_is_not_served_from_the_cache(auth_client):
+    client = auth_client()
+    assert client.get('/api/auth/verify-token').status_code == 200
+
+    with client.application.app_context():
+        user = stored_user()
+        user_id = user.user_id
+        db.session.delete(user)
+        db.session.commit()
+        assert identity_cache.peek(user_id) is None
+
+    response = client.get('/api/auth/verify-token')
+    assert response.status_code == 404
+    assert response.get_json() == {'error': 'User not found'}
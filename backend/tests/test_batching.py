@@ -0,0 +1,115 @@
+"""
+MicroBatcher behaviour when its collector thread dies or wedges
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from models.registry import ModelUnavailableError
+from utils.batching import MicroBatcher
+
+ROWS = np.array([[20.0, 5, 1, 2], [21.0, 6, 1, 2]])
+
+
+def echo(model, X):
+    """Stand-in for prediction_cache.predict: the temperature column three times"""
+    return X[:, 0], X[:, 0] - 1, X[:, 0] + 1
+
+
+def make_batcher(predict_fn, timeout=0.2):
+    batcher = MicroBatcher(predict_fn=predict_fn)
+    batcher.enabled = True
+    batcher.timeout = timeout
+    return batcher
+
+
+def test_batched_predictions_fan_results_back_out():
+    batcher = make_batcher(echo)
+    y_pred, lower, upper = batcher.predict('model', ROWS)
+    np.testing.assert_array_equal(y_pred, [20.0, 21.0])
+    np.testing.assert_array_equal(upper, [21.0, 22.0])
+    assert batcher.fallbacks == 0
+
+
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_stopped_worker_is_restarted():
+    calls = []
+
+    def stop_worker_once(model, X):
+        calls.append(threading.current_thread().name)
+        if len(calls) == 1:
+            raise SystemExit  # ends the collector thread, like an unhandled error would
+        return echo(model, X)
+
+    batcher = make_batcher(stop_worker_once)
+
+    # The rows were already in the dying batch: bounded wait, then 503
+    with pytest.raises(ModelUnavailableError):
+        batcher.predict('model', ROWS)
+    assert not batcher._thread.is_alive()
+
+    # The next request starts a new collector
+    y_pred, _, _ = batcher.predict('model', ROWS)
+    np.testing.assert_array_equal(y_pred, [20.0, 21.0])
+    assert batcher._thread.is_alive()
+    assert calls == ['micro-batcher', 'micro-batcher']
+
+
+def test_wedged_worker_falls_back_to_direct_predict():
+    release = threading.Event()
+    first_batch = threading.Event()
+
+    def wedge_worker(model, X):
+        if threading.current_thread().name == 'micro-batcher':
+            first_batch.set()
+            release.wait()
+        return echo(model, X)
+
+    batcher = make_batcher(wedge_worker)
+    try:
+        # The first request wedges the collector inside its batch
+        blocked = threading.Thread(target=lambda: pytest.raises(ModelUnavailableError, batcher.predict, 'model', ROWS))
+        blocked.start()
+        assert first_batch.wait(1)
+
+        # The next one is never picked up, so it is scored on the calling thread
+        y_pred, _, _ = batcher.predict('model', ROWS)
+        np.testing.assert_array_equal(y_pred, [20.0, 21.0])
+        assert batcher.fallbacks == 1
+        blocked.join(2)
+        assert not blocked.is_alive()
+    finally:
+        release.set()
+
+
+def test_bad_request_does_not_fail_its_batch_neighbours():
+    batch_sizes = []
+
+    def reject_negative(model, X):
+        batch_sizes.append(len(X))
+        if (X[:, 0] < 0).any():
+            raise ValueError('negative temperature')
+        return echo(model, X)
+
+    batcher = make_batcher(reject_negative, timeout=2)
+    batcher.window = 0.2
+    results = {}
+
+    def call(name, rows):
+        try:
+            results[name] = batcher.predict('model', rows)
+        except ValueError as e:
+            results[name] = e
+
+    threads = [threading.Thread(target=call, args=('good', ROWS)),
+               threading.Thread(target=call, args=('bad', np.array([[-5.0, 5, 1, 2]])))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    # Scored together first, then one caller at a time
+    assert batch_sizes[0] == 3
+    np.testing.assert_array_equal(results['good'][0], [20.0, 21.0])
+    assert isinstance(results['bad'], ValueError)
@@ -0,0 +1,127 @@
+"""
+PredictionCache LRU and TTL, the shared SQLite backend and the purge on
+a move to a new active version
+"""
+import time
+
+import numpy as np
+
+from config import Config
+from models.registry import registry
+from utils.cache import PredictionCache, SQLiteCacheBackend
+
+
+class CountingModel:
+    """Stand-in ModelBundle: the temperature column three times, counting rows scored"""
+
+    table = None
+
+    def __init__(self, version, name='test-model'):
+        self.name = name
+        self.version = version
+        self.rows = 0
+
+    @property
+    def label(self):
+        return f"{self.name}@{self.version}"
+
+    def predict(self, X):
+        self.rows += len(X)
+        return X[:, 0], X[:, 0] - 1, X[:, 0] + 1
+
+
+def row(temperature):
+    return np.array([[temperature, 5, 1, 2]])
+
+
+def make_cache(maxsize=100, ttl=3600, shared_path=None):
+    cache = PredictionCache()
+    cache.maxsize = maxsize
+    cache.ttl = ttl
+    cache.shared = SQLiteCacheBackend(shared_path) if shared_path else None
+    return cache
+
+
+def test_hits_skip_the_model():
+    cache, model = make_cache(), CountingModel('v1')
+    cache.predict(model, np.vstack([row(20.0), row(21.0)]))
+    y_pred, lower, upper = cache.predict(model, np.vstack([row(21.0), row(22.0)]))
+
+    np.testing.assert_allclose(y_pred, [21.0, 22.0])
+    np.testing.assert_allclose(upper, [22.0, 23.0])
+    assert model.rows == 3
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache, model = make_cache(maxsize=2), CountingModel('v1')
+    for temperature in (20.0, 21.0):
+        cache.predict(model, row(temperature))
+    cache.predict(model, row(20.0))  # 20.0 is now the most recent
+    cache.predict(model, row(22.0))  # evicts 21.0
+    assert model.rows == 3
+
+    cache.predict(model, row(20.0))
+    assert model.rows == 3
+    cache.predict(model, row(21.0))
+    assert model.rows == 4
+
+
+def test_expired_entries_are_recomputed():
+    cache, model = make_cache(ttl=0.05), CountingModel('v1')
+    cache.predict(model, row(20.0))
+    cache.predict(model, row(20.0))
+    assert model.rows == 1
+
+    time.sleep(0.1)
+    cache.predict(model, row(20.0))
+    assert model.rows == 2
+
+
+def test_shared_backend_serves_other_processes_results(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    first, second = make_cache(shared_path=path), make_cache(shared_path=path)
+    model = CountingModel('v1')
+
+    first.predict(model, row(20.0))
+    y_pred, _, _ = second.predict(model, row(20.0))
+    np.testing.assert_allclose(y_pred, [20.0])
+    assert model.rows == 1
+    assert second.hits == 1
+
+
+def test_shared_backend_skips_expired_entries(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / 'cache.db'))
+    backend.set_many([('live', (1.0, 0.0, 2.0))], 'v1', ttl=3600)
+    backend.set_many([('expired', (1.0, 0.0, 2.0))], 'v1', ttl=-1)
+    assert backend.get_many(['live', 'expired']) == {'live': (1.0, 0.0, 2.0)}
+
+
+def test_move_to_new_active_version_purges_other_versions(tmp_path, monkeypatch):
+    cache = make_cache(shared_path=str(tmp_path / 'cache.db'))
+    old, new = CountingModel('v1', registry.default_name), CountingModel('v2', registry.default_name)
+    active = {'version': 'v1'}
+    monkeypatch.setattr(registry, 'active_version', lambda: active['version'])
+
+    cache.predict(old, row(20.0))
+    old_keys = cache._keys(cache._quantize(row(20.0)), old.label)
+    assert cache.shared.get_many(old_keys)
+
+    active['version'] = 'v2'
+    # A request still holding the old bundle does not purge
+    cache.predict(old, row(20.0))
+    assert old.rows == 1
+    assert cache.shared.get_many(old_keys)
+
+    cache.predict(new, row(21.0))
+    assert cache.shared.get_many(old_keys) == {}
+    assert all(key.startswith(new.label) for key in cache._entries)
+
+
+def test_cache_is_opt_in_and_off_means_exact_input():
+    assert Config.PREDICTION_CACHE_SIZE == 0
+
+    cache, model = make_cache(maxsize=0), CountingModel('v1')
+    y_pred, _, _ = cache.predict(model, row(20.04))
+    np.testing.assert_allclose(y_pred, [20.04])
+    assert cache.stats()['enabled'] is False
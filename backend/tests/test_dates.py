@@ -0,0 +1,53 @@
+"""
+One YYYY-MM-DD rule for validation and parsing
+
+validate_prediction_input / validate_prediction_frame must reject exactly
+the dates to_datetime64 cannot parse, or a request passes validation and
+then fails while its features are built.
+"""
+import pandas as pd
+import pytest
+
+from utils.features import to_datetime64
+from utils.preprocessing import validate_prediction_frame, validate_prediction_input
+
+FUTURE_DATE = '2099-01-02'
+# Unpadded (strptime accepts it), month-only and year-only (NumPy's ISO parser accepts those)
+MALFORMED_DATES = ['2099-1-2', '2099-01-2', '2099-01', '2099']
+
+
+@pytest.mark.parametrize('date', MALFORMED_DATES)
+def test_parser_and_validators_reject_malformed_dates(date):
+    with pytest.raises(ValueError):
+        to_datetime64([date])
+
+    assert validate_prediction_input(20, 5, date) == (False, 'Invalid date format (use YYYY-MM-DD)')
+
+    is_valid, error_message = validate_prediction_frame(
+        pd.DataFrame({'Date': [FUTURE_DATE, date], 'Hour': [5, 6], 'Temperature': [20, 21]}, index=[1, 2])
+    )
+    assert not is_valid
+    assert error_message == 'Invalid date format (use %Y-%m-%d): row(s) 2'
+
+
+def test_parser_and_validators_accept_padded_dates():
+    assert str(to_datetime64([FUTURE_DATE])[0]) == FUTURE_DATE
+    assert validate_prediction_input(20, 5, FUTURE_DATE) == (True, None)
+    assert validate_prediction_frame(
+        pd.DataFrame({'Date': [FUTURE_DATE], 'Hour': [5], 'Temperature': [20]})
+    ) == (True, None)
+
+
+@pytest.mark.parametrize('date', [None, 20990102])
+def test_validator_rejects_dates_that_are_not_strings(date):
+    assert validate_prediction_input(20, 5, date) == (False, 'Invalid date format (use YYYY-MM-DD)')
+
+
+@pytest.mark.parametrize('date', MALFORMED_DATES)
+def test_batch_rejects_malformed_dates_with_400(date, auth_client):
+    response = auth_client().post('/api/predict/batch', json={
+        'rows': [{'date': FUTURE_DATE, 'hour': 5, 'temperature': 20}, {'date': date, 'hour': 6, 'temperature': 21}]
+    })
+
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Row 1: Invalid date format (use YYYY-MM-DD)'}
@@ -0,0 +1,106 @@
+"""
+GET /api/predict/export bodies and headers for each format, and a clean
+error when Parquet is asked for without pyarrow
+"""
+import csv
+import io
+import json
+import sys
+from datetime import date, datetime
+
+import pytest
+
+from schemas.models import db, Prediction, User
+from tests.conftest import USER
+from utils.export import EXPORT_FIELDS
+
+N_ROWS = 5
+
+
+@pytest.fixture
+def client(auth_client):
+    # Partitions of 2 rows, so bodies span several chunks
+    client = auth_client(EXPORT_CHUNK_SIZE=2)
+    with client.application.app_context():
+        user_id = db.session.execute(db.select(User.user_id).where(User.email == USER['email'])).scalar_one()
+        other = User(username='user2', email='user2@example.com', password_hash='x')
+        db.session.add(other)
+        db.session.flush()
+        for owner in (user_id, other.user_id):
+            db.session.add_all(
+                Prediction(
+                    user_id=owner, date=date(2099, 1, 2), hour=hour, temperature=20.0 + hour,
+                    predicted_load=1200.5 + hour, lower_bound=1100.0, upper_bound=1300.0,
+                    model_used='LSTM+TWSVR@stub', timestamp=datetime(2026, 1, 1, hour)
+                )
+                for hour in range(N_ROWS)
+            )
+        db.session.commit()
+    return client
+
+
+def expected_rows():
+    """user1's rows as the export writes them, newest first"""
+    return [
+        ['2099-01-02', hour, 20.0 + hour, 1200.5 + hour, 1100.0, 1300.0,
+         'LSTM+TWSVR@stub', f'2026-01-01 {hour:02d}:00:00']
+        for hour in reversed(range(N_ROWS))
+    ]
+
+
+def assert_attachment(response, mimetype, extension):
+    assert response.status_code == 200
+    assert response.mimetype == mimetype
+    assert response.headers['Content-Disposition'].startswith('attachment; filename="predictions_')
+    assert response.headers['Content-Disposition'].endswith(f'.{extension}"')
+    assert response.headers['Cache-Control'] == 'no-store'
+    assert response.headers['X-Content-Type-Options'] == 'nosniff'
+
+
+def test_csv_export(client):
+    response = client.get('/api/predict/export')
+    assert_attachment(response, 'text/csv', 'csv')
+
+    header, *rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert header == EXPORT_FIELDS
+    assert rows == [[str(value) for value in row] for row in expected_rows()]
+
+
+def test_csv_export_of_no_rows_is_just_the_header(client):
+    response = client.get('/api/predict/export', query_string={'hour': 23})
+    assert response.get_data(as_text=True).splitlines() == [','.join(EXPORT_FIELDS)]
+
+
+def test_ndjson_export(client):
+    response = client.get('/api/predict/export', query_string={'format': 'ndjson', 'start_date': '2099-01-02'})
+    assert_attachment(response, 'application/x-ndjson', 'ndjson')
+
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == [dict(zip(EXPORT_FIELDS, row)) for row in expected_rows()]
+
+
+def test_parquet_export(client):
+    pq = pytest.importorskip('pyarrow.parquet')
+    response = client.get('/api/predict/export', query_string={'format': 'parquet'})
+    assert_attachment(response, 'application/vnd.apache.parquet', 'parquet')
+
+    table = pq.read_table(io.BytesIO(response.data))
+    assert table.column_names == EXPORT_FIELDS
+    assert [list(row.values()) for row in table.to_pylist()] == expected_rows()
+
+
+def test_parquet_without_pyarrow_is_a_clean_400(client, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow.parquet', None)  # makes the import raise ImportError
+    response = client.get('/api/predict/export', query_string={'format': 'parquet'})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Parquet export requires pyarrow on the server'}
+
+
+@pytest.mark.parametrize('query, error', [
+    ({'format': 'xlsx'}, 'Format must be one of: csv, ndjson, parquet'),
+    ({'hour': 30}, 'Hour must be between 0 and 23'),
+])
+def test_bad_export_parameters(client, query, error):
+    response = client.get('/api/predict/export', query_string=query)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': error}
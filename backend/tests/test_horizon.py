@@ -0,0 +1,126 @@
+"""
+POST /api/predict/horizon input validation
+
+Uses a stub model version with a small sequence model (lookback and
+horizon of 24 hours) trained for one epoch on synthetic history.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.stub_models import build_stub_models, synthetic_history
+from models.sequence_model import SequenceForecaster
+
+LOOKBACK = 24
+
+
+@pytest.fixture(scope='module')
+def model_dir(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp('models'))
+    version_path = build_stub_models(directory, lstm_units=8)
+
+    X, y = synthetic_history(24 * 30)
+    sequence = SequenceForecaster(lookback=LOOKBACK, horizon=24)
+    sequence.build_model(lstm_units=4)
+    sequence.train(np.column_stack([y, X]).astype(np.float32), epochs=1, interval_max_rows=500)
+    sequence.save_model(os.path.join(version_path, 'sequence'))
+    return directory
+
+
+@pytest.fixture
+def client(auth_client, model_dir):
+    return auth_client(MODEL_DIR=model_dir, MODEL_VERSION='stub', MODEL_WATCH_INTERVAL=0)
+
+
+def make_history(n_hours=LOOKBACK + 6, start='2024-03-01'):
+    """Consecutive hourly rows, oldest first"""
+    timestamps = pd.date_range(start, periods=n_hours, freq='h')
+    return [
+        {'date': timestamp.strftime('%Y-%m-%d'), 'hour': timestamp.hour, 'temperature': 15.0, 'load': 1200.0 + i}
+        for i, timestamp in enumerate(timestamps)
+    ]
+
+
+def post_history(client, history):
+    response = client.post('/api/predict/horizon', json={'history': history})
+    return response.status_code, response.get_json()
+
+
+def test_horizon_forecasts_from_valid_history(client):
+    status, body = post_history(client, make_history())
+    assert status == 200
+    assert body['horizon'] == 24
+    # The forecast starts the hour after the last history row (2024-03-02 05:00)
+    assert (body['predictions'][0]['date'], body['predictions'][0]['hour']) == ('2024-03-02', 6)
+    assert len(body['predictions']) == 24
+
+
+@pytest.mark.parametrize('payload', [[1, 2, 3], 'history', None])
+def test_horizon_rejects_body_that_is_not_an_object(client, payload):
+    response = client.post('/api/predict/horizon', json=payload)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Request body is empty'}
+
+
+def test_horizon_rejects_non_json_body(client):
+    response = client.post('/api/predict/horizon', data='history', content_type='text/plain')
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('history, error', [
+    ({'date': '2024-03-01'}, 'History must be a list of rows'),
+    ('2024-03-01', 'History must be a list of rows'),
+    ([{'date': '2024-03-01', 'hour': 0, 'temperature': 15.0, 'load': 1200.0}, 5], 'History row 1: must be an object'),
+])
+def test_horizon_rejects_malformed_history(client, history, error):
+    assert post_history(client, history) == (400, {'error': error})
+
+
+def test_horizon_rejects_out_of_range_hour(client):
+    history = make_history()
+    history[3]['hour'] = 24
+    status, body = post_history(client, history)
+    assert status == 400
+    assert body['error'] == 'Invalid history: Hour must be between 0 and 23: row(s) 3'
+
+
+@pytest.mark.parametrize('date', ['2024-3-1', '2024-03', None])
+def test_horizon_rejects_bad_date(client, date):
+    history = make_history()
+    history[5]['date'] = date
+    status, body = post_history(client, history)
+    assert status == 400
+    assert body['error'] == 'Invalid history: Invalid date format (use %Y-%m-%d): row(s) 5'
+
+
+@pytest.mark.parametrize('load', [None, 'high'])
+def test_horizon_rejects_missing_load(client, load):
+    history = make_history()
+    history[7]['load'] = load
+    status, body = post_history(client, history)
+    assert status == 400
+    assert body['error'] == 'Invalid history: Load must be a number: row(s) 7'
+
+
+def test_horizon_rejects_gap_in_hours(client):
+    history = make_history()
+    del history[10]
+    status, body = post_history(client, history)
+    assert status == 400
+    assert body['error'] == 'Invalid history: Rows must be consecutive hours, oldest first: row(s) 10'
+
+
+def test_horizon_rejects_unordered_rows(client):
+    history = make_history()
+    history[4], history[5] = history[5], history[4]
+    status, body = post_history(client, history)
+    assert status == 400
+    assert body['error'].startswith('Invalid history: Rows must be consecutive hours, oldest first: row(s) 4, 5')
+
+
+def test_horizon_needs_a_full_lookback(client):
+    status, body = post_history(client, make_history(LOOKBACK - 1))
+    assert status == 400
+    assert body['error'] == f'Need at least {LOOKBACK} hours of history, got {LOOKBACK - 1}'
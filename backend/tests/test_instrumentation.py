@@ -0,0 +1,71 @@
+"""
+/api/metrics totals across worker snapshots in METRICS_DIR, before and
+after an exited worker's snapshot is retired
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from utils.instrumentation import LATENCY_BUCKETS, RETIRED_FILE
+
+LABELS = [['endpoint', '/test/snapshots'], ['method', 'GET'], ['status', '200']]
+
+pytestmark = pytest.mark.skipif(os.name != 'posix', reason='snapshots are only merged on POSIX')
+
+
+def exited_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def write_snapshot(metrics_dir, pid, requests, seconds):
+    counts = [0] * (len(LATENCY_BUCKETS) + 1)
+    counts[LATENCY_BUCKETS.index(0.01)] = requests
+    path = os.path.join(metrics_dir, f'metrics-{pid}-{time.time_ns()}.json')
+    with open(path, 'w') as f:
+        json.dump({
+            'counters': [['http_requests_total', LABELS, requests]],
+            'histograms': [['prediction_stage_seconds', [['stage', 'test-stage']], counts, seconds]]
+        }, f)
+    return os.path.basename(path)
+
+
+def scrape(client):
+    response = client.get('/api/metrics')
+    assert response.status_code == 200
+    lines = response.get_data(as_text=True).splitlines()
+    return (
+        lines,
+        next(line for line in lines if line.startswith('http_requests_total{endpoint="/test/snapshots"')),
+        next(line for line in lines if line.startswith('prediction_stage_seconds_count{stage="test-stage"}'))
+    )
+
+
+def test_totals_survive_retiring_an_exited_worker(app_factory, tmp_path):
+    metrics_dir = str(tmp_path / 'metrics')
+    client = app_factory(METRICS_DIR=metrics_dir, METRICS_FLUSH_INTERVAL=3600).test_client()
+
+    live = write_snapshot(metrics_dir, os.getppid(), requests=3, seconds=0.03)
+    exited = write_snapshot(metrics_dir, exited_pid(), requests=4, seconds=0.04)
+
+    lines, requests, stage_count = scrape(client)
+    assert requests.endswith(' 7')
+    assert stage_count.endswith(' 7')
+    assert 'prediction_stage_seconds_sum{stage="test-stage"} 0.07' in lines
+
+    # The exited worker's snapshot was folded into the retired file and removed
+    with open(os.path.join(metrics_dir, RETIRED_FILE)) as f:
+        assert json.load(f)['folded'] == [exited]
+    assert not os.path.exists(os.path.join(metrics_dir, exited))
+    assert os.path.exists(os.path.join(metrics_dir, live))
+
+    # Later scrapes count it once, from the retired file
+    for _ in range(2):
+        _, requests, stage_count = scrape(client)
+        assert requests.endswith(' 7')
+        assert stage_count.endswith(' 7')
@@ -0,0 +1,47 @@
+"""
+PREDICTION_MODE=table warmup and status probe
+
+Both run PROBE_ROW through the lookup table, which rejects rows off its
+grid (an all-zero row is month 0).
+"""
+import pytest
+
+from benchmarks.stub_models import build_stub_models
+from models.lookup_table import build_table
+from models.registry import ModelBundle, registry
+
+
+@pytest.fixture(scope='module')
+def model_dir(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp('models'))
+    version_path = build_stub_models(directory, lstm_units=8)
+    build_table(ModelBundle('LSTM+TWSVR', 'stub', version_path), version_path, resolution=10.0)
+    return directory
+
+
+@pytest.fixture
+def app(app_factory, model_dir):
+    return app_factory(
+        MODEL_DIR=model_dir, MODEL_VERSION='stub', MODEL_WATCH_INTERVAL=0,
+        PREDICTION_MODE='table', MODEL_PRELOAD=True
+    )
+
+
+def test_table_mode_warmup(app):
+    bundle = registry.get()
+    assert bundle.table is not None
+    assert bundle.warmed_up
+
+    bundle.warmed_up = False
+    bundle.warmup()
+    assert bundle.warmed_up
+
+
+def test_table_mode_status_probe(app):
+    response = app.test_client().get('/api/status')
+    assert response.status_code == 200
+
+    body = response.get_json()
+    assert body['status'] == 'running'
+    assert body['models']['status'] == 'ready'
+    assert 'probe_error' not in body['models']
@@ -0,0 +1,81 @@
+"""
+MetricsAccumulator chunked updates, merges and state round trips against
+create_metrics_report on the whole arrays
+"""
+import json
+
+import numpy as np
+import pytest
+
+from utils.metrics import (
+    MetricsAccumulator, calculate_interval_coverage, calculate_interval_width,
+    calculate_mae, calculate_mape, calculate_r2, calculate_rmse, create_metrics_report
+)
+
+
+@pytest.fixture(scope='module')
+def arrays():
+    rng = np.random.default_rng(0)
+    y_true = rng.uniform(800, 1600, 1000)
+    y_true[::50] = 0.0  # zero loads: skipped by MAPE, kept by sMAPE
+    y_pred = y_true + rng.normal(0, 40, 1000)
+    y_pred[::100] = 0.0  # both zero: skipped by sMAPE too
+    return y_true, y_pred, y_pred - 60, y_pred + 60
+
+
+def chunks(arrays, sizes=(1, 7, 250, 0, 342)):
+    """Split every array at the same points: chunks of sizes, then the rest"""
+    splits = np.cumsum(sizes)
+    return list(zip(*(np.split(a, splits) for a in arrays)))
+
+
+def assert_reports_match(report, expected):
+    assert report.keys() == expected.keys()
+    for key, value in expected.items():
+        assert report[key] == pytest.approx(value, rel=1e-9, abs=1e-9), key
+
+
+def test_report_matches_the_sklearn_metrics(arrays):
+    y_true, y_pred, y_lower, y_upper = arrays
+    report = create_metrics_report(y_true, y_pred, y_lower, y_upper)
+    nonzero = (y_true != 0) | (y_pred != 0)
+    smape = np.mean(2 * np.abs(y_pred - y_true)[nonzero] / (np.abs(y_true) + np.abs(y_pred))[nonzero]) * 100
+
+    assert_reports_match(report, {
+        'rmse': calculate_rmse(y_true, y_pred),
+        'mae': calculate_mae(y_true, y_pred),
+        'r2': calculate_r2(y_true, y_pred),
+        'mape': calculate_mape(y_true, y_pred),
+        'smape': smape,
+        'interval_coverage': calculate_interval_coverage(y_true, y_lower, y_upper),
+        'interval_width': calculate_interval_width(y_lower, y_upper)
+    })
+
+
+def test_chunked_updates_match_the_whole_arrays(arrays):
+    accumulator = MetricsAccumulator()
+    for chunk in chunks(arrays):
+        accumulator.update(*chunk)
+    assert_reports_match(accumulator.report(), create_metrics_report(*arrays))
+
+
+def test_merged_partials_match_the_whole_arrays(arrays):
+    partials = [MetricsAccumulator().update(*chunk) for chunk in chunks(arrays)]
+    merged = MetricsAccumulator()
+    for partial in partials:
+        merged.merge(partial)
+    assert_reports_match(merged.report(), create_metrics_report(*arrays))
+
+
+def test_state_survives_a_json_round_trip(arrays):
+    first, second = chunks(arrays, sizes=(400,))
+    shipped = json.loads(json.dumps(MetricsAccumulator().update(*first).to_dict()))
+    accumulator = MetricsAccumulator.from_dict(shipped).update(*second)
+    assert_reports_match(accumulator.report(), create_metrics_report(*arrays))
+
+
+def test_all_zero_loads_leave_mape_undefined():
+    report = create_metrics_report([0.0, 0.0, 0.0], [0.0, 5.0, 0.0])
+    assert np.isnan(report['mape'])
+    assert report['smape'] == pytest.approx(200.0)
+    assert 'interval_coverage' not in report
@@ -0,0 +1,29 @@
+"""
+NumPy forward pass of exported weights against the Keras model they came from
+"""
+import pytest
+
+from models.numpy_lstm import NumpyLSTM, export_weights, max_abs_error
+
+
+@pytest.mark.parametrize('recurrent_activation', ['sigmoid', 'hard_sigmoid'])
+def test_exported_weights_match_keras(tmp_path, recurrent_activation):
+    import tensorflow as tf
+
+    tf.keras.utils.set_random_seed(0)
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(6, 4)),
+        tf.keras.layers.LSTM(8, return_sequences=True, recurrent_activation=recurrent_activation),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.LSTM(5),
+        tf.keras.layers.Dense(3, activation='relu'),
+        tf.keras.layers.Dense(1),
+    ])
+    model_path, weights_path = str(tmp_path / 'lstm_model.h5'), str(tmp_path / 'lstm_model.npz')
+    model.save(model_path)
+
+    assert export_weights(model_path, weights_path) == [
+        f'LSTM:tanh:{recurrent_activation}:1', 'LSTM:tanh:sigmoid:0', 'Dense:relu', 'Dense:linear'
+    ]
+    assert NumpyLSTM(weights_path).n_features == 4
+    assert max_abs_error(model_path, weights_path, n_samples=200) < 1e-4
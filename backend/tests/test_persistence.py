@@ -0,0 +1,93 @@
+"""
+Write-behind flushes with rows the database rejects, transient errors
+and a dead writer thread
+"""
+import threading
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from schemas.models import db, Prediction, User
+from utils.persistence import prediction_writer
+
+
+def make_row(user_id, hour, predicted_load=1200.0):
+    return {
+        'user_id': user_id, 'date': date(2027, 1, 2), 'hour': hour,
+        'temperature': 20.0, 'month': 1, 'weekday': 5, 'predicted_load': predicted_load,
+        'lower_bound': 1100.0, 'upper_bound': 1300.0, 'model_used': 'LSTM+TWSVR'
+    }
+
+
+@pytest.fixture
+def app(app_factory):
+    app = app_factory(PREDICTION_WRITE_BEHIND=True, WRITE_BEHIND_INTERVAL_MS=60000)
+    with app.app_context():
+        user = User(username='user1', email='user1@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        app.config['TEST_USER_ID'] = user.user_id
+    prediction_writer._queue.clear()
+    prediction_writer.errors = prediction_writer.dropped = 0
+    prediction_writer.RETRY_BACKOFF = 0
+    yield app
+    del prediction_writer.RETRY_BACKOFF
+
+
+def stored_hours(app):
+    with app.app_context():
+        return sorted(db.session.execute(db.select(Prediction.hour)).scalars())
+
+
+def test_rejected_rows_are_dropped_and_the_rest_written(app):
+    user_id = app.config['TEST_USER_ID']
+    rows = [make_row(user_id, hour) for hour in range(8)]
+    rows[5]['predicted_load'] = None  # NOT NULL violation
+    prediction_writer.write(rows)
+    prediction_writer.flush()
+
+    assert stored_hours(app) == [0, 1, 2, 3, 4, 6, 7]
+    assert prediction_writer.dropped == 1
+    assert len(prediction_writer._queue) == 0
+
+    # The next flush is not held up by the rejected row
+    prediction_writer.write([make_row(user_id, 8)])
+    prediction_writer.flush()
+    assert stored_hours(app)[-1] == 8
+
+
+def test_transient_errors_requeue_the_batch(app, monkeypatch):
+    user_id = app.config['TEST_USER_ID']
+    insert = prediction_writer._insert
+
+    def locked(records, session, return_ids=False):
+        raise OperationalError('INSERT', {}, Exception('database is locked'))
+
+    monkeypatch.setattr(prediction_writer, '_insert', locked)
+    prediction_writer.write([make_row(user_id, hour) for hour in range(3)])
+    prediction_writer.flush()
+
+    assert len(prediction_writer._queue) == 3
+    assert prediction_writer.errors == prediction_writer.MAX_RETRIES
+    assert prediction_writer.dropped == 0
+
+    monkeypatch.setattr(prediction_writer, '_insert', insert)
+    prediction_writer.flush()
+    assert stored_hours(app) == [0, 1, 2]
+
+
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_dead_writer_thread_is_restarted(app, monkeypatch):
+    def stop_thread():
+        raise SystemExit  # ends the writer thread, like an unhandled error would
+
+    monkeypatch.setattr(prediction_writer, 'flush', stop_thread)
+    prediction_writer.write([make_row(app.config['TEST_USER_ID'], 0)])
+    prediction_writer._wakeup.set()
+    prediction_writer._thread.join(timeout=1)
+    assert not prediction_writer._thread.is_alive()
+
+    monkeypatch.undo()
+    prediction_writer.write([make_row(app.config['TEST_USER_ID'], 1)])
+    assert prediction_writer._thread.is_alive()
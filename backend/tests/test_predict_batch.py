@@ -0,0 +1,39 @@
+"""
+POST /api/predict/batch request body validation
+"""
+import pytest
+
+
+@pytest.fixture
+def client(auth_client):
+    return auth_client()
+
+
+@pytest.mark.parametrize('body', ['rows', 123, [{'date': '2099-01-02', 'hour': 5, 'temperature': 20}]])
+def test_batch_rejects_json_that_is_not_an_object(client, body):
+    response = client.post('/api/predict/batch', json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Request body is empty'}
+
+
+def test_batch_rejects_non_json_body(client):
+    response = client.post('/api/predict/batch', data='rows', content_type='text/plain')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Request body is empty'}
+
+
+@pytest.mark.parametrize('rows', [5, 'rows', {'date': '2099-01-02'}])
+def test_batch_rejects_rows_that_are_not_a_list(client, rows):
+    response = client.post('/api/predict/batch', json={'rows': rows})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Rows must be a list'}
+
+
+@pytest.mark.parametrize('temperature', [float('nan'), float('inf'), True])
+def test_batch_rejects_a_non_finite_or_bool_temperature(client, temperature):
+    response = client.post('/api/predict/batch', json={'rows': [
+        {'date': '2099-01-02', 'hour': 5, 'temperature': 20},
+        {'date': '2099-01-02', 'hour': 6, 'temperature': temperature},
+    ]})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Row 1: Temperature must be a number'}
@@ -0,0 +1,59 @@
+"""
+ProcessLocalThread / ProcessLocalExecutor restarts after fork and thread death
+"""
+import os
+import threading
+
+from utils.process_local import ProcessLocalExecutor, ProcessLocalThread
+
+
+def test_thread_is_restarted_after_it_dies():
+    stop = threading.Event()
+    helper = ProcessLocalThread(stop.wait, 'test-thread')
+    helper.ensure()
+    assert helper.is_alive()
+
+    stop.set()
+    helper.join(timeout=1)
+    assert not helper.is_alive()
+
+    stop.clear()
+    helper.ensure()
+    assert helper.is_alive()
+    stop.set()
+
+
+def test_thread_runs_after_fork_hook_in_a_new_process():
+    forks = []
+    stop = threading.Event()
+    helper = ProcessLocalThread(stop.wait, 'test-thread', after_fork=lambda: forks.append(os.getpid()))
+    helper.ensure()
+    assert forks == []
+
+    # A child process sees the parent's PID on the inherited object
+    helper._pid = -1
+    assert not helper.is_alive()
+    helper.ensure()
+    assert forks == [os.getpid()]
+    assert helper.is_alive()
+    stop.set()
+
+
+def test_executor_is_created_per_process_and_after_reset():
+    forks = []
+    helper = ProcessLocalExecutor(1, 'test-pool', after_fork=lambda: forks.append(os.getpid()))
+    first = helper.get()
+    assert helper.get() is first
+    assert helper.submit(lambda: 42).result(timeout=1) == 42
+
+    helper.reset(max_workers=2)
+    assert helper.current() is None
+    second = helper.get()
+    assert second is not first and second._max_workers == 2
+    assert forks == []
+
+    helper._pid = -1
+    assert helper.current() is None
+    assert helper.get() is not second
+    assert forks == [os.getpid()]
+    helper.shutdown()
@@ -0,0 +1,73 @@
+"""
+ModelRegistry version names whose label would not fit Prediction.model_used,
+and health() while bundles are swapped
+"""
+import os
+import threading
+
+import pytest
+
+from models.registry import MAX_LABEL_LENGTH, ModelRegistry, ModelUnavailableError
+
+NAME = 'LSTM+TWSVR'
+LONGEST = 'v' * (MAX_LABEL_LENGTH - len(NAME) - 1)
+
+
+class FakeBundle:
+    def __init__(self, version):
+        self.name = NAME
+        self.version = version
+        self.warmed_up = True
+        self.table = None
+        self.has_sequence = False
+        self.load_seconds = 0.0
+
+
+@pytest.fixture
+def model_registry(tmp_path):
+    for version in (LONGEST, LONGEST + 'v'):
+        os.makedirs(tmp_path / version)
+        (tmp_path / version / 'scaler_X.pkl').touch()
+
+    model_registry = ModelRegistry()
+    model_registry.model_dir = str(tmp_path)
+    model_registry.default_name = NAME
+    return model_registry
+
+
+def test_list_versions_skips_names_too_long_for_the_label(model_registry):
+    assert model_registry.list_versions() == [LONGEST]
+
+
+def test_activate_rejects_names_too_long_for_the_label(model_registry):
+    with pytest.raises(ModelUnavailableError, match='too long'):
+        model_registry.activate(LONGEST + 'v', background=False)
+    assert model_registry._pending is None
+
+
+def test_health_reads_a_snapshot_while_bundles_change(model_registry):
+    model_registry.watch_interval = 0
+    stop = threading.Event()
+
+    def swap_bundles():
+        # What _load_and_swap does to other versions' bundles, as fast as possible
+        while not stop.is_set():
+            with model_registry._lock:
+                for i in range(50):
+                    model_registry._bundles[(NAME, f'v{i}')] = FakeBundle(f'v{i}')
+            with model_registry._lock:
+                model_registry._bundles.clear()
+
+    thread = threading.Thread(target=swap_bundles)
+    thread.start()
+    try:
+        for _ in range(2000):
+            assert model_registry.health()['status'] == 'not_loaded'
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_health_does_not_wait_for_a_load_in_progress(model_registry):
+    with model_registry._load_lock:
+        assert model_registry.health()['status'] == 'not_loaded'
@@ -0,0 +1,18 @@
+"""
+train.py reports undefined metrics as null
+"""
+import json
+
+from train import finite_metrics
+from utils.metrics import create_metrics_report
+
+
+def test_undefined_metrics_are_written_as_null():
+    # All-zero loads: MAPE is undefined
+    metrics = finite_metrics(create_metrics_report([0.0, 0.0], [1.0, 2.0]))
+    assert metrics['mape'] is None
+    assert metrics['mae'] == 1.5
+
+    body = json.dumps({'metrics': metrics}, allow_nan=False)
+    assert json.loads(body)['metrics']['mape'] is None
+    assert finite_metrics(None) is None
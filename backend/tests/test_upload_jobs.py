@@ -0,0 +1,151 @@
+"""
+Upload-and-forecast jobs: status transitions, per-chunk commits, cleanup of
+failed jobs and who may download the result
+"""
+import io
+import os
+
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from benchmarks.stub_models import build_stub_models
+from schemas.models import db, Prediction
+from utils import jobs
+from utils.jobs import RESULT_COLUMNS, job_runner
+
+CHUNK_SIZE = 4
+
+
+@pytest.fixture(scope='module')
+def model_dir(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp('models'))
+    build_stub_models(directory, lstm_units=8)
+    return directory
+
+
+@pytest.fixture
+def client(auth_client, model_dir, tmp_path, monkeypatch):
+    # Jobs run when the test calls run_jobs, not on the pool
+    submitted = []
+    monkeypatch.setattr(job_runner, 'submit', lambda job_id, upload_path: submitted.append((job_id, upload_path)))
+    client = auth_client(
+        MODEL_DIR=model_dir, MODEL_VERSION='stub', MODEL_WATCH_INTERVAL=0,
+        UPLOAD_FOLDER=str(tmp_path / 'uploads'), UPLOAD_CHUNK_SIZE=CHUNK_SIZE
+    )
+    client.submitted = submitted
+    return client
+
+
+def make_csv(n_rows, bad_row=None):
+    temperatures = [15.0 + i for i in range(n_rows)]
+    if bad_row is not None:
+        temperatures[bad_row - 1] = 'warm'
+    return pd.DataFrame({
+        'Date': ['2099-01-02'] * n_rows,
+        'Hour': [i % 24 for i in range(n_rows)],
+        'Temperature': temperatures
+    }).to_csv(index=False).encode()
+
+
+def upload(client, body, filename='future.csv'):
+    response = client.post('/api/predict/upload', data={'file': (io.BytesIO(body), filename)},
+                           content_type='multipart/form-data')
+    assert response.status_code == 202
+    return response.get_json()
+
+
+def run_jobs(client):
+    while client.submitted:
+        job_runner._run(*client.submitted.pop(0))
+
+
+def job_status(client, job_id):
+    return client.get(f'/api/predict/jobs/{job_id}').get_json()
+
+
+def stored_predictions(client):
+    with client.application.app_context():
+        return db.session.execute(db.select(db.func.count(Prediction.prediction_id))).scalar()
+
+
+def test_job_moves_from_queued_to_completed_committing_each_chunk(client, monkeypatch):
+    body = upload(client, make_csv(10))
+    assert body['status'] == 'queued'
+    assert job_status(client, body['job_id'])['status'] == 'queued'
+
+    # What a status poll from another worker sees as each chunk is scored
+    seen = []
+    predict = jobs.prediction_cache.predict
+
+    def spying_predict(model, X):
+        with db.engine.connect() as connection:
+            seen.append(tuple(connection.execute(
+                text('SELECT status, rows_total, rows_done FROM forecast_jobs WHERE job_id = :job_id'),
+                {'job_id': body['job_id']}
+            ).one()))
+        return predict(model, X)
+
+    monkeypatch.setattr(jobs.prediction_cache, 'predict', spying_predict)
+    run_jobs(client)
+
+    assert seen == [('running', 10, 0), ('running', 10, 4), ('running', 10, 8)]
+    status = job_status(client, body['job_id'])
+    assert (status['status'], status['rows_done'], status['error']) == ('completed', 10, None)
+    assert status['download_url'].endswith(f"/jobs/{body['job_id']}/download")
+    assert stored_predictions(client) == 10
+    assert os.listdir(client.application.config['UPLOAD_FOLDER']) == ['results']
+
+
+def test_malformed_csv_fails_the_job_without_storing_rows(client):
+    body = upload(client, make_csv(10, bad_row=7))
+    run_jobs(client)
+
+    status = job_status(client, body['job_id'])
+    assert status['status'] == 'failed'
+    assert status['error'] == 'Temperature must be a number: row(s) 7'
+    assert status['rows_done'] == 0
+    assert stored_predictions(client) == 0
+    assert 'download_url' not in status
+
+
+def test_failed_chunk_discards_the_rows_already_committed(client, monkeypatch):
+    body = upload(client, make_csv(10))
+    predict = jobs.prediction_cache.predict
+    calls = []
+
+    def failing_predict(model, X):
+        calls.append(len(X))
+        if len(calls) == 2:
+            raise RuntimeError('model crashed')
+        return predict(model, X)
+
+    monkeypatch.setattr(jobs.prediction_cache, 'predict', failing_predict)
+    run_jobs(client)
+
+    status = job_status(client, body['job_id'])
+    assert (status['status'], status['rows_done'], status['error']) == ('failed', 0, 'model crashed')
+    assert stored_predictions(client) == 0
+    assert os.listdir(os.path.join(client.application.config['UPLOAD_FOLDER'], 'results')) == []
+
+
+def test_only_the_owner_can_download_the_result(client):
+    body = upload(client, make_csv(5), filename='week 1.csv')
+    download_url = f"/api/predict/jobs/{body['job_id']}/download"
+    assert client.get(download_url).status_code == 409  # still queued
+    run_jobs(client)
+
+    response = client.get(download_url)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert 'forecast_week_1.csv' in response.headers['Content-Disposition']
+    result = pd.read_csv(io.BytesIO(response.data))
+    assert list(result.columns) == RESULT_COLUMNS
+    assert list(result['Hour']) == [0, 1, 2, 3, 4]
+
+    other = client.application.test_client()
+    other.post('/api/auth/register', json={'username': 'user2', 'email': 'user2@example.com', 'password': 'secret2'})
+    token = other.post('/api/auth/login', json={'email': 'user2@example.com', 'password': 'secret2'}).get_json()
+    other.environ_base['HTTP_AUTHORIZATION'] = f"Bearer {token['access_token']}"
+    assert other.get(download_url).status_code == 404
+    assert other.get(f"/api/predict/jobs/{body['job_id']}").status_code == 404
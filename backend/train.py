@@ -0,0 +1,321 @@
+"""
+Train the LSTM + TWSVR pipeline and write a servable model version
+
+preprocess_data -> prepare_features -> LSTM -> residuals -> TWSVR -> save,
+with an optional hold-out window scored by create_metrics_report.
+
+Usage (from backend/):
+    python train.py --data history.csv --validation-hours 720 --report report.json
+    python train.py --data multi_year.csv --stream --chunksize 1000000
+    python train.py --data history.csv --sequence --lookback 168 --horizon 24
+"""
+import argparse
+import json
+import math
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from models.lstm_model import LSTMForecaster
+from models.twsvr_model import TWVSRPredictor
+from utils.metrics import create_metrics_report
+from utils.features import FEATURE_COLUMNS, make_windows
+from utils.preprocessing import preprocess_data, prepare_features
+from utils.streaming import FeatureStore, stream_preprocess
+from models.sequence_model import SEQUENCE_FEATURES, SequenceForecaster
+
+
+class StageTimer:
+    """Collects wall-clock seconds per pipeline stage"""
+
+    def __init__(self, prefix=''):
+        self.seconds = {}
+        self.prefix = prefix
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = round(time.perf_counter() - start, 3)
+            print(f"[{self.prefix}{name}] {self.seconds[name]:.2f}s")
+
+
+def finite_metrics(report):
+    """
+    Metrics report with undefined (NaN or infinite) values as None, so it dumps as strict JSON
+
+    Args:
+        report: create_metrics_report dictionary, or None
+
+    Returns:
+        Copy of report with non-finite values replaced by None
+    """
+    if report is None:
+        return None
+    return {key: value if math.isfinite(value) else None for key, value in report.items()}
+
+
+def save_version(output_dir, forecaster, twsvr, metadata):
+    """
+    Write artifacts in the layout ModelBundle serves from
+
+    Args:
+        output_dir: Version directory (MODEL_DIR/<version>)
+        forecaster: Trained LSTMForecaster
+        twsvr: Trained TWVSRPredictor (fit on scaled residuals)
+        metadata: Dictionary written to model.json
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    forecaster.model.save(os.path.join(output_dir, 'lstm_model.h5'))
+    joblib.dump(forecaster.scaler_X, os.path.join(output_dir, 'scaler_X.pkl'))
+    joblib.dump(forecaster.scaler_y, os.path.join(output_dir, 'scaler_y.pkl'))
+    joblib.dump(twsvr.svr_lower, os.path.join(output_dir, 'twsvr_lower.pkl'))
+    joblib.dump(twsvr.svr_upper, os.path.join(output_dir, 'twsvr_upper.pkl'))
+
+    with open(os.path.join(output_dir, 'model.json'), 'w') as f:
+        json.dump(metadata, f, indent=2, allow_nan=False)
+
+
+def fit_intervals(forecaster, X_train, y_train, args, timer):
+    """
+    Fit TWSVR on LSTM residuals in the scaled space the serving path works in
+
+    Returns:
+        Trained TWVSRPredictor
+    """
+    with timer.stage('residuals'):
+        X_train_scaled = forecaster.scaler_X.transform(X_train)
+        y_train_scaled = forecaster.scaler_y.transform(y_train.reshape(-1, 1)).flatten()
+        residuals = y_train_scaled - forecaster.engine.predict(X_train_scaled).flatten()
+
+    twsvr = TWVSRPredictor(epsilon=args.epsilon, C=args.C, backend=args.twsvr_backend)
+    with timer.stage('twsvr'):
+        twsvr.train(X_train_scaled, residuals, n_jobs=args.n_jobs)
+    return twsvr
+
+
+def validate(forecaster, twsvr, X_val, y_val, timer):
+    """
+    Score the hold-out window
+
+    Returns:
+        create_metrics_report dictionary
+    """
+    with timer.stage('validation'):
+        point, lower, upper = predict_window(forecaster, twsvr, X_val)
+        return create_metrics_report(y_val, point, lower, upper)
+
+
+def predict_window(forecaster, twsvr, X):
+    """
+    Point predictions and interval bounds in load units for unseen rows
+
+    Returns:
+        Tuple of (point, lower, upper) 1D arrays
+    """
+    X_scaled = forecaster.scaler_X.transform(X)
+    point_scaled = forecaster.engine.predict(X_scaled).flatten()
+    lower_scaled, upper_scaled = twsvr.predict_intervals(X_scaled, point_scaled)
+    point, lower, upper = (
+        forecaster.scaler_y.inverse_transform(values.reshape(-1, 1)).flatten()
+        for values in (point_scaled, lower_scaled, upper_scaled)
+    )
+    return point, lower, upper
+
+
+def run_sequence(data, args, timer):
+    """
+    Train the multi-step SequenceForecaster on the same (in-memory) history
+
+    Returns:
+        Tuple of (SequenceForecaster, metrics report over hold-out horizons or None)
+    """
+    features = data[SEQUENCE_FEATURES].to_numpy(dtype=float)
+    split = split_index(len(features), args.validation_hours)
+
+    forecaster = SequenceForecaster(lookback=args.lookback, horizon=args.horizon)
+    with timer.stage('sequence'):
+        forecaster.build_model(lstm_units=args.lstm_units)
+        forecaster.train(features[:split], epochs=args.epochs, batch_size=args.batch_size,
+                         epsilon=args.epsilon, twsvr_backend=args.sequence_twsvr_backend, n_jobs=args.n_jobs)
+
+    report = None
+    if args.validation_hours:
+        with timer.stage('sequence_validation'):
+            # Windows whose whole horizon falls inside the hold-out window
+            windows, targets = make_windows(features, features[:, 0], args.lookback, args.horizon)
+            calendars = sliding_window_view(features[:, 2:5], (args.horizon, 3))[args.lookback:, 0]
+            starts = np.arange(max(0, split - args.lookback), len(windows))
+            if len(starts):
+                point, lower, upper = forecaster.predict_windows(windows[starts], calendars[starts])
+                report = create_metrics_report(targets[starts].ravel(), point.ravel(), lower.ravel(), upper.ravel())
+
+    return forecaster, report
+
+
+def split_index(n_rows, validation_hours):
+    if validation_hours >= n_rows:
+        raise SystemExit(f"Validation window ({validation_hours}h) leaves no training data")
+    return n_rows - validation_hours
+
+
+def run_pipeline(args, timer):
+    """
+    Load everything into memory and train both models
+
+    Returns:
+        Dictionary with forecaster, twsvr, metrics, rows and sequence results
+    """
+    with timer.stage('load'):
+        raw = pd.read_csv(args.data)
+    with timer.stage('preprocess'):
+        data = preprocess_data(raw).sort_values(['Date', 'Hour'])
+        X, y = prepare_features(data)
+        X = X.astype(float)
+        y = y.astype(float)
+
+    split = split_index(len(X), args.validation_hours)
+
+    forecaster = LSTMForecaster()
+    with timer.stage('lstm'):
+        forecaster.build_model(input_shape=X.shape[1], lstm_units=args.lstm_units)
+        forecaster.train(X[:split], y[:split], epochs=args.epochs, batch_size=args.batch_size)
+
+    twsvr = fit_intervals(forecaster, X[:split], y[:split], args, timer)
+    report = validate(forecaster, twsvr, X[split:], y[split:], timer) if args.validation_hours else None
+
+    return {
+        'forecaster': forecaster,
+        'twsvr': twsvr,
+        'metrics': report,
+        'rows': len(X),
+        'sequence': run_sequence(data, args, timer) if args.sequence else None
+    }
+
+
+def run_stream_pipeline(args, timer):
+    """
+    Chunked variant for histories that do not fit in memory
+
+    The CSV is cleaned into a memory-mapped feature store, the LSTM trains
+    from a tf.data generator over it, and TWSVR (which needs its inputs in
+    memory) fits on a random sample of at most --twsvr-max-rows rows.
+
+    Returns:
+        Dictionary with forecaster, twsvr, metrics, rows and sequence results
+    """
+    store_dir = args.store_dir or f"{os.path.splitext(args.data)[0]}_features"
+    with timer.stage('preprocess'):
+        stream_preprocess(args.data, store_dir, chunksize=args.chunksize, date_format=args.date_format)
+    store = FeatureStore(store_dir)
+
+    split = split_index(len(store), args.validation_hours)
+
+    forecaster = LSTMForecaster()
+    with timer.stage('lstm'):
+        forecaster.build_model(input_shape=len(FEATURE_COLUMNS), lstm_units=args.lstm_units)
+        forecaster.train_stream(
+            lambda: store.iter_chunks(chunk_size=args.chunksize, stop=split),
+            epochs=args.epochs, batch_size=args.batch_size
+        )
+
+    X_sample, y_sample = store.sample(args.twsvr_max_rows, stop=split)
+    twsvr = fit_intervals(forecaster, X_sample, y_sample, args, timer)
+
+    report = None
+    if args.validation_hours:
+        X_val, y_val = store.read(split)
+        report = validate(forecaster, twsvr, X_val, y_val, timer)
+
+    return {'forecaster': forecaster, 'twsvr': twsvr, 'metrics': report, 'rows': len(store), 'sequence': None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', required=True, help='CSV with Date, Hour, Temperature and Load columns')
+    parser.add_argument('--model-dir', default='trained_models')
+    parser.add_argument('--version', default=None, help='Version name (default: timestamp)')
+    parser.add_argument('--validation-hours', type=int, default=0, help='Hold out the last N rows')
+    parser.add_argument('--epochs', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--lstm-units', type=int, default=64)
+    parser.add_argument('--epsilon', type=float, default=0.1)
+    parser.add_argument('--C', type=float, default=100)
+    parser.add_argument('--twsvr-backend', default='svr', choices=TWVSRPredictor.BACKENDS)
+    parser.add_argument('--n-jobs', type=int, default=2, help='Processes for the two TWSVR bounds')
+    parser.add_argument('--export-numpy', action='store_true', help='Also write lstm_model.npz (and sequence_model.npz)')
+    parser.add_argument('--report', default=None, help='Write the JSON report here as well as stdout')
+    parser.add_argument('--stream', action='store_true',
+                        help='Chunked ingestion into a memory-mapped store (rows must be in time order)')
+    parser.add_argument('--store-dir', default=None, help='Feature store directory for --stream')
+    parser.add_argument('--chunksize', type=int, default=500000, help='Rows per chunk for --stream')
+    parser.add_argument('--date-format', default='%Y-%m-%d', help='Date column format for --stream')
+    parser.add_argument('--twsvr-max-rows', type=int, default=50000, help='TWSVR sample size for --stream')
+    parser.add_argument('--sequence', action='store_true',
+                        help='Also train the multi-step sequence model (in-memory mode only)')
+    parser.add_argument('--lookback', type=int, default=168, help='Past hours per sequence window')
+    parser.add_argument('--horizon', type=int, default=24, help='Hours forecast per sequence window')
+    parser.add_argument('--sequence-twsvr-backend', default='nystroem', choices=TWVSRPredictor.BACKENDS)
+    args = parser.parse_args()
+
+    if args.sequence and args.stream:
+        parser.error('--sequence is not supported with --stream')
+
+    timer = StageTimer()
+    version = args.version or datetime.now().strftime('%Y%m%d-%H%M%S')
+    output_dir = os.path.join(args.model_dir, version)
+
+    pipeline = run_stream_pipeline if args.stream else run_pipeline
+    result = pipeline(args, timer)
+    metrics = finite_metrics(result['metrics'])
+
+    report = {
+        'version': version,
+        'rows': int(result['rows']),
+        'validation_hours': args.validation_hours,
+        'twsvr_backend': args.twsvr_backend,
+        'metrics': metrics,
+        'stage_seconds': timer.seconds
+    }
+    if result['sequence'] is not None:
+        report['sequence'] = {
+            'lookback': args.lookback,
+            'horizon': args.horizon,
+            'metrics': finite_metrics(result['sequence'][1])
+        }
+
+    with timer.stage('save'):
+        save_version(output_dir, result['forecaster'], result['twsvr'], {
+            'interval_mode': 'residual',
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'twsvr_backend': args.twsvr_backend,
+            'metrics': metrics
+        })
+        if result['sequence'] is not None:
+            result['sequence'][0].save_model(os.path.join(output_dir, 'sequence'))
+        if args.export_numpy:
+            from models.numpy_lstm import export_weights
+            export_weights(os.path.join(output_dir, 'lstm_model.h5'), os.path.join(output_dir, 'lstm_model.npz'))
+            if result['sequence'] is not None:
+                sequence_dir = os.path.join(output_dir, 'sequence')
+                export_weights(os.path.join(sequence_dir, 'sequence_model.h5'),
+                               os.path.join(sequence_dir, 'sequence_model.npz'))
+    report['stage_seconds'] = timer.seconds
+
+    output = json.dumps(report, indent=2, allow_nan=False)
+    print(output)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,405 @@
+"""
+ASGI serving mode plumbing
+
+AsgiApplication serves a small table of native `async` routes directly
+on the event loop and hands every other request to the Flask app through
+WsgiBridge, which runs it on a bounded thread pool and streams the
+response back chunk by chunk (so streamed exports stay streamed).
+Native handlers return Flask-style tuples: (body, status) or
+(body, status, headers). They run inside a Flask request context between
+the app's before_request and after_request hooks, and their results go
+through app.make_response, so request metrics, the request profiler and
+Flask-CORS see native routes exactly as they see Flask ones. A profile of
+a native route covers only the event-loop side of the request; work it
+awaits on the inference and database pools runs on other threads.
+
+Request bodies are capped at MAX_CONTENT_LENGTH (NATIVE_MAX_BODY for
+native routes) while they are read, and answered with a 413.
+
+Everything here is plain ASGI 3 on the standard library; any ASGI server
+(uvicorn, hypercorn) can run it. AsgiClient calls an app in process, the
+way such a server would, for the tests and the load generator.
+"""
+import asyncio
+import io
+import json
+import sys
+import tempfile
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode
+
+from werkzeug.datastructures import MultiDict
+
+SPOOL_MAX_SIZE = 1024 * 1024  # bridged request bodies above this go to a temporary file
+NATIVE_MAX_BODY = 1024 * 1024  # native routes only take small JSON bodies
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the request body was read"""
+
+
+class RequestTooLarge(Exception):
+    """A request body exceeded its size limit"""
+
+
+def build_environ(scope, body):
+    """
+    WSGI environ for an ASGI HTTP scope
+
+    Args:
+        scope: ASGI HTTP connection scope
+        body: File-like object holding the request body
+
+    Returns:
+        Dictionary usable as a PEP 3333 environ
+    """
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('127.0.0.1', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').lower()
+        value = value.decode('latin-1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def read_body(receive, limit=None):
+    """
+    Whole request body of a native route
+
+    Raises:
+        ClientDisconnected: If the client disconnected first
+        RequestTooLarge: If the body is larger than limit
+    """
+    chunks = []
+    size = 0
+    more = True
+    while more:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ClientDisconnected()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if limit is not None and size > limit:
+            raise RequestTooLarge('Request body too large')
+        chunks.append(chunk)
+        more = message.get('more_body', False)
+    return b''.join(chunks)
+
+
+class AsgiRequest:
+    """
+    Parsed request of a native route
+    """
+
+    def __init__(self, scope, body):
+        self.scope = scope
+        self.method = scope['method']
+        self.path = scope['path']
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1')
+                        for name, value in scope.get('headers', [])}
+        self.args = MultiDict(parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True))
+        self.body = body
+
+    def get_json(self):
+        """Parsed JSON body, or None when it is empty or not valid JSON"""
+        try:
+            return json.loads(self.body) if self.body else None
+        except ValueError:
+            return None
+
+    def environ(self):
+        """WSGI environ of this request, for pushing a Flask request context"""
+        environ = build_environ(self.scope, io.BytesIO(self.body))
+        environ['CONTENT_LENGTH'] = str(len(self.body))
+        environ.pop('HTTP_TRANSFER_ENCODING', None)
+        return environ
+
+
+class WsgiBridge:
+    """
+    Runs a WSGI app for ASGI requests on a bounded thread pool
+
+    Args:
+        wsgi_app: The WSGI application
+        max_workers: Threads running the app
+        max_body: Largest accepted request body in bytes (None for no limit)
+    """
+
+    def __init__(self, wsgi_app, max_workers, max_body=None):
+        self.wsgi_app = wsgi_app
+        self.max_body = max_body
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='asgi-wsgi')
+
+    async def __call__(self, scope, receive, send):
+        """
+        Raises:
+            RequestTooLarge: If the body is larger than max_body (nothing has been sent yet)
+        """
+        declared = next((value for name, value in scope.get('headers', []) if name.lower() == b'content-length'), None)
+        if self.max_body is not None and declared is not None and declared.isdigit() and int(declared) > self.max_body:
+            raise RequestTooLarge('Request body too large')
+
+        loop = asyncio.get_running_loop()
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        size = 0
+        more = True
+        try:
+            while more:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    body.close()
+                    return
+                chunk = message.get('body', b'')
+                size += len(chunk)
+                if self.max_body is not None and size > self.max_body:
+                    raise RequestTooLarge('Request body too large')
+                if size > SPOOL_MAX_SIZE:
+                    # Past the spool size the write (and the rollover) goes to disk: keep it off the loop
+                    await loop.run_in_executor(None, body.write, chunk)
+                else:
+                    body.write(chunk)
+                more = message.get('more_body', False)
+        except BaseException:
+            body.close()
+            raise
+        body.seek(0)
+
+        await loop.run_in_executor(self.executor, self._run, scope, body, size, send, loop)
+
+    def _run(self, scope, body, size, send, loop):
+        response = {}
+        environ = build_environ(scope, body)
+        # The body is fully buffered, so its length is known even for chunked uploads
+        environ['CONTENT_LENGTH'] = str(size)
+        environ.pop('HTTP_TRANSFER_ENCODING', None)
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response.get('started'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                   for name, value in headers]
+
+        def call(message):
+            # Blocks this worker thread until the event loop has sent the message (backpressure)
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        def start():
+            call({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+            response['started'] = True
+
+        iterable = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in iterable:
+                if not chunk:
+                    continue
+                if not response.get('started'):
+                    start()
+                call({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not response.get('started'):
+                start()
+            call({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+            body.close()
+
+
+class AsgiApplication:
+    """
+    ASGI entry point: native async routes first, the Flask app for everything else
+
+    Args:
+        flask_app: The app from create_app (bridged routes, config, CORS origins)
+        routes: Dictionary of (method, path) -> async handler(AsgiRequest)
+        wsgi_workers: Threads of the WSGI bridge
+        on_shutdown: Callables run at lifespan shutdown (coroutine functions are
+            awaited, others run off the event loop)
+    """
+
+    def __init__(self, flask_app, routes, wsgi_workers=8, on_shutdown=()):
+        self.flask_app = flask_app
+        self.routes = dict(routes)
+        self.bridge = WsgiBridge(flask_app, wsgi_workers, flask_app.config.get('MAX_CONTENT_LENGTH'))
+        self.on_shutdown = list(on_shutdown)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        handler = self.routes.get((scope['method'], scope['path']))
+        if handler is None:
+            # Includes CORS preflights, which Flask-CORS answers
+            try:
+                await self.bridge(scope, receive, send)
+            except RequestTooLarge as e:
+                await self._respond(scope, b'', self._error(str(e), 413), send)
+            return
+        await self._dispatch(handler, scope, receive, send)
+
+    async def _dispatch(self, handler, scope, receive, send):
+        try:
+            body = await read_body(receive, NATIVE_MAX_BODY)
+        except ClientDisconnected:
+            return
+        except RequestTooLarge as e:
+            await self._respond(scope, b'', self._error(str(e), 413), send)
+            return
+        await self._respond(scope, body, handler, send)
+
+    @staticmethod
+    def _error(message, status):
+        async def handler(request):
+            return {'error': message}, status
+        return handler
+
+    async def _respond(self, scope, body, handler, send):
+        """
+        Run a native handler between the Flask app's request hooks and send its response
+
+        The request context stays pushed across the handler's awaits; each
+        ASGI request runs in its own task, so it is never shared.
+        """
+        app = self.flask_app
+        request = AsgiRequest(scope, body)
+        with app.request_context(request.environ()):
+            try:
+                # before_request hooks may answer the request themselves
+                response = app.preprocess_request()
+                if response is None:
+                    response = await handler(request)
+                response = app.make_response(response)
+            except Exception:
+                traceback.print_exc()
+                response = app.make_response(({'error': 'Internal server error'}, 500))
+            response = app.process_response(response)
+            payload = response.get_data()
+
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                        for name, value in response.headers.items()]
+        })
+        await send({'type': 'http.response.body', 'body': payload})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                loop = asyncio.get_running_loop()
+                for callback in self.on_shutdown:
+                    if asyncio.iscoroutinefunction(callback):
+                        await callback()
+                    else:
+                        await loop.run_in_executor(None, callback)
+                self.bridge.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def start_event_loop():
+    """Event loop on a daemon thread, standing in for an ASGI server's loop"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name='asgi-loop', daemon=True).start()
+    return loop
+
+
+class AsgiClient:
+    """
+    Calls an ASGI app on an event loop thread (see start_event_loop) with one
+    HTTP request per call
+    """
+
+    def __init__(self, app, loop, timeout=60):
+        self.app = app
+        self.loop = loop
+        self.timeout = timeout
+
+    async def _call(self, scope, payload):
+        messages = [{'type': 'http.request', 'body': payload, 'more_body': False}]
+        response = {'status': None, 'headers': {}, 'body': []}
+
+        async def receive():
+            return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                response['headers'] = {name.decode('latin-1').title(): value.decode('latin-1')
+                                       for name, value in message['headers']}
+            else:
+                response['body'].append(message.get('body', b''))
+
+        await self.app(scope, receive, send)
+        return response['status'], response['headers'], b''.join(response['body'])
+
+    def request(self, method, path, json_body=None, data=None, params=None, headers=None):
+        """
+        Send one request and wait for the whole response
+
+        Args:
+            method: HTTP method
+            path: Request path
+            json_body: Value sent as an application/json body
+            data: Raw body (str or bytes) when json_body is not given
+            params: Query parameters
+            headers: Request headers; Content-Length is added unless
+                Transfer-Encoding is set
+
+        Returns:
+            Tuple of (status, headers, parsed JSON body or None)
+        """
+        headers = dict(headers or {})
+        payload = data.encode() if isinstance(data, str) else (data or b'')
+        if json_body is not None:
+            payload = json.dumps(json_body).encode()
+            headers['Content-Type'] = 'application/json'
+        if 'Transfer-Encoding' not in headers:
+            headers['Content-Length'] = str(len(payload))
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'scheme': 'http',
+            'method': method, 'path': path, 'raw_path': path.encode(), 'root_path': '',
+            'query_string': urlencode(params or {}).encode(), 'client': ('127.0.0.1', 0),
+            'server': ('localhost', 80),
+            'headers': [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+        }
+        status, response_headers, content = asyncio.run_coroutine_threadsafe(
+            self._call(scope, payload), self.loop
+        ).result(timeout=self.timeout)
+        try:
+            body = json.loads(content) if content else None
+        except ValueError:
+            body = None
+        return status, response_headers, body
@@ -0,0 +1,190 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+import numpy as np
+
+from models.registry import ModelUnavailableError
+from utils.process_local import ProcessLocalThread
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one vectorized call
+
+    Requests arriving within BATCH_WINDOW_MS of the first one (up to
+    BATCH_MAX_SIZE rows) are scored together and the results fanned back
+    out. Only useful with threaded workers (gunicorn --threads / gthread),
+    where several requests wait in the same process.
+
+    Callers wait at most BATCH_TIMEOUT for the collector thread. A request
+    it never picked up (thread dead or wedged) is scored directly instead;
+    one stuck mid-batch raises ModelUnavailableError. A dead collector is
+    restarted by the next request.
+    """
+
+    def __init__(self, app=None, predict_fn=None):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        # Requests queued before a fork belong to the parent's callers
+        self._thread = ProcessLocalThread(self._run, 'micro-batcher', after_fork=self._new_queue)
+        self.predict_fn = predict_fn or (lambda model, X: model.predict(X))
+        self.enabled = False
+        self.window = 0.002
+        self.max_size = 64
+        self.timeout = 10.0
+        self.fallbacks = 0
+        self.batch_sizes = {}
+        self.batches = 0
+        self.rows = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app, predict_fn=None):
+        """Read batching settings from the Flask config"""
+        self.enabled = app.config.get('MICRO_BATCHING', self.enabled)
+        self.window = app.config.get('BATCH_WINDOW_MS', self.window * 1000) / 1000
+        self.max_size = app.config.get('BATCH_MAX_SIZE', self.max_size)
+        self.timeout = app.config.get('BATCH_TIMEOUT', self.timeout)
+        if predict_fn is not None:
+            self.predict_fn = predict_fn
+        app.extensions['micro_batcher'] = self
+
+    def _new_queue(self):
+        self._queue = queue.Queue()
+
+    def predict(self, model, X_input):
+        """
+        Score rows, coalescing with other callers when batching is enabled
+
+        Args:
+            model: ModelBundle to run
+            X_input: 2D array of [temperature, hour, month, weekday] rows
+
+        Returns:
+            Tuple of (predicted_load, lower_bound, upper_bound) 1D arrays
+
+        Raises:
+            ModelUnavailableError: If the batch holding these rows did not
+                finish within BATCH_TIMEOUT
+        """
+        if not self.enabled:
+            return self.predict_fn(model, X_input)
+
+        self._thread.ensure()
+        future = Future()
+        self._queue.put((model, np.asarray(X_input, dtype=float), future))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            pass
+
+        if future.cancel():
+            # Never picked up: the collector is dead or wedged, so score these rows here
+            logger.warning("Micro-batcher did not pick up a request within %.1fs; scoring it directly", self.timeout)
+            with self._lock:
+                self.fallbacks += 1
+            return self.predict_fn(model, X_input)
+
+        # Already in a batch (or just finished): give that batch one more timeout
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise ModelUnavailableError(f"Prediction did not finish within {2 * self.timeout:.1f}s")
+
+    def _collect(self):
+        """Block for the first request, then gather more until the window closes"""
+        items = [self._queue.get()]
+        n_rows = len(items[0][1])
+        deadline = time.monotonic() + self.window
+        while n_rows < self.max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            n_rows += len(item[1])
+        return items
+
+    def _run(self):
+        while True:
+            items = self._collect()
+
+            # A model swap can land mid-window: group by bundle
+            groups = {}
+            for item in items:
+                groups.setdefault(id(item[0]), []).append(item)
+
+            for group in groups.values():
+                try:
+                    self._score(group)
+                except Exception:
+                    # Keep collecting; the group's callers fall back or time out
+                    logger.exception("Micro-batcher failed to score a batch")
+
+    def _score(self, group):
+        # Callers that timed out have cancelled their futures and scored the rows themselves
+        group = [item for item in group if item[2].set_running_or_notify_cancel()]
+        if not group:
+            return
+
+        model = group[0][0]
+        X = np.concatenate([item[1] for item in group])
+        try:
+            y_pred, lower, upper = self.predict_fn(model, X)
+        except Exception as e:
+            if len(group) == 1:
+                group[0][2].set_exception(e)
+                return
+            # One caller's rows must not fail the others: score each caller on its own
+            for _, rows, future in group:
+                try:
+                    future.set_result(self.predict_fn(model, rows))
+                except Exception as item_error:
+                    future.set_exception(item_error)
+            return
+
+        self._record(len(X))
+        offset = 0
+        for _, rows, future in group:
+            end = offset + len(rows)
+            future.set_result((y_pred[offset:end], lower[offset:end], upper[offset:end]))
+            offset = end
+
+    def _record(self, size):
+        # Power-of-two histogram buckets: 1, 2, 4, 8, ...
+        bucket = 1 << (size - 1).bit_length()
+        with self._lock:
+            self.batch_sizes[bucket] = self.batch_sizes.get(bucket, 0) + 1
+            self.batches += 1
+            self.rows += size
+
+    def stats(self):
+        """
+        Batching counters for the status endpoint
+
+        Returns:
+            Dictionary with settings, totals and the batch-size histogram
+        """
+        return {
+            'enabled': self.enabled,
+            'window_ms': self.window * 1000,
+            'max_size': self.max_size,
+            'timeout': self.timeout,
+            'fallbacks': self.fallbacks,
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': round(self.rows / self.batches, 2) if self.batches else None,
+            'batch_size_histogram': {f"<={bucket}": count for bucket, count in sorted(self.batch_sizes.items())}
+        }
+
+
+micro_batcher = MicroBatcher()
@@ -0,0 +1,239 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from models.registry import registry
+
+
+class SQLiteCacheBackend:
+    """
+    Shared prediction cache stored in a local SQLite file
+    Lets every worker process on a node reuse each other's results
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # SQLite connections must not cross fork, so each worker process opens its own
+        # on first use (callers hold self._lock)
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS prediction_cache ('
+                'key TEXT PRIMARY KEY, version TEXT, predicted_load REAL, '
+                'lower_bound REAL, upper_bound REAL, expires REAL)'
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get_many(self, keys):
+        """
+        Look up several keys at once
+
+        Returns:
+            Dictionary of key -> (predicted_load, lower_bound, upper_bound) for live hits
+        """
+        found = {}
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, predicted_load, lower_bound, upper_bound FROM prediction_cache "
+                    f"WHERE key IN ({','.join('?' * len(chunk))}) AND expires > ?",
+                    (*chunk, now)
+                ).fetchall()
+                for key, *values in rows:
+                    found[key] = tuple(values)
+        return found
+
+    def set_many(self, items, version, ttl):
+        """Store key -> (predicted_load, lower_bound, upper_bound) items"""
+        expires = time.time() + ttl
+        with self._lock:
+            self._connection().executemany(
+                'INSERT OR REPLACE INTO prediction_cache VALUES (?, ?, ?, ?, ?, ?)',
+                [(key, version, *values, expires) for key, values in items]
+            )
+
+    def purge(self, keep_version):
+        """Drop entries from other model versions and expired entries"""
+        with self._lock:
+            self._connection().execute(
+                'DELETE FROM prediction_cache WHERE version != ? OR expires <= ?',
+                (keep_version, time.time())
+            )
+
+
+class PredictionCache:
+    """
+    LRU + TTL cache in front of ModelBundle.predict (opt-in, PREDICTION_CACHE_SIZE)
+
+    Enabling it trades exactness for hit rate: answers are for the
+    temperature rounded to PREDICTION_CACHE_QUANTUM. Keys are the quantized feature tuple plus the model label, so a model
+    swap never serves stale results. Other versions' entries are dropped
+    once, when this process first serves the registry's new active version;
+    until then they simply age out.
+    """
+
+    def __init__(self, app=None):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.shared = None
+        self.maxsize = 0
+        self.ttl = 3600
+        self.quantum = 0.1
+        self.hits = 0
+        self.misses = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read cache settings from the Flask config"""
+        self.maxsize = app.config.get('PREDICTION_CACHE_SIZE', self.maxsize)
+        self.ttl = app.config.get('PREDICTION_CACHE_TTL', self.ttl)
+        self.quantum = app.config.get('PREDICTION_CACHE_QUANTUM', self.quantum)
+        shared_path = app.config.get('PREDICTION_CACHE_SHARED_PATH')
+        self.shared = SQLiteCacheBackend(shared_path) if shared_path and self.enabled else None
+        self.clear()
+        app.extensions['prediction_cache'] = self
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def clear(self):
+        """Drop every in-process entry and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _quantize(self, X_input):
+        X = np.array(X_input, dtype=float)
+        X[:, 0] = np.round(X[:, 0] / self.quantum) * self.quantum
+        return X
+
+    def _keys(self, X, version):
+        return [f"{version}|{t:.4f}|{int(h)}|{int(m)}|{int(w)}" for t, h, m, w in X]
+
+    def _check_version(self, model):
+        # Only a move to the active version purges: requests still holding the old
+        # bundle (or asking for an explicit version) must not wipe the new entries
+        if model.label == self._version:
+            return
+        if model.name != registry.default_name or model.version != registry.active_version():
+            return
+        with self._lock:
+            self._entries.clear()
+        if self.shared is not None:
+            self.shared.purge(model.label)
+        self._version = model.label
+
+    def predict(self, model, X_input):
+        """
+        Cached equivalent of model.predict(X_input)
+
+        Temperatures are rounded to PREDICTION_CACHE_QUANTUM before both the
+        lookup and the model call, so cached and fresh answers agree.
+
+        Args:
+            model: ModelBundle to run on cache misses
+            X_input: 2D array of [temperature, hour, month, weekday] rows
+
+        Returns:
+            Tuple of (predicted_load, lower_bound, upper_bound) 1D arrays
+        """
+        # Table lookups are already cheaper than a cache lookup
+        if not self.enabled or model.table is not None:
+            return model.predict(X_input)
+
+        self._check_version(model)
+        X = self._quantize(X_input)
+        keys = self._keys(X, model.label)
+        results = np.empty((len(keys), 3))
+
+        # In-process LRU first
+        missing = []
+        now = time.monotonic()
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    results[i] = entry[1]
+                else:
+                    missing.append(i)
+
+        # Then the shared backend
+        if missing and self.shared is not None:
+            shared_hits = self.shared.get_many([keys[i] for i in missing])
+            if shared_hits:
+                self._store([(keys[i], shared_hits[keys[i]]) for i in missing if keys[i] in shared_hits])
+                still_missing = []
+                for i in missing:
+                    if keys[i] in shared_hits:
+                        results[i] = shared_hits[keys[i]]
+                    else:
+                        still_missing.append(i)
+                missing = still_missing
+
+        # Misses run through the model in one vectorized call
+        if missing:
+            y_pred, lower, upper = model.predict(X[missing])
+            computed = np.column_stack([y_pred, lower, upper])
+            results[missing] = computed
+            items = [(keys[i], tuple(map(float, values))) for i, values in zip(missing, computed)]
+            self._store(items)
+            if self.shared is not None:
+                self.shared.set_many(items, model.label, self.ttl)
+
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(keys) - len(missing)
+
+        return results[:, 0], results[:, 1], results[:, 2]
+
+    def _store(self, items):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for key, values in items:
+                self._entries[key] = (expires, values)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Cache counters for the status endpoint
+
+        Returns:
+            Dictionary with size, hits, misses and hit rate
+        """
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'shared': self.shared.path if self.shared is not None else None,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else None
+        }
+
+
+prediction_cache = PredictionCache()
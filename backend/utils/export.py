@@ -0,0 +1,115 @@
+import csv
+import io
+import json
+
+EXPORT_FIELDS = ['date', 'hour', 'temperature', 'predicted_load', 'lower_bound',
+                 'upper_bound', 'model_used', 'timestamp']
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def _values(row):
+    return (
+        row.date.strftime('%Y-%m-%d'),
+        row.hour,
+        row.temperature,
+        row.predicted_load,
+        row.lower_bound,
+        row.upper_bound,
+        row.model_used,
+        row.timestamp.strftime('%Y-%m-%d %H:%M:%S')
+    )
+
+
+def iter_csv(partitions):
+    """
+    Encode row partitions as CSV, one chunk per partition
+
+    Args:
+        partitions: Iterable of lists of projected history rows
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for rows in partitions:
+        writer.writerows(_values(row) for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_ndjson(partitions):
+    """Encode row partitions as newline-delimited JSON"""
+    for rows in partitions:
+        yield ''.join(json.dumps(dict(zip(EXPORT_FIELDS, _values(row)))) + '\n' for row in rows)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each row group"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_parquet(partitions):
+    """
+    Encode row partitions as Parquet, one row group per partition
+    Requires pyarrow (checked by parquet_available)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('date', pa.string()),
+        ('hour', pa.int32()),
+        ('temperature', pa.float64()),
+        ('predicted_load', pa.float64()),
+        ('lower_bound', pa.float64()),
+        ('upper_bound', pa.float64()),
+        ('model_used', pa.string()),
+        ('timestamp', pa.string()),
+    ])
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for rows in partitions:
+            columns = list(zip(*(_values(row) for row in rows)))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+SERIALIZERS = {
+    'csv': iter_csv,
+    'ndjson': iter_ndjson,
+    'parquet': iter_parquet,
+}
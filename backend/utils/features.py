@@ -0,0 +1,266 @@
+"""
+Shared, vectorized feature engineering for training and serving
+
+Training, batch scoring and single predictions all build model inputs
+through build_feature_matrix, so they cannot disagree on column order or
+encoding. Calendar features come from datetime64 arithmetic instead of
+per-row datetime objects, matrices are C-contiguous float32, and lag /
+rolling / sequence windows are strided views (sliding_window_view).
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Inputs of the served LSTM+TWSVR models, in order
+FEATURE_COLUMNS = ['Temperature', 'Hour', 'Month', 'Weekday']
+CYCLICAL_PERIODS = {'Hour': 24, 'Month': 12, 'Weekday': 7}
+ROLLING_STATS = {'mean': np.mean, 'std': np.std, 'min': np.min, 'max': np.max}
+
+ISO_DATE_FORMAT = '%Y-%m-%d'
+# What ISO_DATE_FORMAT accepts everywhere: zero-padded, no partial dates
+ISO_DATE_PATTERN = r'\d{4}-\d{2}-\d{2}'
+# 1970-01-01 was a Thursday (Monday = 0)
+EPOCH_WEEKDAY = 3
+
+
+def iso_date_mask(dates):
+    """
+    Which dates satisfy the strict YYYY-MM-DD rule
+
+    NumPy's ISO parser also takes partial dates ('2027-01', '2027'), while
+    strptime takes unpadded ones ('2027-1-2'); both are rejected here so
+    validation and parsing agree. Dates and datetimes (including
+    Timestamps and datetime64 scalars) pass; any other type fails.
+
+    Returns:
+        1D boolean array
+    """
+    values = np.asarray(dates)
+    if values.dtype.kind == 'U':
+        return pd.Series(values.ravel()).str.fullmatch(ISO_DATE_PATTERN).to_numpy(dtype=bool)
+
+    values = pd.Series(values.astype(object).ravel())
+    is_string = values.map(lambda value: isinstance(value, str))
+    is_date = values.map(lambda value: isinstance(value, (date, np.datetime64)))
+    matches = values.where(is_string, '').str.fullmatch(ISO_DATE_PATTERN)
+    return (matches | is_date).to_numpy(dtype=bool)
+
+
+def to_datetime64(dates, date_format=ISO_DATE_FORMAT):
+    """
+    Parse dates into a datetime64[D] array
+
+    Args:
+        dates: Sequence of date strings or datetimes, or a datetime64 array
+        date_format: strptime format of string dates
+
+    Returns:
+        1D datetime64[D] array
+
+    Raises:
+        ValueError: If a date is missing or does not match date_format
+    """
+    values = np.asarray(dates)
+    if np.issubdtype(values.dtype, np.datetime64):
+        days = values.astype('datetime64[D]')
+    elif date_format == ISO_DATE_FORMAT:
+        if not iso_date_mask(values).all():
+            raise ValueError(f"Invalid date format (use {date_format})")
+        # NumPy parses ISO dates in C, far faster than strptime
+        try:
+            days = values.astype('datetime64[D]')
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid date format (use {date_format})")
+    else:
+        days = pd.to_datetime(values, format=date_format).to_numpy().astype('datetime64[D]')
+
+    if np.isnat(days).any():
+        raise ValueError(f"Invalid date format (use {date_format})")
+    return days
+
+
+def calendar_features(days):
+    """
+    Month and weekday of each day
+
+    Args:
+        days: datetime64 array (any unit)
+
+    Returns:
+        Tuple of (month 1-12, weekday 0-6 with Monday = 0) int8 arrays
+    """
+    days = np.asarray(days).astype('datetime64[D]')
+    month = days.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    weekday = (days.astype(np.int64) + EPOCH_WEEKDAY) % 7
+    return month.astype(np.int8), weekday.astype(np.int8)
+
+
+def holiday_flags(days, holidays):
+    """
+    1 where a day is in holidays, else 0
+
+    Args:
+        days: datetime64 array
+        holidays: Iterable of holiday dates (strings, datetimes or datetime64)
+
+    Returns:
+        int8 array
+    """
+    holidays = to_datetime64(list(holidays)) if len(holidays) else np.array([], dtype='datetime64[D]')
+    return np.isin(np.asarray(days).astype('datetime64[D]'), holidays).astype(np.int8)
+
+
+def cyclical_encode(values, period, dtype=np.float32):
+    """
+    Map a periodic feature onto the unit circle so its ends are adjacent
+
+    Returns:
+        Tuple of (sin, cos) arrays
+    """
+    angle = (2 * np.pi / period) * np.asarray(values, dtype=np.float64)
+    return np.sin(angle).astype(dtype), np.cos(angle).astype(dtype)
+
+
+def feature_columns(holidays=False, cyclical=False):
+    """
+    Column names produced by build_feature_matrix with the same options
+    """
+    columns = list(FEATURE_COLUMNS)
+    if holidays:
+        columns.append('Holiday')
+    if cyclical:
+        for name in CYCLICAL_PERIODS:
+            columns.extend([f'{name}_sin', f'{name}_cos'])
+    return columns
+
+
+def build_feature_matrix(temperatures, hours, dates, date_format=ISO_DATE_FORMAT,
+                         holidays=None, cyclical=False, dtype=np.float32):
+    """
+    Model inputs for many (date, hour, temperature) rows
+
+    Args:
+        temperatures: Sequence of temperature values
+        hours: Sequence of hours (0-23)
+        dates: Sequence of dates (see to_datetime64)
+        date_format: strptime format of string dates
+        holidays: Optional iterable of holiday dates; adds a Holiday flag column
+        cyclical: Append sin/cos encodings of hour, month and weekday
+        dtype: Output dtype
+
+    Returns:
+        Tuple of (C-contiguous 2D array in feature_columns() order, datetime64[D] days)
+
+    Raises:
+        ValueError: On unparseable dates or mismatched lengths
+    """
+    days = to_datetime64(dates, date_format)
+    temperatures = np.asarray(temperatures, dtype=dtype)
+    hours = np.asarray(hours, dtype=dtype)
+    if not len(days) == len(temperatures) == len(hours):
+        raise ValueError(
+            f"Length mismatch: {len(days)} dates, {len(hours)} hours, {len(temperatures)} temperatures"
+        )
+
+    month, weekday = calendar_features(days)
+    columns = [temperatures, hours, month, weekday]
+    if holidays is not None:
+        columns.append(holiday_flags(days, holidays))
+    if cyclical:
+        for values, period in zip((hours, month, weekday), CYCLICAL_PERIODS.values()):
+            columns.extend(cyclical_encode(values, period, dtype))
+
+    X = np.empty((len(days), len(columns)), dtype=dtype)
+    for i, column in enumerate(columns):
+        X[:, i] = column
+    return X, days
+
+
+def frame_to_matrix(frame, columns=FEATURE_COLUMNS, dtype=np.float32):
+    """
+    Contiguous feature matrix from already-engineered DataFrame columns
+    """
+    return np.ascontiguousarray(frame[list(columns)].to_numpy(dtype=dtype))
+
+
+def lag_features(values, lags, dtype=np.float32):
+    """
+    Lagged copies of a time-ordered series
+
+    Args:
+        values: 1D array
+        lags: Positive lags, in steps
+
+    Returns:
+        2D array [len(values), len(lags)]; rows without enough history are NaN
+    """
+    values = np.asarray(values, dtype=dtype)
+    out = np.full((len(values), len(lags)), np.nan, dtype=dtype)
+    for j, lag in enumerate(lags):
+        if lag < len(values):
+            out[lag:, j] = values[:len(values) - lag]
+    return out
+
+
+def rolling_features(values, window, stats=('mean', 'std', 'min', 'max'), dtype=np.float32):
+    """
+    Trailing-window statistics of a time-ordered series
+
+    Each row's window ends at (and includes) that row; lag the series by one
+    first when the row's own value is the target.
+
+    Args:
+        values: 1D array
+        window: Window length, in steps
+        stats: Names from ROLLING_STATS
+
+    Returns:
+        2D array [len(values), len(stats)]; the first window - 1 rows are NaN
+    """
+    values = np.asarray(values, dtype=dtype)
+    out = np.full((len(values), len(stats)), np.nan, dtype=dtype)
+    if len(values) < window:
+        return out
+
+    windows = sliding_window_view(values, window)
+    for j, stat in enumerate(stats):
+        out[window - 1:, j] = ROLLING_STATS[stat](windows, axis=1)
+    return out
+
+
+def make_windows(features, target, lookback, horizon):
+    """
+    Sliding (lookback -> horizon) windows as strided views, no copies
+
+    Args:
+        features: 2D array [timesteps, n_features]
+        target: 1D array [timesteps]
+        lookback: Past timesteps per input window
+        horizon: Future timesteps per output
+
+    Returns:
+        Tuple of (X [windows, lookback, n_features], y [windows, horizon]) views
+    """
+    n_windows = len(features) - lookback - horizon + 1
+    if n_windows <= 0:
+        raise ValueError(f"Need at least {lookback + horizon} timesteps, got {len(features)}")
+
+    X = sliding_window_view(features, (lookback, features.shape[1]))[:n_windows, 0]
+    y = sliding_window_view(target, horizon)[lookback:lookback + n_windows]
+    return X, y
+
+
+def future_calendar(last_timestamp, horizon):
+    """
+    Calendar features of the hours following last_timestamp
+
+    Returns:
+        Tuple of (2D array [horizon, 3] of [hour, month, weekday], DatetimeIndex)
+    """
+    start = np.datetime64(pd.Timestamp(last_timestamp).to_datetime64(), 'h') + 1
+    stamps = start + np.arange(horizon)
+    month, weekday = calendar_features(stamps)
+    hours = stamps.astype(np.int64) % 24
+    return np.column_stack([hours, month, weekday]), pd.DatetimeIndex(stamps)
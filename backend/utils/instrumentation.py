@@ -0,0 +1,414 @@
+"""
+Lightweight request, stage and database instrumentation
+
+Counters and fixed-bucket latency histograms live in process memory and
+cost a few microseconds per observation. /api/metrics renders them in
+the Prometheus text format.
+
+gunicorn runs several worker processes, and a scrape lands on only one
+of them. With METRICS_DIR set, every process therefore snapshots its
+registry to METRICS_DIR/metrics-<pid>-<start>.json (every
+METRICS_FLUSH_INTERVAL seconds and at exit) and the endpoint merges all
+snapshots. Counters and histograms only ever add up, so the merged totals
+are exact as of each process's last flush. At scrape time the snapshots
+of exited workers are folded into metrics-retired.json, so totals never
+go backwards and a reused PID never overwrites an old worker's counts.
+Without METRICS_DIR only the scraped process is reported. The merge needs
+POSIX file locks and process probes; elsewhere (Windows runs a single
+process) only that process is reported too.
+"""
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from flask import g, request
+from sqlalchemy import event
+
+from utils.process_local import ProcessLocalThread
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRICS = {
+    'http_requests_total': ('counter', 'HTTP requests by endpoint, method and status'),
+    'http_request_errors_total': ('counter', 'HTTP requests that ended in a 5xx response'),
+    'http_request_duration_seconds': ('histogram', 'End-to-end request latency'),
+    'prediction_stage_seconds': ('histogram', 'Latency of each stage of the prediction path'),
+    'model_load_seconds': ('histogram', 'Time to load a model version from disk'),
+    'db_query_seconds': ('histogram', 'SQL statement execution time by operation'),
+    'prediction_write_errors_total': ('counter', 'Failed write-behind flush attempts'),
+    'predictions_dropped_total': ('counter', 'Write-behind prediction rows dropped after failed flushes'),
+}
+
+
+RETIRED_FILE = 'metrics-retired.json'
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+class Instrumentation:
+    """
+    Process-wide counters and latency histograms with optional cross-process merge
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._flusher = ProcessLocalThread(self._run, 'metrics-flusher')
+        self._started = time.time_ns()
+        self._atexit_registered = False
+        self.enabled = True
+        self.metrics_dir = None
+        self.flush_interval = 5.0
+        # A forked worker starts from an empty registry; the parent keeps its own
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read metrics settings and hook request timing into the app"""
+        self.enabled = app.config.get('METRICS_ENABLED', self.enabled)
+        self.metrics_dir = app.config.get('METRICS_DIR') or None
+        self.flush_interval = app.config.get('METRICS_FLUSH_INTERVAL', self.flush_interval)
+        app.extensions['instrumentation'] = self
+        if not self.enabled:
+            return
+
+        if self.metrics_dir:
+            os.makedirs(self.metrics_dir, exist_ok=True)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        if not self._atexit_registered:
+            atexit.register(self.flush)
+            self._atexit_registered = True
+
+    def _reset_after_fork(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._started = time.time_ns()
+
+    # ===== RECORDING =====
+
+    def inc(self, name, value=1, **labels):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        """Record one latency sample in a histogram"""
+        if not self.enabled:
+            return
+        key = (name, _labels_key(labels))
+        index = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+
+    @contextmanager
+    def _timer(self, name, labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timer(self, name, **labels):
+        """Context manager observing its block's duration into a histogram"""
+        if not self.enabled:
+            return nullcontext()
+        return self._timer(name, labels)
+
+    def stage(self, stage):
+        """Time one stage of the prediction path"""
+        return self.timer('prediction_stage_seconds', stage=stage)
+
+    # ===== FLASK AND SQLALCHEMY HOOKS =====
+
+    def _before_request(self):
+        self._ensure_flusher()
+        g.instrumentation_start = time.perf_counter()
+
+    def _after_request(self, response):
+        start = g.pop('instrumentation_start', None)
+        if start is None:
+            return response
+        # The URL rule, not the path, keeps label cardinality bounded
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        self.record_request(endpoint, request.method, response.status_code, time.perf_counter() - start)
+        return response
+
+    def record_request(self, endpoint, method, status, seconds):
+        """Count and time one finished request"""
+        self._ensure_flusher()
+        self.observe('http_request_duration_seconds', seconds, endpoint=endpoint)
+        self.inc('http_requests_total', endpoint=endpoint, method=method, status=status)
+        if status >= 500:
+            self.inc('http_request_errors_total', endpoint=endpoint)
+
+    def instrument_engine(self, engine):
+        """Time every SQL statement executed on an engine"""
+        if not self.enabled:
+            return
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _start(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('instrumentation_start', []).append(time.perf_counter())
+            if context is not None:
+                context.instrumentation_started = True
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _stop(conn, cursor, statement, parameters, context, executemany):
+            start = conn.info['instrumentation_start'].pop()
+            operation = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else 'unknown'
+            self.observe('db_query_seconds', time.perf_counter() - start, operation=operation)
+
+        @event.listens_for(engine, 'handle_error')
+        def _abandon(context):
+            # A failed statement never reaches after_cursor_execute; drop its start time
+            # (unless it failed before before_cursor_execute pushed one)
+            execution = context.execution_context
+            if context.connection is None or not getattr(execution, 'instrumentation_started', False):
+                return
+            starts = context.connection.info.get('instrumentation_start')
+            if starts:
+                starts.pop()
+
+    # ===== CROSS-PROCESS SNAPSHOTS =====
+
+    def snapshot(self):
+        """
+        This process's metrics as plain data
+
+        Returns:
+            Dictionary with counters and histograms lists
+        """
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [
+                    [name, list(labels), list(counts), total]
+                    for (name, labels), (counts, total) in self._histograms.items()
+                ]
+            }
+
+    def flush(self):
+        """Write this process's snapshot to METRICS_DIR (no-op without it)"""
+        if not self.enabled or not self.metrics_dir:
+            return
+        # The start time keeps a reused PID from overwriting an exited worker's snapshot
+        path = os.path.join(self.metrics_dir, f'metrics-{os.getpid()}-{self._started}.json')
+        partial = f'{path}.tmp'
+        try:
+            with open(partial, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(partial, path)
+        except OSError:
+            pass
+
+    def _ensure_flusher(self):
+        if self.metrics_dir:
+            self._flusher.ensure()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def _exited_snapshots(self):
+        """Snapshot paths of processes that are no longer running"""
+        latest = {}
+        processes = []
+        for path in glob.glob(os.path.join(self.metrics_dir, 'metrics-*-*.json')):
+            try:
+                pid, started = (int(part) for part in os.path.basename(path)[8:-5].split('-'))
+            except ValueError:
+                continue
+            processes.append((pid, started, path))
+            latest[pid] = max(latest.get(pid, started), started)
+
+        exited = []
+        for pid, started, path in processes:
+            # An older start time for a PID means that PID has been reused since
+            if started < latest[pid]:
+                exited.append(path)
+                continue
+            # Signal 0 only probes on POSIX (on Windows it terminates); collect() checks os.name
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                exited.append(path)
+            except PermissionError:
+                pass
+        return exited
+
+    def _retire_exited(self):
+        """
+        Fold the snapshots of exited processes into RETIRED_FILE (caller holds the directory lock)
+
+        Returns:
+            The retired snapshot, including the names of the files folded into it
+        """
+        retired_path = os.path.join(self.metrics_dir, RETIRED_FILE)
+        try:
+            with open(retired_path) as f:
+                retired = json.load(f)
+        except (OSError, ValueError):
+            retired = {'counters': [], 'histograms': [], 'folded': []}
+
+        exited = [path for path in self._exited_snapshots()
+                  if os.path.basename(path) not in retired['folded']]
+        if not exited:
+            return retired
+
+        snapshots = [retired]
+        for path in exited:
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        counters, histograms = self._merge(snapshots)
+        # Names are kept until their files are gone, so a fold that stops
+        # before removing them never counts them twice
+        folded = sorted(
+            {name for name in retired['folded'] if os.path.exists(os.path.join(self.metrics_dir, name))}
+            | {os.path.basename(path) for path in exited}
+        )
+        updated = {
+            'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+            'histograms': [[name, list(labels), counts, total] for (name, labels), (counts, total) in histograms.items()],
+            'folded': folded
+        }
+        partial = f'{retired_path}.tmp'
+        try:
+            with open(partial, 'w') as f:
+                json.dump(updated, f)
+            os.replace(partial, retired_path)
+        except OSError:
+            return retired  # Try again on the next scrape; the exited snapshots are still read as-is
+        for path in exited:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        return updated
+
+    @staticmethod
+    def _merge(snapshots):
+        counters, histograms = {}, {}
+        for snapshot in snapshots:
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, counts, total in snapshot['histograms']:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                merged = histograms.setdefault(key, [[0] * len(counts), 0.0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+        return counters, histograms
+
+    def collect(self):
+        """
+        Merged metrics across every process that shares METRICS_DIR
+
+        Returns:
+            Tuple of (counters, histograms) keyed by (name, labels)
+        """
+        if self.metrics_dir and os.name == 'posix':
+            import fcntl
+            self.flush()
+            snapshots = []
+            try:
+                with open(os.path.join(self.metrics_dir, 'metrics.lock'), 'a') as lock:
+                    # Every worker may scrape at once: fold and read under one lock so
+                    # no snapshot is counted both live and retired
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                    retired = self._retire_exited()
+                    snapshots.append(retired)
+                    for path in glob.glob(os.path.join(self.metrics_dir, 'metrics-*-*.json')):
+                        if os.path.basename(path) in retired['folded']:
+                            continue
+                        try:
+                            with open(path) as f:
+                                snapshots.append(json.load(f))
+                        except (OSError, ValueError):
+                            continue
+            except OSError:
+                pass
+        else:
+            snapshots = [self.snapshot()]
+
+        return self._merge(snapshots)
+
+    def render(self):
+        """
+        Merged metrics in the Prometheus text exposition format (0.0.4)
+
+        Returns:
+            str
+        """
+        counters, histograms = self.collect()
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            series = counters if kind == 'counter' else histograms
+            keys = sorted(key for key in series if key[0] == name)
+            if not keys:
+                continue
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for key in keys:
+                labels = key[1]
+                if kind == 'counter':
+                    lines.append(f'{name}{_format_labels(labels)} {series[key]}')
+                    continue
+                counts, total = series[key]
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def totals(self):
+        """
+        Request and error totals for the status endpoint (merged like /api/metrics)
+
+        Returns:
+            Dictionary with requests and errors
+        """
+        counters, _ = self.collect()
+        return {
+            'requests': sum(value for (name, _), value in counters.items() if name == 'http_requests_total'),
+            'errors': sum(value for (name, _), value in counters.items() if name == 'http_request_errors_total')
+        }
+
+
+instrumentation = Instrumentation()
@@ -0,0 +1,159 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import delete
+
+from models.registry import registry
+from schemas.models import db, ForecastJob, Prediction
+from utils.cache import prediction_cache
+from utils.persistence import prediction_writer, build_prediction_records
+from utils.process_local import ProcessLocalExecutor
+from utils.preprocessing import validate_prediction_frame, create_batch_prediction_input
+
+RESULT_COLUMNS = ['Date', 'Hour', 'Temperature', 'PredictedLoad', 'LowerBound', 'UpperBound']
+
+
+class JobRunner:
+    """
+    In-process background pool for uploaded forecast files
+
+    Job state lives in the forecast_jobs table, so any worker can answer a
+    status poll. A job only runs in the worker that accepted the upload.
+    Chunks commit as they are scored so progress stays visible; if a later
+    chunk fails, the rows already stored are deleted again. The uploaded
+    CSV is removed once the job has finished either way.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.max_workers = 2
+        self.chunk_size = 5000
+        self._pool = ProcessLocalExecutor(self.max_workers, 'forecast-job')
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read job settings from the Flask config"""
+        self.app = app
+        self.max_workers = app.config.get('UPLOAD_WORKERS', self.max_workers)
+        self.chunk_size = app.config.get('UPLOAD_CHUNK_SIZE', self.chunk_size)
+        self._pool.reset(max_workers=self.max_workers)
+        os.makedirs(self.result_folder, exist_ok=True)
+        app.extensions['job_runner'] = self
+
+    @property
+    def result_folder(self):
+        return os.path.join(self.app.config['UPLOAD_FOLDER'], 'results')
+
+    def submit(self, job_id, upload_path):
+        """
+        Queue a saved upload for scoring
+
+        Args:
+            job_id: ForecastJob primary key
+            upload_path: Path of the saved CSV
+        """
+        self._pool.submit(self._run, job_id, upload_path)
+
+    def _run(self, job_id, upload_path):
+        with self.app.app_context():
+            try:
+                self._run_job(job_id, upload_path)
+            finally:
+                db.session.remove()
+                # The upload is only needed while the job runs
+                if os.path.exists(upload_path):
+                    os.remove(upload_path)
+
+    def _run_job(self, job_id, upload_path):
+        job = db.session.get(ForecastJob, job_id)
+        if job is None:
+            return
+
+        inserted_ids = []
+        try:
+            job.status = 'running'
+            db.session.commit()
+            self._process(job, upload_path, inserted_ids)
+            job.status = 'completed'
+        except Exception as e:
+            db.session.rollback()
+            self._discard(job_id, inserted_ids)
+            job = db.session.get(ForecastJob, job_id)
+            if job is None:
+                return
+            job.status = 'failed'
+            job.error = str(e)
+            job.rows_done = 0
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+    def _discard(self, job_id, prediction_ids):
+        """Delete the rows and partial result file of a failed job"""
+        for start in range(0, len(prediction_ids), 500):
+            db.session.execute(
+                delete(Prediction).where(Prediction.prediction_id.in_(prediction_ids[start:start + 500]))
+            )
+        db.session.commit()
+        result_path = os.path.join(self.result_folder, f"{job_id}.csv")
+        if os.path.exists(result_path):
+            os.remove(result_path)
+
+    def _process(self, job, upload_path, inserted_ids):
+        """
+        Validate the whole file, then score and store it chunk by chunk
+
+        Args:
+            job: ForecastJob being run
+            upload_path: Path of the saved CSV
+            inserted_ids: List extended with the prediction_ids of each committed chunk
+        """
+        rows_total = 0
+        for chunk in pd.read_csv(upload_path, chunksize=self.chunk_size):
+            chunk.index += 1  # read_csv numbers rows across chunks; make them 1-based
+            is_valid, error_message = validate_prediction_frame(chunk)
+            if not is_valid:
+                raise ValueError(error_message)
+            rows_total += len(chunk)
+        if rows_total == 0:
+            raise ValueError("Uploaded file has no rows")
+
+        job.rows_total = rows_total
+        db.session.commit()
+
+        model = registry.get()
+        result_path = os.path.join(self.result_folder, f"{job.job_id}.csv")
+
+        with open(result_path, 'w', newline='') as result_file:
+            for i, chunk in enumerate(pd.read_csv(upload_path, chunksize=self.chunk_size)):
+                try:
+                    X_input, dates = create_batch_prediction_input(chunk['Date'], chunk['Hour'], chunk['Temperature'])
+                except (TypeError, ValueError) as e:
+                    # Fails the job with the rows named, like a validation error
+                    first = i * self.chunk_size + 1
+                    raise ValueError(f"Rows {first}-{first + len(chunk) - 1}: {e}") from e
+                y_pred, lower, upper = prediction_cache.predict(model, X_input)
+
+                records = build_prediction_records(
+                    job.user_id, dates, X_input, y_pred, lower, upper, model.label
+                )
+                inserted_ids.extend(prediction_writer.write(records, return_ids=True))
+
+                pd.DataFrame({
+                    'Date': dates.strftime('%Y-%m-%d'),
+                    'Hour': X_input[:, 1].astype(int),
+                    'Temperature': X_input[:, 0],
+                    'PredictedLoad': y_pred,
+                    'LowerBound': lower,
+                    'UpperBound': upper
+                }, columns=RESULT_COLUMNS).to_csv(result_file, header=(i == 0), index=False)
+
+                job.rows_done += len(records)
+                db.session.commit()
+
+        job.result_path = result_path
+
+
+job_runner = JobRunner()
@@ -14,12 +14,17 @@ def calculate_r2(y_true, y_pred):
     return r2_score(y_true, y_pred)
 
 def calculate_mape(y_true, y_pred):
-    """Calculate Mean Absolute Percentage Error"""
-    return np.mean(np.abs((y_true - y_pred) / y_true)) * 100
+    """Calculate Mean Absolute Percentage Error over rows with non-zero load"""
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+    nonzero = y_true != 0
+    if not nonzero.any():
+        return float('nan')
+    return np.mean(np.abs((y_true[nonzero] - y_pred[nonzero]) / y_true[nonzero])) * 100
 
 def calculate_all_metrics(y_true, y_pred):
     """
-    Calculate all performance metrics
+    Calculate all performance metrics in a single pass
     
     Args:
         y_true: Ground truth values
@@ -28,14 +33,7 @@ def calculate_all_metrics(y_true, y_pred):
     Returns:
         Dictionary with all metrics
     """
-    metrics = {
-        'rmse': float(calculate_rmse(y_true, y_pred)),
-        'mae': float(calculate_mae(y_true, y_pred)),
-        'r2': float(calculate_r2(y_true, y_pred)),
-        'mape': float(calculate_mape(y_true, y_pred))
-    }
-    
-    return metrics
+    return MetricsAccumulator().update(y_true, y_pred).report()
 
 def calculate_interval_coverage(y_true, y_lower, y_upper):
     """
@@ -80,10 +78,132 @@ def create_metrics_report(y_true, y_pred, y_lower=None, y_upper=None):
     Returns:
         Dictionary with all metrics and analysis
     """
-    report = calculate_all_metrics(y_true, y_pred)
-    
-    if y_lower is not None and y_upper is not None:
-        report['interval_coverage'] = float(calculate_interval_coverage(y_true, y_lower, y_upper))
-        report['interval_width'] = float(calculate_interval_width(y_lower, y_upper))
-    
-    return report
+    return MetricsAccumulator().update(y_true, y_pred, y_lower, y_upper).report()
+
+class MetricsAccumulator:
+    """
+    Single-pass, mergeable accumulator for every metric in create_metrics_report
+
+    update() folds in one chunk of (y_true, y_pred[, lower, upper]) with a
+    handful of vectorized reductions and keeps only running sums, so
+    arbitrarily long backtests or prediction-vs-actual streams can be
+    scored in constant memory. The mean and sum of squared deviations of
+    y_true (needed for R²) are combined with Chan et al.'s parallel form
+    of Welford's update, which is also how merge() joins accumulators
+    from different workers.
+
+    MAPE skips rows whose actual load is zero; sMAPE skips rows where
+    both actual and prediction are zero.
+    """
+
+    FIELDS = ('n', 'mean_true', 'm2_true', 'sum_sq_error', 'sum_abs_error',
+              'sum_ape', 'n_ape', 'sum_sape', 'n_sape', 'n_interval', 'n_covered', 'sum_width')
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, 0 if field.startswith('n') else 0.0)
+
+    def _combine_moments(self, n, mean, m2):
+        total = self.n + n
+        delta = mean - self.mean_true
+        self.mean_true += delta * n / total
+        self.m2_true += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    def update(self, y_true, y_pred, y_lower=None, y_upper=None):
+        """
+        Fold one chunk into the running totals
+
+        Args:
+            y_true: Ground truth values
+            y_pred: Point predictions
+            y_lower: Lower bounds (optional)
+            y_upper: Upper bounds (optional)
+
+        Returns:
+            self, so calls can be chained
+        """
+        y_true = np.asarray(y_true, dtype=np.float64).ravel()
+        y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+        n = len(y_true)
+        if n == 0:
+            return self
+
+        error = y_pred - y_true
+        abs_error = np.abs(error)
+        abs_true = np.abs(y_true)
+
+        mean = y_true.mean()
+        centered = y_true - mean
+        self._combine_moments(n, mean, float(centered @ centered))
+        self.sum_sq_error += float(error @ error)
+        self.sum_abs_error += float(abs_error.sum())
+
+        nonzero = abs_true > 0
+        self.sum_ape += float(np.divide(abs_error, abs_true, out=np.zeros(n), where=nonzero).sum())
+        self.n_ape += int(nonzero.sum())
+
+        denominator = abs_true + np.abs(y_pred)
+        defined = denominator > 0
+        self.sum_sape += float(np.divide(2 * abs_error, denominator, out=np.zeros(n), where=defined).sum())
+        self.n_sape += int(defined.sum())
+
+        if y_lower is not None and y_upper is not None:
+            y_lower = np.asarray(y_lower, dtype=np.float64).ravel()
+            y_upper = np.asarray(y_upper, dtype=np.float64).ravel()
+            self.n_interval += n
+            self.n_covered += int(np.count_nonzero((y_true >= y_lower) & (y_true <= y_upper)))
+            self.sum_width += float((y_upper - y_lower).sum())
+
+        return self
+
+    def merge(self, other):
+        """
+        Fold another accumulator (e.g. from a different worker or fold) into this one
+
+        Returns:
+            self
+        """
+        if other.n:
+            self._combine_moments(other.n, other.mean_true, other.m2_true)
+        for field in self.FIELDS[3:]:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        return self
+
+    def to_dict(self):
+        """Plain, JSON-serializable state for shipping between processes"""
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, state):
+        accumulator = cls()
+        for field in cls.FIELDS:
+            setattr(accumulator, field, state[field])
+        return accumulator
+
+    def report(self):
+        """
+        Metrics over everything seen so far
+
+        Returns:
+            Dictionary with rmse, mae, r2, mape and smape, plus interval_coverage
+            and interval_width when bounds were given; NaN where undefined
+        """
+        nan = float('nan')
+        if self.m2_true > 0:
+            r2 = 1 - self.sum_sq_error / self.m2_true
+        else:
+            # Constant targets: same convention as sklearn.metrics.r2_score
+            r2 = 1.0 if self.sum_sq_error == 0 else 0.0
+
+        report = {
+            'rmse': float(np.sqrt(self.sum_sq_error / self.n)) if self.n else nan,
+            'mae': self.sum_abs_error / self.n if self.n else nan,
+            'r2': float(r2) if self.n else nan,
+            'mape': self.sum_ape / self.n_ape * 100 if self.n_ape else nan,
+            'smape': self.sum_sape / self.n_sape * 100 if self.n_sape else nan
+        }
+        if self.n_interval:
+            report['interval_coverage'] = self.n_covered / self.n_interval
+            report['interval_width'] = self.sum_width / self.n_interval
+        return report
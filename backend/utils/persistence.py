@@ -0,0 +1,271 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError, OperationalError
+
+from schemas.models import db, Prediction
+from utils.instrumentation import instrumentation
+from utils.process_local import ProcessLocalThread
+
+logger = logging.getLogger(__name__)
+
+
+def _is_transient(error):
+    """Whether a failed insert may succeed unchanged later (lock timeout, lost connection)"""
+    return isinstance(error, OperationalError) or (isinstance(error, DBAPIError) and error.connection_invalidated)
+
+
+def build_prediction_records(user_id, dates, X_input, y_pred, lower, upper, model_used):
+    """
+    Turn scored feature rows into Prediction insert dictionaries
+
+    Args:
+        user_id: Owner of the predictions
+        dates: Parsed dates (DatetimeIndex or sequence of datetimes), one per row
+        X_input: 2D array of [temperature, hour, month, weekday] rows
+        y_pred: Point predictions
+        lower: Lower bounds
+        upper: Upper bounds
+        model_used: Model label stored with each row
+
+    Returns:
+        List of column -> value dictionaries
+    """
+    return [
+        {
+            'user_id': int(user_id),
+            'date': dates[i].date(),
+            'hour': int(X_input[i, 1]),
+            # Features are float32; round off the widening noise (20.1 -> 20.100000381)
+            'temperature': round(float(X_input[i, 0]), 4),
+            'month': int(X_input[i, 2]),
+            'weekday': int(X_input[i, 3]),
+            'predicted_load': float(y_pred[i]),
+            'lower_bound': float(lower[i]),
+            'upper_bound': float(upper[i]),
+            'model_used': model_used
+        }
+        for i in range(len(X_input))
+    ]
+
+
+class PredictionWriter:
+    """
+    Bulk persistence for Prediction rows with an optional write-behind queue
+
+    Synchronous writes are one executemany INSERT and one commit per call.
+    In write-behind mode rows are queued and a background thread flushes
+    them every WRITE_BEHIND_MAX_ROWS rows or WRITE_BEHIND_INTERVAL_MS,
+    whichever comes first; the queue is drained on interpreter exit.
+    Reads right after a write-behind write may not see the new rows yet.
+
+    A flush that fails with a transient error (lock timeout, lost
+    connection) is retried with exponential backoff; if every attempt fails
+    the rows go back to the front of the queue for the next flush, keeping
+    at most WRITE_BEHIND_MAX_PENDING rows (oldest dropped first). Rows the
+    database rejects (IntegrityError/DataError) are isolated by bisecting
+    the batch and only those rows are dropped; any other error drops the
+    rows it hit. Either way one bad row never blocks later flushes.
+    """
+
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.1  # seconds before the first retry, doubled for each next one
+
+    def __init__(self, app=None):
+        self.app = None
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = ProcessLocalThread(self._run, 'prediction-writer')
+        self._closed = False
+        self._atexit_registered = False
+        self.write_behind = False
+        self.max_rows = 500
+        self.interval = 0.2
+        self.max_pending = 10000
+        self.rows_written = 0
+        self.flushes = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+        self.errors = 0
+        self.dropped = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read persistence settings from the Flask config"""
+        self.app = app
+        self.write_behind = app.config.get('PREDICTION_WRITE_BEHIND', self.write_behind)
+        self.max_rows = app.config.get('WRITE_BEHIND_MAX_ROWS', self.max_rows)
+        self.interval = app.config.get('WRITE_BEHIND_INTERVAL_MS', self.interval * 1000) / 1000
+        self.max_pending = app.config.get('WRITE_BEHIND_MAX_PENDING', self.max_pending)
+        app.extensions['prediction_writer'] = self
+        if not self._atexit_registered:
+            atexit.register(self.close)
+            self._atexit_registered = True
+
+    def write(self, records, sync=False, return_ids=False):
+        """
+        Persist Prediction rows
+
+        Args:
+            records: List of dictionaries from build_prediction_records
+            sync: Insert and commit now even in write-behind mode
+            return_ids: Insert and commit now, and return the new prediction_ids
+
+        Returns:
+            List of prediction_ids when return_ids is set, otherwise None
+        """
+        if not records:
+            return [] if return_ids else None
+        if sync or return_ids or not self.write_behind or self._closed:
+            return self._insert(records, db.session, return_ids)
+
+        self._thread.ensure()
+        with self._lock:
+            self._queue.extend(records)
+            depth = len(self._queue)
+        if depth >= self.max_rows:
+            self._wakeup.set()
+
+    def _insert(self, records, session, return_ids=False):
+        start = time.perf_counter()
+        ids = None
+        with instrumentation.stage('db_insert'):
+            if return_ids:
+                # Still one batched INSERT (insertmanyvalues) on SQLite and PostgreSQL
+                ids = session.execute(insert(Prediction).returning(Prediction.prediction_id), records).scalars().all()
+            else:
+                session.execute(insert(Prediction), records)
+        with instrumentation.stage('db_commit'):
+            session.commit()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.rows_written += len(records)
+            self.flushes += 1
+            self.flush_seconds_total += elapsed
+            self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+        return ids
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Write every queued row now"""
+        with self._lock:
+            if not self._queue:
+                return
+            batch = list(self._queue)
+            self._queue.clear()
+
+        with self.app.app_context():
+            try:
+                remaining, error = self._write_batch(batch)
+            finally:
+                db.session.remove()
+
+        if remaining:
+            self._requeue(remaining, error)
+
+    def _insert_with_retries(self, records):
+        """Insert and commit, retrying transient errors with exponential backoff"""
+        for attempt in range(self.MAX_RETRIES):
+            if attempt:
+                time.sleep(self.RETRY_BACKOFF * 2 ** (attempt - 1))
+            try:
+                self._insert(records, db.session)
+                return
+            except Exception as e:
+                db.session.rollback()
+                with self._lock:
+                    self.errors += 1
+                instrumentation.inc('prediction_write_errors_total')
+                if not _is_transient(e) or attempt == self.MAX_RETRIES - 1:
+                    raise
+
+    def _write_batch(self, batch):
+        """
+        Insert a batch, halving it around rows the database rejects
+
+        Returns:
+            Tuple of (rows to requeue after a transient failure, that error)
+        """
+        chunks = [batch]
+        while chunks:
+            chunk = chunks.pop()
+            try:
+                self._insert_with_retries(chunk)
+            except (IntegrityError, DataError) as e:
+                if len(chunk) > 1:
+                    middle = len(chunk) // 2
+                    chunks.extend((chunk[middle:], chunk[:middle]))
+                else:
+                    self._drop(chunk, e)
+            except Exception as e:
+                if not _is_transient(e):
+                    self._drop(chunk, e)
+                    continue
+                # Unwritten rows keep their order: this chunk, then the rest of the stack
+                return chunk + [row for rest in reversed(chunks) for row in rest], e
+        return [], None
+
+    def _drop(self, rows, error):
+        """Count and log rows that can never be written"""
+        with self._lock:
+            self.dropped += len(rows)
+        instrumentation.inc('predictions_dropped_total', len(rows))
+        logger.error("Dropped %d predictions the database rejected: %s", len(rows), error)
+
+    def _requeue(self, batch, error):
+        """Put a batch that failed every attempt back in front of the queue, within max_pending"""
+        with self._lock:
+            # Nothing flushes again after close, so the rows cannot be kept
+            keep = 0 if self._closed else max(0, self.max_pending - len(self._queue))
+            dropped = max(0, len(batch) - keep)
+            # Oldest rows go first; whatever is kept is retried on the next flush
+            self._queue.extendleft(reversed(batch[dropped:]))
+            self.dropped += dropped
+
+        if dropped:
+            instrumentation.inc('predictions_dropped_total', dropped)
+            logger.error("Dropped %d predictions after %d failed flushes: %s", dropped, self.MAX_RETRIES, error)
+        if len(batch) > dropped:
+            logger.warning("Requeued %d predictions after %d failed flushes: %s",
+                           len(batch) - dropped, self.MAX_RETRIES, error)
+
+    def close(self):
+        """Stop the background thread and drain the queue (runs at exit)"""
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        if self.app is not None:
+            self.flush()
+
+    def stats(self):
+        """
+        Persistence counters for the status endpoint
+
+        Returns:
+            Dictionary with queue depth and flush timings
+        """
+        return {
+            'write_behind': self.write_behind,
+            'queue_depth': len(self._queue),
+            'rows_written': self.rows_written,
+            'flushes': self.flushes,
+            'flush_ms_avg': round(self.flush_seconds_total / self.flushes * 1000, 3) if self.flushes else None,
+            'flush_ms_max': round(self.flush_seconds_max * 1000, 3),
+            'errors': self.errors,
+            'dropped': self.dropped
+        }
+
+
+prediction_writer = PredictionWriter()
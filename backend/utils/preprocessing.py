@@ -1,7 +1,14 @@
+import math
+
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from utils.features import (
+    FEATURE_COLUMNS, ISO_DATE_FORMAT, build_feature_matrix, calendar_features, frame_to_matrix, iso_date_mask,
+    to_datetime64
+)
+
 def preprocess_data(df):
     """
     Clean and preprocess raw data
@@ -26,8 +33,7 @@ def preprocess_data(df):
     df = df.dropna()
     
     # Extract time-based features
-    df['Month'] = df['Date'].dt.month
-    df['Weekday'] = df['Date'].dt.weekday
+    df['Month'], df['Weekday'] = calendar_features(df['Date'].to_numpy())
     df['Hour'] = df['Hour'].astype(int)
     
     return df
@@ -40,13 +46,13 @@ def prepare_features(data):
         data: Processed dataframe
     
     Returns:
-        Tuple of (X, y) where X is features and y is target
+        Tuple of (X, y) where X is a contiguous float32 feature matrix and y is target
     """
     # Features: Temperature, Hour, Month, Weekday
-    X = data[['Temperature', 'Hour', 'Month', 'Weekday']].values
+    X = frame_to_matrix(data, FEATURE_COLUMNS)
     
     # Target: Load
-    y = data['Load'].values
+    y = data['Load'].to_numpy(dtype=np.float32)
     
     return X, y
 
@@ -60,14 +66,26 @@ def create_single_prediction_input(temperature, hour, date):
         date: Date string (YYYY-MM-DD format)
     
     Returns:
-        2D numpy array with [temperature, hour, month, weekday]
+        2D float32 array with [temperature, hour, month, weekday]
+    """
+    X, _ = build_feature_matrix([temperature], [hour], [date])
+    return X
+
+def create_batch_prediction_input(dates, hours, temperatures, date_format='%Y-%m-%d'):
     """
-    date_obj = pd.to_datetime(date)
-    month = date_obj.month
-    weekday = date_obj.weekday()
+    Vectorized create_single_prediction_input for many rows
+    
+    Args:
+        dates: Sequence of date strings
+        hours: Sequence of hours (0-23)
+        temperatures: Sequence of temperature values
+        date_format: strptime format of the dates
     
-    # Return as 2D array for model input
-    return np.array([[temperature, hour, month, weekday]])
+    Returns:
+        Tuple of (2D float32 array of [temperature, hour, month, weekday], parsed DatetimeIndex)
+    """
+    X, days = build_feature_matrix(temperatures, hours, dates, date_format=date_format)
+    return X, pd.DatetimeIndex(days)
 
 def validate_prediction_input(temperature, hour, date):
     """
@@ -83,21 +101,21 @@ def validate_prediction_input(temperature, hour, date):
     """
     errors = []
     
-    # Validate temperature
-    if not isinstance(temperature, (int, float)):
+    # Validate temperature (bool is an int subclass; JSON's NaN parses to a float)
+    if isinstance(temperature, bool) or not isinstance(temperature, (int, float)) or not math.isfinite(temperature):
         errors.append("Temperature must be a number")
     elif temperature < -50 or temperature > 60:
         errors.append("Temperature must be between -50°C and 60°C")
     
     # Validate hour
-    if not isinstance(hour, int):
+    if isinstance(hour, bool) or not isinstance(hour, int):
         errors.append("Hour must be an integer")
     elif hour < 0 or hour > 23:
         errors.append("Hour must be between 0 and 23")
     
-    # Validate date
+    # Validate date with the parser the features use (zero-padded YYYY-MM-DD only)
     try:
-        date_obj = pd.to_datetime(date)
+        date_obj = pd.Timestamp(to_datetime64([date])[0])
         if date_obj < datetime.now():
             errors.append("Date cannot be in the past")
     except:
@@ -107,3 +125,51 @@ def validate_prediction_input(temperature, hour, date):
     error_message = " | ".join(errors) if errors else None
     
     return is_valid, error_message
+
+def validate_prediction_frame(df, date_format='%Y-%m-%d', max_errors=5, allow_past=False):
+    """
+    Vectorized validate_prediction_input for a DataFrame of rows
+    
+    Args:
+        df: DataFrame with Date, Hour and Temperature columns
+        date_format: strptime format of the Date column
+        max_errors: Maximum number of offending rows to list per check
+        allow_past: Accept past dates (observed history rather than rows to forecast)
+    
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    missing = [column for column in ('Date', 'Hour', 'Temperature') if column not in df.columns]
+    if missing:
+        return False, f"Missing column(s): {', '.join(missing)}"
+    
+    temperature = pd.to_numeric(df['Temperature'], errors='coerce')
+    hour = pd.to_numeric(df['Hour'], errors='coerce')
+    dates = pd.to_datetime(df['Date'], format=date_format, errors='coerce')
+    if date_format == ISO_DATE_FORMAT:
+        # Same strict rule as to_datetime64, which parses these rows for scoring
+        dates = dates.where(iso_date_mask(df['Date']))
+    
+    checks = [
+        (temperature.isna(), "Temperature must be a number"),
+        (temperature.notna() & ((temperature < -50) | (temperature > 60)),
+         "Temperature must be between -50°C and 60°C"),
+        (hour.isna() | (hour % 1 != 0), "Hour must be an integer"),
+        (hour.notna() & ((hour < 0) | (hour > 23)), "Hour must be between 0 and 23"),
+        (dates.isna(), f"Invalid date format (use {date_format})"),
+    ]
+    if not allow_past:
+        checks.append((dates.notna() & (dates < datetime.now()), "Date cannot be in the past"))
+    
+    errors = []
+    for mask, message in checks:
+        rows = df.index[mask.to_numpy()]
+        if len(rows):
+            listed = ', '.join(str(row) for row in rows[:max_errors])
+            more = f" (+{len(rows) - max_errors} more)" if len(rows) > max_errors else ""
+            errors.append(f"{message}: row(s) {listed}{more}")
+    
+    is_valid = len(errors) == 0
+    error_message = " | ".join(errors) if errors else None
+    
+    return is_valid, error_message
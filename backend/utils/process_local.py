@@ -0,0 +1,131 @@
+"""
+Background threads and thread pools owned by one process
+
+Threads do not survive fork: a gunicorn worker inherits the master's
+thread and executor objects, but none of the threads behind them. These
+wrappers remember the PID that started their threads and start new ones
+on first use in every other process. ProcessLocalThread also restarts a
+thread that has died.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessLocalThread:
+    """
+    A daemon thread running target, started on demand in each process
+    """
+
+    def __init__(self, target, name, after_fork=None):
+        """
+        Args:
+            target: Callable the thread runs
+            name: Thread name
+            after_fork: Called (under this object's lock) before the first
+                start in a process other than the one that last started it,
+                e.g. to drop state copied from the parent
+        """
+        self.target = target
+        self.name = name
+        self.after_fork = after_fork
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def is_alive(self):
+        """Whether this process's thread is running"""
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def ensure(self):
+        """Start the thread unless it is already running in this process"""
+        if self.is_alive():
+            return
+        with self._lock:
+            if self.is_alive():
+                return
+            if self._pid != os.getpid():
+                if self._pid is not None and self.after_fork is not None:
+                    self.after_fork()
+                self._pid = os.getpid()
+            elif self._thread is not None:
+                logger.error("%s thread died; restarting it", self.name)
+            self._thread = threading.Thread(target=self.target, name=self.name, daemon=True)
+            self._thread.start()
+
+    def join(self, timeout=None):
+        """Wait for this process's thread to finish (no-op if it never started here)"""
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=timeout)
+
+
+class ProcessLocalExecutor:
+    """
+    A ThreadPoolExecutor created on first use in each process
+    """
+
+    def __init__(self, max_workers, thread_name_prefix, after_fork=None):
+        """
+        Args:
+            max_workers: Pool size
+            thread_name_prefix: Prefix of the pool's thread names
+            after_fork: Called (under this object's lock) before the pool is
+                created in a process other than the one that last created it
+        """
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self.after_fork = after_fork
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def get(self):
+        """
+        This process's executor, created on first use
+
+        Returns:
+            ThreadPoolExecutor
+        """
+        executor = self._executor
+        if executor is not None and self._pid == os.getpid():
+            return executor
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                if self._pid not in (None, os.getpid()) and self.after_fork is not None:
+                    self.after_fork()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.thread_name_prefix
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def current(self):
+        """This process's executor, or None if get() has not created one here"""
+        return self._executor if self._pid == os.getpid() else None
+
+    def submit(self, fn, *args, **kwargs):
+        """Submit to this process's executor"""
+        return self.get().submit(fn, *args, **kwargs)
+
+    def reset(self, max_workers=None):
+        """
+        Let queued and running work finish on the current pool and create a
+        new one (with max_workers, if given) on the next get()
+        """
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False)
+            self._executor = None
+            if max_workers is not None:
+                self.max_workers = max_workers
+
+    def shutdown(self, wait=True):
+        """Stop this process's pool; the next get() creates a new one"""
+        with self._lock:
+            executor = self.current()
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,200 @@
+"""
+Opt-in cProfile capture of individual requests
+
+With PROFILING_ENABLED, requests under PROFILE_PATHS are profiled when
+they carry `<PROFILE_HEADER>: <PROFILE_TOKEN>` or are picked by
+PROFILE_SAMPLE_RATE. Each capture is a .prof file (loadable with pstats
+or snakeviz) plus a .json sidecar, written to PROFILE_DIR. Only the
+newest PROFILE_MAX_FILES captures are kept. When profiling is disabled
+no request hooks are registered at all.
+"""
+import cProfile
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from datetime import datetime
+
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = ('cumulative', 'tottime')
+
+
+class RequestProfiler:
+    """
+    Wraps selected requests in cProfile and keeps a rotating store of captures
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.enabled = False
+        self.directory = 'profiles'
+        self.sample_rate = 0.0
+        self.header = 'X-Profile'
+        self.token = ''
+        self.max_files = 50
+        self.paths = ('/api/predict/', '/api/auth/')
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read profiling settings; registers request hooks only when enabled"""
+        self.enabled = app.config.get('PROFILING_ENABLED', self.enabled)
+        self.directory = app.config.get('PROFILE_DIR', self.directory)
+        self.sample_rate = app.config.get('PROFILE_SAMPLE_RATE', self.sample_rate)
+        self.header = app.config.get('PROFILE_HEADER', self.header)
+        self.token = app.config.get('PROFILE_TOKEN', self.token)
+        self.max_files = app.config.get('PROFILE_MAX_FILES', self.max_files)
+        paths = app.config.get('PROFILE_PATHS')
+        if paths:
+            self.paths = tuple(path.strip() for path in paths.split(',') if path.strip())
+        app.extensions['request_profiler'] = self
+        if not self.enabled:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    # ===== CAPTURE =====
+
+    def _wanted(self):
+        if not request.path.startswith(self.paths):
+            return False
+        value = request.headers.get(self.header)
+        if value is not None and self.token and hmac.compare_digest(value, self.token):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _before_request(self):
+        if not self._wanted():
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this process (Python 3.12+)
+            return
+        g.request_profiler = (profiler, time.perf_counter())
+
+    def _after_request(self, response):
+        self._finish(response.status_code)
+        return response
+
+    def _teardown_request(self, exc):
+        # Only reached with a live profiler when the request raised past after_request
+        self._finish(500)
+
+    def _finish(self, status):
+        captured = g.pop('request_profiler', None)
+        if captured is None:
+            return
+        profiler, start = captured
+        profiler.disable()
+        duration = time.perf_counter() - start
+        try:
+            self._save(profiler, status, duration)
+        except OSError as e:
+            logger.warning("Could not save request profile: %s", e)
+
+    def _save(self, profiler, status, duration):
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_')
+        name = f"{stamp}-{os.getpid()}-{slug}"
+        profiler.dump_stats(os.path.join(self.directory, f'{name}.prof'))
+        with open(os.path.join(self.directory, f'{name}.json'), 'w') as f:
+            json.dump({
+                'name': name,
+                'captured_at': datetime.utcnow().isoformat(timespec='seconds'),
+                'pid': os.getpid(),
+                'method': request.method,
+                'path': request.path,
+                'status': status,
+                'duration_ms': round(duration * 1000, 3),
+                'trigger': 'header' if request.headers.get(self.header) else 'sample'
+            }, f)
+        self._rotate()
+
+    def _rotate(self):
+        with self._lock:
+            names = sorted(entry[:-5] for entry in os.listdir(self.directory) if entry.endswith('.json'))
+            for name in names[:-self.max_files] if self.max_files > 0 else []:
+                for extension in ('.json', '.prof'):
+                    try:
+                        os.remove(os.path.join(self.directory, name + extension))
+                    except FileNotFoundError:
+                        pass
+
+    # ===== READING CAPTURES =====
+
+    def profile_path(self, name):
+        """
+        Path of a capture's .prof file
+
+        Returns:
+            Absolute path, or None for unknown (or unsafe) names
+        """
+        if not re.fullmatch(r'[A-Za-z0-9_\-]+', name or ''):
+            return None
+        path = os.path.abspath(os.path.join(self.directory, f'{name}.prof'))
+        return path if os.path.exists(path) else None
+
+    def top_functions(self, name, top=15, sort='cumulative'):
+        """
+        Hottest functions of one capture
+
+        Args:
+            name: Capture name
+            top: Number of functions to return
+            sort: 'cumulative' or 'tottime'
+
+        Returns:
+            List of dictionaries with function, calls, tottime_ms and cumtime_ms
+        """
+        stats = pstats.Stats(self.profile_path(name)).stats
+        column = 3 if sort == 'cumulative' else 2
+        hottest = sorted(stats.items(), key=lambda item: item[1][column], reverse=True)[:top]
+        return [
+            {
+                'function': pstats.func_std_string(function),
+                'calls': calls,
+                'tottime_ms': round(tottime * 1000, 3),
+                'cumtime_ms': round(cumtime * 1000, 3)
+            }
+            for function, (_, calls, tottime, cumtime, _) in hottest
+        ]
+
+    def list_captures(self, limit=20, top=10, sort='cumulative'):
+        """
+        Most recent captures, newest first, each with its top functions
+
+        Returns:
+            List of capture metadata dictionaries
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted((entry[:-5] for entry in os.listdir(self.directory) if entry.endswith('.json')),
+                       reverse=True)[:limit]
+        captures = []
+        for name in names:
+            try:
+                with open(os.path.join(self.directory, f'{name}.json')) as f:
+                    capture = json.load(f)
+                capture['top_functions'] = self.top_functions(name, top, sort) if top > 0 else []
+            except (OSError, ValueError, TypeError):
+                # Rotated away (or half-written) by another worker
+                continue
+            captures.append(capture)
+        return captures
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,306 @@
+"""
+Password hashing and user lookups for authenticated requests
+
+`password_hasher` runs bcrypt (at BCRYPT_ROUNDS) on a small dedicated
+thread pool. bcrypt releases the GIL, so a burst of logins uses at most
+PASSWORD_HASH_WORKERS cores and the prediction threads keep running.
+When more than PASSWORD_HASH_MAX_PENDING hashes are queued, new ones are
+refused right away (PasswordHasherBusy) instead of piling up behind the
+queue. Async callers can await the futures from `submit_hash`/`submit_verify`.
+
+`identity_cache` keeps a short-lived snapshot of each user, keyed on the
+JWT subject, so token checks and admin checks do not query the users
+table on every request. Any ORM update or delete of a User drops that
+user's entry, and so do password changes. Other worker processes only
+see the change after IDENTITY_CACHE_TTL expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import bcrypt
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from schemas.models import db, User
+from utils.process_local import ProcessLocalExecutor
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the hashing queue is full or a hash did not finish in time"""
+
+
+class PasswordHasher:
+    """
+    Bounded bcrypt executor with its own concurrency and queue limits
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self.rounds = 12
+        self.workers = 2
+        self.max_pending = 32
+        self.timeout = 10.0
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        # Hashes queued before a fork are never finished in the child
+        self._pool = ProcessLocalExecutor(self.workers, 'password-hash', after_fork=self._clear_pending)
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read hashing settings from the Flask config"""
+        self.rounds = app.config.get('BCRYPT_ROUNDS', self.rounds)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', self.max_pending)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        with self._lock:
+            self._pool.reset(max_workers=self.workers)
+            self._clear_pending()
+        app.extensions['password_hasher'] = self
+
+    def _clear_pending(self):
+        # Caller holds self._lock
+        self.pending = 0
+
+    def _submit(self, fn):
+        with self._lock:
+            executor = self._pool.get()
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy('Too many password operations in progress, try again shortly')
+            self.pending += 1
+        future = executor.submit(fn)
+        future.add_done_callback(lambda _: self._done(executor))
+        return future
+
+    def _done(self, executor):
+        with self._lock:
+            # Work left on a pool that init_app replaced is no longer counted
+            if executor is self._pool.current():
+                self.pending -= 1
+                self.completed += 1
+
+    def _wait(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()  # drop it if it is still queued
+            raise PasswordHasherBusy('Password operation timed out, try again shortly')
+
+    # ===== HASHING =====
+
+    def submit_hash(self, password):
+        """
+        Queue a bcrypt hash of password
+
+        Returns:
+            Future resolving to the encoded hash string
+
+        Raises:
+            PasswordHasherBusy: If the queue is full
+        """
+        rounds = self.rounds
+        return self._submit(lambda: bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode())
+
+    def submit_verify(self, password, password_hash):
+        """
+        Queue a bcrypt check of password against password_hash
+
+        Returns:
+            Future resolving to True or False
+
+        Raises:
+            PasswordHasherBusy: If the queue is full
+        """
+        return self._submit(lambda: bcrypt.checkpw(password.encode(), password_hash.encode()))
+
+    def hash(self, password):
+        """Blocking hash through the executor"""
+        return self._wait(self.submit_hash(password))
+
+    def verify(self, password, password_hash):
+        """Blocking check through the executor"""
+        return self._wait(self.submit_verify(password, password_hash))
+
+    def needs_rehash(self, password_hash):
+        """True when a stored hash was made with a lower cost than BCRYPT_ROUNDS (never lowers a cost)"""
+        try:
+            return int(password_hash.split('$')[2]) < self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self):
+        """
+        Hashing counters for the status endpoint
+
+        Returns:
+            Dictionary with rounds, workers, queue limit, completed and rejected counts
+        """
+        return {
+            'rounds': self.rounds,
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'completed': self.completed,
+            'rejected': self.rejected
+        }
+
+
+class UserIdentity:
+    """
+    Read-only snapshot of the user columns authenticated routes need
+    """
+
+    __slots__ = ('user_id', 'username', 'email', 'role', 'is_verified', 'is_active')
+
+    def __init__(self, user):
+        for name in self.__slots__:
+            setattr(self, name, getattr(user, name))
+
+    def to_dict(self):
+        """Same shape as User.to_dict"""
+        return {
+            "user_id": self.user_id,
+            "username": self.username,
+            "email": self.email,
+            "role": self.role,
+            "is_verified": self.is_verified,
+            "is_active": self.is_active,
+        }
+
+
+class IdentityCache:
+    """
+    LRU + TTL cache of UserIdentity snapshots keyed on the JWT subject
+    """
+
+    def __init__(self, app=None):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.maxsize = 0
+        self.ttl = 30
+        self.hits = 0
+        self.misses = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read cache settings from the Flask config"""
+        self.maxsize = app.config.get('IDENTITY_CACHE_SIZE', self.maxsize)
+        self.ttl = app.config.get('IDENTITY_CACHE_TTL', self.ttl)
+        self.clear()
+        app.extensions['identity_cache'] = self
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 and self.ttl > 0
+
+    def clear(self):
+        """Drop every entry and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def peek(self, user_id):
+        """
+        Cached snapshot without touching the database
+
+        Returns:
+            UserIdentity, or None on a miss (or when the cache is disabled)
+        """
+        if not self.enabled:
+            return None
+        try:
+            key = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get(self, user_id):
+        """
+        Snapshot of a user, from the cache or the database
+
+        Args:
+            user_id: JWT subject (string or integer user_id)
+
+        Returns:
+            UserIdentity, or None if the user does not exist
+        """
+        try:
+            key = int(user_id)
+        except (TypeError, ValueError):
+            return None
+
+        identity = self.peek(key)
+        if identity is not None:
+            return identity
+        with self._lock:
+            self.misses += 1
+
+        user = db.session.get(User, key)
+        if user is None:
+            return None
+        identity = UserIdentity(user)
+        if self.enabled:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, identity)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return identity
+
+    def invalidate(self, user_id):
+        """Forget one user (password change, deactivation, role change)"""
+        with self._lock:
+            self._entries.pop(int(user_id), None)
+
+    def stats(self):
+        """
+        Cache counters for the status endpoint
+
+        Returns:
+            Dictionary with size, hits, misses and hit rate
+        """
+        total = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else None
+        }
+
+
+password_hasher = PasswordHasher()
+identity_cache = IdentityCache()
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_identity(mapper, connection, target):
+    # Drop it now, and again after commit in case another request re-read the old row meanwhile
+    identity_cache.invalidate(target.user_id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault('stale_identities', set()).add(target.user_id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_identities(session):
+    for user_id in session.info.pop('stale_identities', ()):
+        identity_cache.invalidate(user_id)
@@ -0,0 +1,169 @@
+"""
+Chunked CSV ingestion into a memory-mapped, columnar feature store
+
+Reads raw history in fixed-size chunks, parses dates with an explicit
+format, downcasts (float32 / int8) and appends each column to its own
+`.npy` file, so peak memory is one chunk regardless of file size.
+Rows are kept in file order; the CSV is expected to be chronological.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from utils.features import FEATURE_COLUMNS, calendar_features
+
+COLUMN_DTYPES = {
+    'Temperature': np.float32,
+    'Hour': np.int8,
+    'Month': np.int8,
+    'Weekday': np.int8,
+    'Load': np.float32,
+}
+META_FILE = 'features.json'
+
+
+def preprocess_chunk(chunk, date_format='%Y-%m-%d'):
+    """
+    Streaming equivalent of preprocess_data for one chunk
+
+    Args:
+        chunk: Raw dataframe chunk with Date, Hour, Temperature and Load columns
+        date_format: strptime format of the Date column
+
+    Returns:
+        Dictionary of column name -> downcast numpy array
+    """
+    dates = pd.to_datetime(chunk['Date'], format=date_format, errors='coerce')
+    load = pd.to_numeric(chunk['Load'], errors='coerce')
+    temperature = pd.to_numeric(chunk['Temperature'], errors='coerce')
+    hour = pd.to_numeric(chunk['Hour'], errors='coerce')
+
+    valid = (dates.notna() & load.notna() & temperature.notna() & hour.notna()).to_numpy()
+    month, weekday = calendar_features(dates.to_numpy()[valid])
+
+    return {
+        'Temperature': temperature.to_numpy()[valid].astype(np.float32),
+        'Hour': hour.to_numpy()[valid].astype(np.int8),
+        'Month': month,
+        'Weekday': weekday,
+        'Load': load.to_numpy()[valid].astype(np.float32),
+    }
+
+
+def stream_preprocess(csv_path, output_dir, chunksize=500000, date_format='%Y-%m-%d'):
+    """
+    Clean a large CSV chunk by chunk into a memory-mapped feature store
+
+    Args:
+        csv_path: Raw CSV with Date, Hour, Temperature and Load columns
+        output_dir: Directory for the per-column `.npy` files
+        chunksize: Rows read per chunk
+        date_format: strptime format of the Date column
+
+    Returns:
+        Store metadata dictionary (row counts and columns)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    parts = {name: open(os.path.join(output_dir, f"{name}.part"), 'wb') for name in COLUMN_DTYPES}
+
+    rows_read = 0
+    rows_kept = 0
+    try:
+        reader = pd.read_csv(
+            csv_path,
+            usecols=['Date', 'Hour', 'Temperature', 'Load'],
+            dtype={'Date': str},
+            chunksize=chunksize
+        )
+        for chunk in reader:
+            rows_read += len(chunk)
+            columns = preprocess_chunk(chunk, date_format)
+            rows_kept += len(columns['Load'])
+            for name, values in columns.items():
+                parts[name].write(values.tobytes())
+    finally:
+        for handle in parts.values():
+            handle.close()
+
+    # Prepend a .npy header to each raw column file (sequential copy, constant memory)
+    for name, dtype in COLUMN_DTYPES.items():
+        part_path = os.path.join(output_dir, f"{name}.part")
+        with open(os.path.join(output_dir, f"{name}.npy"), 'wb') as out, open(part_path, 'rb') as raw:
+            header = {'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                      'fortran_order': False, 'shape': (rows_kept,)}
+            np.lib.format.write_array_header_1_0(out, header)
+            shutil.copyfileobj(raw, out, length=16 * 1024 * 1024)
+        os.remove(part_path)
+
+    meta = {
+        'source': os.path.abspath(csv_path),
+        'rows_read': rows_read,
+        'rows': rows_kept,
+        'features': FEATURE_COLUMNS,
+        'target': 'Load'
+    }
+    with open(os.path.join(output_dir, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    return meta
+
+
+class FeatureStore:
+    """
+    Read-only, memory-mapped view of a store written by stream_preprocess
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r')
+            for name in COLUMN_DTYPES
+        }
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def read(self, start=0, stop=None):
+        """
+        Materialize one row range
+
+        Returns:
+            Tuple of (X, y): contiguous float32 [rows, 4] features and float32 load
+        """
+        stop = len(self) if stop is None else stop
+        X = np.empty((stop - start, len(FEATURE_COLUMNS)), dtype=np.float32)
+        for i, name in enumerate(FEATURE_COLUMNS):
+            X[:, i] = self.columns[name][start:stop]
+        return X, np.asarray(self.columns['Load'][start:stop], dtype=np.float32)
+
+    def iter_chunks(self, chunk_size=65536, start=0, stop=None):
+        """
+        Yield (X, y) chunks over a row range without loading the rest
+
+        Args:
+            chunk_size: Rows per chunk
+            start: First row
+            stop: End row (exclusive); defaults to the end of the store
+        """
+        stop = len(self) if stop is None else stop
+        for chunk_start in range(start, stop, chunk_size):
+            yield self.read(chunk_start, min(chunk_start + chunk_size, stop))
+
+    def sample(self, n_rows, stop=None, seed=0):
+        """
+        Random subset of rows, for fits that need everything in memory (TWSVR)
+
+        Returns:
+            Tuple of (X, y) with at most n_rows rows, in time order
+        """
+        stop = len(self) if stop is None else stop
+        if n_rows >= stop:
+            return self.read(0, stop)
+        rows = np.sort(np.random.default_rng(seed).choice(stop, size=n_rows, replace=False))
+        X = np.column_stack([self.columns[name][rows] for name in FEATURE_COLUMNS]).astype(np.float32)
+        return X, np.asarray(self.columns['Load'][rows], dtype=np.float32)